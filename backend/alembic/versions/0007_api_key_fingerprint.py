@@ -0,0 +1,34 @@
+"""Indexed API key fingerprint on agents.
+
+Revision ID: 0007_api_key_fingerprint
+Revises: 0005_vote_value_and_round_comments
+Create Date: 2026-10-17
+
+Adds agents.api_key_fingerprint (SHA-256 of the API key) with a unique index so authentication
+is one indexed lookup plus one argon2 verify instead of a scan over every agent.
+Existing rows stay NULL: plaintext keys are not recoverable, so the fingerprint is filled in
+the first time each legacy key authenticates successfully.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_api_key_fingerprint"
+down_revision = "0005_vote_value_and_round_comments"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "agents",
+        sa.Column("api_key_fingerprint", sa.String(length=64), nullable=True),
+    )
+    op.create_index("ix_agents_api_key_fingerprint", "agents", ["api_key_fingerprint"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_agents_api_key_fingerprint", table_name="agents")
+    op.drop_column("agents", "api_key_fingerprint")
@@ -0,0 +1,71 @@
+"""Materialized agree/disagree tallies on submissions.
+
+Revision ID: 0008_submission_vote_tallies
+Revises: 0007_api_key_fingerprint
+Create Date: 2026-10-17
+
+Adds submissions.agree_count / disagree_count (maintained by /vote) and backfills them from
+votes in batches of submissions so large tables are not updated in one statement.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_submission_vote_tallies"
+down_revision = "0007_api_key_fingerprint"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+submissions = sa.table(
+    "submissions",
+    sa.column("id"),
+    sa.column("agree_count", sa.Integer),
+    sa.column("disagree_count", sa.Integer),
+)
+votes = sa.table("votes", sa.column("submission_id"), sa.column("value", sa.String))
+
+
+def upgrade() -> None:
+    op.add_column(
+        "submissions",
+        sa.Column("agree_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "submissions",
+        sa.Column("disagree_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    conn = op.get_bind()
+    last_id = None
+    while True:
+        query = sa.select(submissions.c.id).order_by(submissions.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(submissions.c.id > last_id)
+        ids = [row[0] for row in conn.execute(query)]
+        if not ids:
+            break
+        last_id = ids[-1]
+        tallies = conn.execute(
+            sa.select(
+                votes.c.submission_id,
+                sa.func.sum(sa.case((votes.c.value == "agree", 1), else_=0)),
+                sa.func.sum(sa.case((votes.c.value == "disagree", 1), else_=0)),
+            )
+            .where(votes.c.submission_id.in_(ids))
+            .group_by(votes.c.submission_id)
+        ).all()
+        for submission_id, agrees, disagrees in tallies:
+            conn.execute(
+                submissions.update()
+                .where(submissions.c.id == submission_id)
+                .values(agree_count=int(agrees or 0), disagree_count=int(disagrees or 0))
+            )
+
+
+def downgrade() -> None:
+    op.drop_column("submissions", "disagree_count")
+    op.drop_column("submissions", "agree_count")
@@ -0,0 +1,77 @@
+"""Incrementally maintained global and per-round leaderboard tables.
+
+Revision ID: 0009_leaderboard_scores
+Revises: 0008_submission_vote_tallies
+Create Date: 2026-10-17
+
+leaderboard_scores (per agent) and round_leaderboard_scores (per round and agent) hold agree-vote
+scores updated by /submit and /vote, indexed on (score desc, display_name) so leaderboard pages
+and rank lookups are index range reads. Backfilled from the submission tallies added in 0008.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0009_leaderboard_scores"
+down_revision = "0008_submission_vote_tallies"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    uuid_type = sa.String(36) if conn.dialect.name == "sqlite" else postgresql.UUID(as_uuid=True)
+
+    op.create_table(
+        "leaderboard_scores",
+        sa.Column("agent_id", uuid_type, primary_key=True),
+        sa.Column("display_name", sa.String(length=255), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["agent_id"], ["agents.id"]),
+    )
+    op.create_index(
+        "ix_leaderboard_scores_rank",
+        "leaderboard_scores",
+        [sa.text("score DESC"), "display_name"],
+    )
+
+    op.create_table(
+        "round_leaderboard_scores",
+        sa.Column("round_id", uuid_type, primary_key=True),
+        sa.Column("agent_id", uuid_type, primary_key=True),
+        sa.Column("display_name", sa.String(length=255), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["round_id"], ["rounds.id"]),
+        sa.ForeignKeyConstraint(["agent_id"], ["agents.id"]),
+    )
+    op.create_index(
+        "ix_round_leaderboard_scores_rank",
+        "round_leaderboard_scores",
+        ["round_id", sa.text("score DESC"), "display_name"],
+    )
+
+    op.execute(
+        """
+        INSERT INTO leaderboard_scores (agent_id, display_name, score)
+        SELECT a.id, a.display_name, COALESCE(SUM(s.agree_count), 0)
+        FROM agents a JOIN submissions s ON s.agent_id = a.id
+        GROUP BY a.id, a.display_name
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO round_leaderboard_scores (round_id, agent_id, display_name, score)
+        SELECT s.round_id, s.agent_id, a.display_name, s.agree_count
+        FROM submissions s JOIN agents a ON a.id = s.agent_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_round_leaderboard_scores_rank", table_name="round_leaderboard_scores")
+    op.drop_table("round_leaderboard_scores")
+    op.drop_index("ix_leaderboard_scores_rank", table_name="leaderboard_scores")
+    op.drop_table("leaderboard_scores")
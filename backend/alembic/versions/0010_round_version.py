@@ -0,0 +1,30 @@
+"""Per-round data version.
+
+Revision ID: 0010_round_version
+Revises: 0009_leaderboard_scores
+Create Date: 2026-10-17
+
+rounds.version is incremented by every arena write touching a round (submit, comment, vote,
+close). Read endpoints key their serialized-payload cache on it.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010_round_version"
+down_revision = "0009_leaderboard_scores"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "rounds",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("rounds", "version")
@@ -0,0 +1,37 @@
+"""Maintained contribution counter on rounds.
+
+Revision ID: 0011_round_contribution_count
+Revises: 0010_round_version
+Create Date: 2026-10-17
+
+rounds.contribution_count (submissions + comments) is incremented by the same UPDATE that
+decides auto-close, replacing two COUNT(*) queries per write and per read. Backfilled here.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011_round_contribution_count"
+down_revision = "0010_round_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "rounds",
+        sa.Column("contribution_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        UPDATE rounds SET contribution_count =
+            (SELECT COUNT(*) FROM submissions WHERE submissions.round_id = rounds.id)
+            + (SELECT COUNT(*) FROM round_comments WHERE round_comments.round_id = rounds.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("rounds", "contribution_count")
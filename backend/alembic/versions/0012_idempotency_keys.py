@@ -0,0 +1,38 @@
+"""Stored responses for Idempotency-Key replays.
+
+Revision ID: 0012_idempotency_keys
+Revises: 0011_round_contribution_count
+Create Date: 2026-10-17
+
+Only used with IDEMPOTENCY_DB_ENABLED=true, so retried arena POSTs are replayed by any worker.
+Rows past expires_at are ignored on lookup and deleted periodically by the writers.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0012_idempotency_keys"
+down_revision = "0011_round_contribution_count"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("key", sa.String(length=64), primary_key=True),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=False),
+        sa.Column("headers", sa.JSON(), nullable=False),
+        sa.Column("body", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_keys_expires_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,52 @@
+"""Composite indexes for the hot arena and event queries.
+
+Revision ID: 0013_hot_query_indexes
+Revises: 0012_idempotency_keys
+Create Date: 2026-10-17
+
+Each new index extends a single-column one (same leading column), which is dropped as redundant:
+- events (created_at, id): keyset paging of the event feed, no sort step.
+- submissions / round_comments (round_id, created_at): per-round listings in display order.
+- rounds (status, topic): open-round dedupe on propose and the daily topics.
+- rounds (status, round_number): latest open round (close, current round).
+- votes (submission_id, value): agree/disagree tallies answered from the index alone.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0013_hot_query_indexes"
+down_revision = "0012_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+# (new index, table, columns, single-column index it replaces or None)
+INDEXES = [
+    ("ix_events_created_at_id", "events", ["created_at", "id"], None),
+    ("ix_submissions_round_created", "submissions", ["round_id", "created_at"], ("ix_submissions_round_id", "round_id")),
+    (
+        "ix_round_comments_round_created",
+        "round_comments",
+        ["round_id", "created_at"],
+        ("ix_round_comments_round_id", "round_id"),
+    ),
+    ("ix_rounds_status_topic", "rounds", ["status", "topic"], ("ix_rounds_status", "status")),
+    ("ix_rounds_status_round_number", "rounds", ["status", "round_number"], None),
+    ("ix_votes_submission_value", "votes", ["submission_id", "value"], ("ix_votes_submission_id", "submission_id")),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns, replaces in INDEXES:
+        op.create_index(name, table, columns)
+        if replaces is not None:
+            op.drop_index(replaces[0], table_name=table)
+
+
+def downgrade() -> None:
+    for name, table, _columns, replaces in reversed(INDEXES):
+        if replaces is not None:
+            op.create_index(replaces[0], table, [replaces[1]])
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,32 @@
+"""Single-row arena version counter.
+
+Revision ID: 0014_arena_version
+Revises: 0013_hot_query_indexes
+Create Date: 2026-10-17
+
+Replaces SUM(rounds.version) as the /v1/arena/state and /v1/arena/rounds cache key. Seeded
+with the current sum so ETags issued before the upgrade never match newer data.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0014_arena_version"
+down_revision = "0013_hot_query_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "arena_version",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute("INSERT INTO arena_version (id, version) SELECT 1, COALESCE(SUM(version), 0) FROM rounds")
+
+
+def downgrade() -> None:
+    op.drop_table("arena_version")
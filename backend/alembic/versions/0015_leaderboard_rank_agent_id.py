@@ -0,0 +1,40 @@
+"""Add agent_id to the leaderboard rank indexes.
+
+Revision ID: 0015_leaderboard_rank_agent_id
+Revises: 0014_arena_version
+Create Date: 2026-10-17
+
+top() and rank_of() break score/display_name ties on agent_id; without it in the index every
+top-N read finished with a temp b-tree sort.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0015_leaderboard_rank_agent_id"
+down_revision = "0014_arena_version"
+branch_labels = None
+depends_on = None
+
+
+def _recreate(columns_global: list, columns_round: list) -> None:
+    op.drop_index("ix_leaderboard_scores_rank", table_name="leaderboard_scores")
+    op.create_index("ix_leaderboard_scores_rank", "leaderboard_scores", columns_global)
+    op.drop_index("ix_round_leaderboard_scores_rank", table_name="round_leaderboard_scores")
+    op.create_index("ix_round_leaderboard_scores_rank", "round_leaderboard_scores", columns_round)
+
+
+def upgrade() -> None:
+    _recreate(
+        [sa.text("score DESC"), "display_name", "agent_id"],
+        ["round_id", sa.text("score DESC"), "display_name", "agent_id"],
+    )
+
+
+def downgrade() -> None:
+    _recreate(
+        [sa.text("score DESC"), "display_name"],
+        ["round_id", sa.text("score DESC"), "display_name"],
+    )
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from app.api.v1 import admin as admin_router
 from app.api.v1 import agents as agents_router
 from app.api.v1 import events as events_router
 from app.api.v1 import arena as arena_router
@@ -12,4 +13,5 @@ api_router.include_router(agents_router.router, prefix="/v1/agents", tags=["agen
 api_router.include_router(onboarding_router.router, prefix="/v1/agents/onboarding", tags=["onboarding"])
 api_router.include_router(events_router.router, prefix="/v1/events", tags=["events"])
 api_router.include_router(arena_router.router, prefix="/v1/arena", tags=["arena"])
+api_router.include_router(admin_router.router, prefix="/v1/admin", tags=["admin"])
 
@@ -0,0 +1,42 @@
+import secrets
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from app.core.config import get_settings
+from app.core.idempotency import idempotency_store
+from app.core.rate_limit import rate_limiter
+from app.db.pool import pool_stats
+from app.db.replica import replica_router
+from app.db.session import engine
+from app.core.security import credential_cache, hash_pool
+from app.services.events import event_writer
+from app.services.snapshots import state_cache
+from app.services.stream import event_hub
+from app.services.votes import vote_buffer
+
+
+router = APIRouter()
+
+
+def require_admin(x_admin_key: Optional[str] = Header(default=None, alias="X-Admin-Key")) -> None:
+    settings = get_settings()
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, settings.admin_key):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin key")
+
+
+@router.get("/metrics", dependencies=[Depends(require_admin)])
+def get_metrics() -> dict[str, Any]:
+    """In-process runtime counters for this worker. Requires X-Admin-Key."""
+    return {
+        "credential_cache": credential_cache.stats(),
+        "db_pool": pool_stats(engine),
+        "event_writer": event_writer.stats(),
+        "hash_pool": hash_pool.stats(),
+        "idempotency": idempotency_store.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "read_replica": replica_router.stats(),
+        "state_cache": state_cache.stats(),
+        "stream": event_hub.stats(),
+        "vote_buffer": vote_buffer.stats(),
+    }
@@ -1,15 +1,27 @@
 import secrets
+import time
 from datetime import datetime, timezone
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
-from app.core.security import hash_api_key, verify_api_key
-from app.db.session import SessionLocal
+from app.core.security import (
+    api_key_fingerprint,
+    create_session_token,
+    credential_cache,
+    hash_api_key,
+    session_token_matches,
+    verify_api_key,
+    verify_session_token,
+)
+from app.db import replica
+from app.db.runner import REPLICA_KEY, runner_dependency
+from app.db.session import SessionLocal, reader_session_for
 from app.models.agent import Agent
-from app.schemas.agent import AgentRegisterRequest, AgentResponse
+from app.schemas.agent import AgentRegisterRequest, AgentResponse, PendingResponse, PendingRound, SessionTokenResponse
+from app.services.participation import open_rounds_for_agent
 
 
 router = APIRouter()
@@ -23,26 +35,93 @@ def get_db():
         db.close()
 
 
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Session for read-only routes: the replica when configured, unless the caller wrote recently;
+    else a reader connection on SQLite's single-writer profile; else the primary session.
+    """
+    router = replica.replica_router
+    if router.use_replica(request.scope):
+        read_db = router.session()
+        read_db.info[REPLICA_KEY] = True
+    else:
+        read_db = reader_session_for(db)
+        if read_db is None:
+            yield db
+            return
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
+get_db_runner = runner_dependency(get_db)
+get_read_db_runner = runner_dependency(get_read_db)
+
+
 def generate_api_key() -> str:
     return secrets.token_urlsafe(32)
 
 
-def get_current_agent(
+def get_agent_from_api_key(
     x_api_key: Optional[str] = Header(default=None, alias="X-API-Key"),
     db: Session = Depends(get_db),
 ) -> Agent:
+    """Authenticate with the durable API key only (argon2-backed)."""
     if not x_api_key:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing API key")
 
-    # We cannot look up agents by API key directly since only a hash is stored.
-    # Iterate through agents and return the first one whose hash matches.
-    for agent in db.query(Agent).all():
+    # Recently verified key: skip argon2 as long as the stored hash has not been rotated.
+    cached = credential_cache.get(x_api_key)
+    if cached is not None:
+        agent_id, key_hash = cached
+        agent = db.get(Agent, agent_id)
+        if agent is not None and agent.api_key_hash == key_hash:
+            return agent
+        credential_cache.invalidate_agent(agent_id)
+
+    fingerprint = api_key_fingerprint(x_api_key)
+    agent = db.query(Agent).filter(Agent.api_key_fingerprint == fingerprint).first()
+    if agent is not None:
         if verify_api_key(x_api_key, agent.api_key_hash):
+            credential_cache.put(x_api_key, agent.id, agent.api_key_hash)
             return agent
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    # Keys issued before fingerprints existed: verify against the remaining legacy rows and
+    # backfill the fingerprint on match so the next request takes the indexed path.
+    for legacy in db.query(Agent).filter(Agent.api_key_fingerprint.is_(None)).all():
+        if verify_api_key(x_api_key, legacy.api_key_hash):
+            legacy.api_key_fingerprint = fingerprint
+            db.add(legacy)
+            db.commit()
+            db.refresh(legacy)
+            credential_cache.put(x_api_key, legacy.id, legacy.api_key_hash)
+            return legacy
 
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
 
 
+def get_current_agent(
+    authorization: Optional[str] = Header(default=None),
+    x_api_key: Optional[str] = Header(default=None, alias="X-API-Key"),
+    db: Session = Depends(get_db),
+) -> Agent:
+    """Authenticate with a session token (Authorization: Bearer) or the API key (X-API-Key)."""
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token.strip():
+            verified = verify_session_token(token.strip())
+            if verified is not None:
+                agent_id, binding = verified
+                agent = db.get(Agent, agent_id)
+                if agent is not None and session_token_matches(binding, agent.api_key_hash):
+                    return agent
+            if not x_api_key:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+    return get_agent_from_api_key(x_api_key=x_api_key, db=db)
+
+
 @router.post("/register", response_model=AgentResponse)
 def register_agent(payload: AgentRegisterRequest, db: Session = Depends(get_db)) -> AgentResponse:
     api_key = generate_api_key()
@@ -51,6 +130,7 @@ def register_agent(payload: AgentRegisterRequest, db: Session = Depends(get_db))
     agent = Agent(
         display_name=payload.display_name,
         api_key_hash=hash_api_key(api_key),
+        api_key_fingerprint=api_key_fingerprint(api_key),
         created_at=now,
         is_verified=True,
     )
@@ -65,3 +145,35 @@ def register_agent(payload: AgentRegisterRequest, db: Session = Depends(get_db))
         created_at=agent.created_at,
     )
 
+
+
+@router.post("/token", response_model=SessionTokenResponse)
+def issue_session_token(agent: Agent = Depends(get_agent_from_api_key)) -> SessionTokenResponse:
+    """Exchange X-API-Key for a short-lived bearer token. Tokens cannot be used to mint new tokens."""
+    token, expires_at = create_session_token(agent.id, agent.api_key_hash)
+    return SessionTokenResponse(
+        access_token=token,
+        token_type="bearer",
+        agent_id=agent.id,
+        expires_at=expires_at,
+        expires_in=max(0, expires_at - int(time.time())),
+    )
+
+
+@router.get("/me/pending", response_model=PendingResponse)
+def my_pending_rounds(agent: Agent = Depends(get_current_agent), db: Session = Depends(get_read_db)) -> PendingResponse:
+    """Open rounds the caller has not submitted to yet: a cheap per-tick check instead of /v1/arena/state."""
+    rounds = open_rounds_for_agent(db, agent.id)
+    pending = [r for r in rounds if not r["submitted"]]
+    return PendingResponse(
+        agent_id=agent.id,
+        open_rounds=len(rounds),
+        submitted=len(rounds) - len(pending),
+        pending=len(pending),
+        rounds=[
+            PendingRound(
+                id=r["id"], round_number=r["round_number"], topic=r["topic"], contribution_count=r["contribution_count"]
+            )
+            for r in pending
+        ],
+    )
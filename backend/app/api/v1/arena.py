@@ -1,23 +1,38 @@
+import asyncio
 import hashlib
+import json
+import queue
 import uuid
 from datetime import date, datetime, timezone
-from typing import Any, List, Optional
+from typing import Any, Callable, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import case, func
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, func, literal, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.api.v1.agents import get_current_agent, get_db
+from app.api.v1.agents import get_current_agent, get_db, get_db_runner, get_read_db, get_read_db_runner
+from app.core.config import get_settings
+from app.core.http_cache import CACHE_IMMUTABLE, CACHE_LIVE, etag_matches, make_etag, not_modified
+from app.db.runner import DbRunner
 from app.models.agent import Agent
-from app.models.arena import Round, RoundComment, Submission, Vote
-from app.services.events import log_event
+from app.models.arena import Round, RoundComment, Submission
+from app.schemas.arena import HeartbeatRequest, HeartbeatTextIntent, VoteBatchRequest, VoteBatchResponse, VoteBatchResult
+from app.services import leaderboard, votes
+from app.services.events import decode_cursor, encode_cursor, events_after, log_event, savepoint
 from app.services.moderation import ModerationError, ensure_not_hateful
+from app.services.participation import open_rounds_for_agent
+from app.services.snapshots import state_cache
+from app.services.stream import ARENA_STREAM_TYPES, StreamItem, event_hub, make_stream_item
+from app.services.versions import arena_version, bump_arena_version
 
 
 router = APIRouter()
 
 CONTRIBUTIONS_LIMIT = 20  # Auto-close round when facts + comments reach this
+STREAM_BACKLOG_PAGE = 200  # Events read per query when replaying after Last-Event-ID
 
 # Pool of debate topics by sector; mix of fun and serious. 4 are chosen at random per day.
 DAILY_TOPICS_POOL: List[dict[str, str]] = [
@@ -61,27 +76,216 @@ def _get_daily_topics(for_date: Optional[date] = None) -> List[dict[str, str]]:
     return [DAILY_TOPICS_POOL[i].copy() for i in indices]
 
 
-def _contribution_count(db: Session, round_id: UUID) -> int:
-    sub_count = db.query(func.count(Submission.id)).filter(Submission.round_id == round_id).scalar() or 0
-    com_count = db.query(func.count(RoundComment.id)).filter(RoundComment.round_id == round_id).scalar() or 0
-    return int(sub_count) + int(com_count)
+def _record_contribution(db: Session, round_id: UUID) -> Optional[tuple[int, str, int]]:
+    """
+    Count one submission/comment against an open round in a single UPDATE: bump
+    contribution_count and version, and close the round when it reaches CONTRIBUTIONS_LIMIT.
+    The row lock serializes concurrent writers, so exactly one of them closes the round.
+    Returns (contribution_count, status, round_number) after the update, or None if the round
+    is no longer open. Call inside the writing transaction.
+    """
+    reaches_limit = Round.contribution_count + 1 >= CONTRIBUTIONS_LIMIT
+    now = literal(datetime.now(timezone.utc), Round.closed_at.type)
+    stmt = (
+        update(Round)
+        .where(Round.id == round_id, Round.status == "open")
+        .values(
+            contribution_count=Round.contribution_count + 1,
+            version=Round.version + 1,
+            status=case((reaches_limit, "closed"), else_=Round.status),
+            closed_at=case((reaches_limit, now), else_=Round.closed_at),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    columns = (Round.contribution_count, Round.status, Round.round_number)
+    if db.get_bind().dialect.update_returning:
+        row = db.execute(stmt.returning(*columns)).first()
+        result = tuple(row) if row else None
+    elif db.execute(stmt).rowcount == 0:
+        result = None
+    else:
+        result = tuple(db.query(*columns).filter(Round.id == round_id).one())
+    if result is not None:
+        bump_arena_version(db)
+    return result
+
+
+def _count_contribution_or_raise(db: Session, round_id: UUID) -> Optional[int]:
+    """
+    _record_contribution for the submit/comment paths (404/409 if the round is missing or not
+    open). Returns the round number if this write closed the round, else None.
+    """
+    result = _record_contribution(db, round_id)
+    if result is None:
+        db.rollback()
+        if db.query(Round.id).filter(Round.id == round_id).first() is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Round not found")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Round is not open")
+    _, round_status, round_number = result
+    return round_number if round_status == "closed" else None
+
+
+def _round_status(db: Session, round_id: UUID) -> Optional[str]:
+    return db.query(Round.status).filter(Round.id == round_id).scalar()
+
+
+def _ensure_round_open(db: Session, round_id: UUID) -> None:
+    """404/409 before moderation, so a missing or closed round is reported as such."""
+    round_status = _round_status(db, round_id)
+    if round_status is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Round not found")
+    if round_status != "open":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Round is not open")
+
+
+def _log_auto_close(db: Session, round_id: UUID, round_number: int) -> None:
+    log_event(
+        db,
+        event_type="round_closed",
+        payload={"round_id": str(round_id), "round_number": round_number, "reason": "auto_contributions_limit"},
+        commit=False,
+    )
+
+
+def _stage_submission(
+    db: Session,
+    *,
+    agent_id: UUID,
+    display_name: str,
+    round_id: UUID,
+    text: str,
+    closed_round_number: Optional[int],
+) -> dict[str, Any]:
+    """Add a submission, its leaderboard rows and events to the current transaction (no commit)."""
+    now = datetime.now(timezone.utc)
+    submission_id = uuid.uuid4()
+    db.add(Submission(id=submission_id, round_id=round_id, agent_id=agent_id, text=text, created_at=now))
+    leaderboard.record_submission(db, agent_id=agent_id, display_name=display_name, round_id=round_id)
+    log_event(
+        db,
+        event_type="submission_created",
+        payload={
+            "round_id": str(round_id),
+            "submission_id": str(submission_id),
+            "agent_id": str(agent_id),
+        },
+        actor_agent_id=agent_id,
+        commit=False,
+    )
+    if closed_round_number is not None:
+        _log_auto_close(db, round_id, closed_round_number)
+    return {
+        "id": str(submission_id),
+        "round_id": str(round_id),
+        "agent_id": str(agent_id),
+        "text": text,
+        "created_at": now.isoformat(),
+    }
+
+
+def _stage_comment(
+    db: Session,
+    *,
+    agent_id: UUID,
+    round_id: UUID,
+    text: str,
+    closed_round_number: Optional[int],
+) -> dict[str, Any]:
+    """Add a comment and its events to the current transaction (no commit)."""
+    now = datetime.now(timezone.utc)
+    comment_id = uuid.uuid4()
+    db.add(RoundComment(id=comment_id, round_id=round_id, agent_id=agent_id, text=text, created_at=now))
+    log_event(
+        db,
+        event_type="comment_created",
+        payload={
+            "round_id": str(round_id),
+            "comment_id": str(comment_id),
+            "agent_id": str(agent_id),
+        },
+        actor_agent_id=agent_id,
+        commit=False,
+    )
+    if closed_round_number is not None:
+        _log_auto_close(db, round_id, closed_round_number)
+    return {
+        "id": str(comment_id),
+        "round_id": str(round_id),
+        "agent_id": str(agent_id),
+        "text": text,
+        "created_at": now.isoformat(),
+    }
 
 
-def _maybe_auto_close_round(db: Session, round_id: UUID) -> None:
-    r = db.query(Round).filter(Round.id == round_id).first()
-    if not r or r.status != "open":
-        return
-    if _contribution_count(db, round_id) >= CONTRIBUTIONS_LIMIT:
-        now = datetime.now(timezone.utc)
-        r.status = "closed"
-        r.closed_at = now
-        db.add(r)
+def _create_submission(db: Session, agent: Agent, round_id: UUID, text: str, *, duplicate_detail: str) -> dict[str, Any]:
+    """
+    Insert a submission with its contribution count, leaderboard rows and events in one
+    transaction. The (round, agent) unique constraint detects duplicates at commit.
+    """
+    agent_id, display_name = agent.id, agent.display_name
+    closed_round_number = _count_contribution_or_raise(db, round_id)
+    result = _stage_submission(
+        db,
+        agent_id=agent_id,
+        display_name=display_name,
+        round_id=round_id,
+        text=text,
+        closed_round_number=closed_round_number,
+    )
+    try:
         db.commit()
-        log_event(db, event_type="round_closed", payload={"round_id": str(round_id), "round_number": r.round_number, "reason": "auto_contributions_limit"})
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=duplicate_detail)
+    return result
 
 
-@router.get("/state")
-def get_state(db: Session = Depends(get_db)) -> dict[str, Any]:
+def _create_comment(db: Session, agent: Agent, round_id: UUID, text: str) -> dict[str, Any]:
+    """Insert a comment with its contribution count and events in one transaction."""
+    agent_id = agent.id
+    closed_round_number = _count_contribution_or_raise(db, round_id)
+    result = _stage_comment(db, agent_id=agent_id, round_id=round_id, text=text, closed_round_number=closed_round_number)
+    db.commit()
+    return result
+
+
+def _bump_round_version(db: Session, round_id: UUID) -> None:
+    """Mark the round's readable state as changed; call inside the writing transaction."""
+    db.query(Round).filter(Round.id == round_id).update(
+        {Round.version: Round.version + 1}, synchronize_session=False
+    )
+    bump_arena_version(db)
+
+
+def _encode_payload(payload: dict[str, Any]) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _versioned_json(
+    request: Request,
+    key: tuple,
+    cache_control: str,
+    build: Callable[[], dict[str, Any]],
+) -> Response:
+    """
+    Serve a payload identified by a version key: 304 if the client already has it, else the
+    pre-encoded body from state_cache (building and caching it on a miss).
+    """
+    etag = make_etag(*key)
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    body = state_cache.get(key)
+    if body is None:
+        body = _encode_payload(build())
+        state_cache.put(key, body)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+def _build_state(db: Session, leaderboard_limit: int) -> dict[str, Any]:
     # Current round: latest by round_number, if any.
     current_round: Optional[Round] = (
         db.query(Round).order_by(Round.round_number.desc()).limit(1).one_or_none()
@@ -127,107 +331,141 @@ def get_state(db: Session = Depends(get_db)) -> dict[str, Any]:
     submissions_payload: List[dict[str, Any]] = []
     if current_round:
         rows = (
-            db.query(
-                Submission,
-                Agent.display_name,
-                func.sum(case((Vote.value == "agree", 1), else_=0)).label("agrees"),
-                func.sum(case((Vote.value == "disagree", 1), else_=0)).label("disagrees"),
-            )
+            db.query(Submission, Agent.display_name)
             .join(Agent, Submission.agent_id == Agent.id)
-            .outerjoin(Vote, Vote.submission_id == Submission.id)
             .filter(Submission.round_id == current_round.id)
-            .group_by(Submission.id, Agent.display_name)
             .order_by(Submission.created_at.asc())
             .all()
         )
-        for submission, display_name, agrees, disagrees in rows:
+        for submission, display_name in rows:
             submissions_payload.append({
                 "id": str(submission.id),
                 "agent_id": str(submission.agent_id),
                 "agent_name": display_name,
                 "text": submission.text,
-                "agrees": int(agrees or 0),
-                "disagrees": int(disagrees or 0),
+                "agrees": submission.agree_count,
+                "disagrees": submission.disagree_count,
                 "created_at": submission.created_at.isoformat(),
             })
 
-    # Leaderboard: by agree votes on each agent's submissions (facts).
-    leaderboard: List[dict[str, Any]] = []
-    lb_rows = (
-        db.query(
-            Agent.id,
-            Agent.display_name,
-            func.coalesce(
-                func.sum(case((Vote.value == "agree", 1), else_=0)),
-                0,
-            ).label("score"),
-        )
-        .join(Submission, Submission.agent_id == Agent.id)
-        .outerjoin(Vote, Vote.submission_id == Submission.id)
-        .group_by(Agent.id, Agent.display_name)
-        .order_by(func.coalesce(func.sum(case((Vote.value == "agree", 1), else_=0)), 0).desc(), Agent.display_name.asc())
-        .all()
-    )
-    for agent_id, display_name, score in lb_rows:
-        leaderboard.append(
-            {
-                "agent_id": str(agent_id),
-                "agent_name": display_name,
-                "score": int(score),
-            }
-        )
+    # Leaderboard: by agree votes on each agent's submissions (facts), maintained on write.
+    leaderboard_payload = leaderboard.top(db, limit=leaderboard_limit)
 
     return {
         "round": round_payload,
         "submissions": submissions_payload,
-        "leaderboard": leaderboard,
+        "leaderboard": leaderboard_payload,
     }
 
 
-def _round_to_list_item(db: Session, r: Round) -> dict[str, Any]:
-    proposer_name: Optional[str] = None
-    if r.proposer_agent_id:
-        proposer = db.query(Agent).filter(Agent.id == r.proposer_agent_id).first()
-        proposer_name = proposer.display_name if proposer else None
-    contrib = _contribution_count(db, r.id)
-    return {
-        "id": str(r.id),
-        "round_number": r.round_number,
-        "status": r.status,
-        "topic": r.topic,
-        "proposer_agent_id": str(r.proposer_agent_id) if r.proposer_agent_id else None,
-        "proposer_agent_name": proposer_name,
-        "opened_at": r.opened_at.isoformat(),
-        "closed_at": r.closed_at.isoformat() if r.closed_at else None,
-        "contribution_count": contrib,
-    }
+def _state_response(db: Session, request: Request, leaderboard_limit: int) -> Response:
+    # Read the version before building so a concurrent write can only make the cached body newer.
+    key = ("state", arena_version(db), leaderboard_limit)
+    return _versioned_json(request, key, CACHE_LIVE, lambda: _build_state(db, leaderboard_limit))
+
+
+@router.get("/state")
+async def get_state(
+    request: Request,
+    leaderboard_limit: int = Query(100, ge=1, le=1000, description="Max global leaderboard rows"),
+    runner: DbRunner = Depends(get_read_db_runner),
+) -> Response:
+    return await runner.run(_state_response, request, leaderboard_limit)
+
+
+def _list_rounds_page(
+    db: Session,
+    *,
+    search: str,
+    status_filter: Optional[str],
+    before: Optional[int],
+    limit: int,
+) -> dict[str, Any]:
+    """One page of rounds, newest first, in a single query (proposer name via outer join)."""
+    query = (
+        db.query(Round, Agent.display_name)
+        .outerjoin(Agent, Agent.id == Round.proposer_agent_id)
+        .order_by(Round.round_number.desc())
+    )
+    if search:
+        query = query.filter(Round.topic.ilike(f"%{search}%"))
+    if status_filter:
+        query = query.filter(Round.status == status_filter)
+    if before is not None:
+        query = query.filter(Round.round_number < before)
+    rows = query.limit(limit + 1).all()
+
+    items = [
+        {
+            "id": str(r.id),
+            "round_number": r.round_number,
+            "status": r.status,
+            "topic": r.topic,
+            "proposer_agent_id": str(r.proposer_agent_id) if r.proposer_agent_id else None,
+            "proposer_agent_name": proposer_name,
+            "opened_at": r.opened_at.isoformat(),
+            "closed_at": r.closed_at.isoformat() if r.closed_at else None,
+            "contribution_count": r.contribution_count,
+        }
+        for r, proposer_name in rows[:limit]
+    ]
+    next_before = items[-1]["round_number"] if len(rows) > limit else None
+    return {"items": items, "next_before": next_before}
+
+
+def _rounds_response(
+    db: Session, request: Request, search: str, status_filter: Optional[str], before: Optional[int], limit: int
+) -> Response:
+    key = ("rounds", arena_version(db), search, status_filter, before, limit)
+    return _versioned_json(
+        request,
+        key,
+        CACHE_LIVE,
+        lambda: _list_rounds_page(db, search=search, status_filter=status_filter, before=before, limit=limit),
+    )
 
 
 @router.get("/rounds")
-def list_rounds(
+async def list_rounds(
+    request: Request,
     q: Optional[str] = Query(None, description="Search by topic (case-insensitive substring)"),
-    db: Session = Depends(get_db),
-) -> dict[str, Any]:
-    """List all rounds (debates), optionally filtered by topic search. Newest first."""
-    query = db.query(Round).order_by(Round.round_number.desc())
-    if q and q.strip():
-        search = f"%{q.strip()}%"
-        query = query.filter(Round.topic.ilike(search))
-    rounds_list = query.all()
-    items = [_round_to_list_item(db, r) for r in rounds_list]
-    return {"items": items}
+    status_filter: Optional[str] = Query(None, alias="status", pattern="^(open|closed)$"),
+    before: Optional[int] = Query(None, description="Keyset cursor: only rounds with round_number < before"),
+    limit: int = Query(50, ge=1, le=200),
+    runner: DbRunner = Depends(get_read_db_runner),
+) -> Response:
+    """List rounds (debates), newest first, optionally filtered by topic search and status. Paginate with next_before."""
+    search = q.strip() if q else ""
+    return await runner.run(_rounds_response, request, search, status_filter, before, limit)
 
 
 @router.get("/rounds/{round_id}/state")
-def get_round_state(
+async def get_round_state(
     round_id: UUID,
-    db: Session = Depends(get_db),
-) -> dict[str, Any]:
+    request: Request,
+    leaderboard_limit: int = Query(100, ge=1, le=1000, description="Max round leaderboard rows"),
+    runner: DbRunner = Depends(get_read_db_runner),
+) -> Response:
     """Get state for a single round (one debate page): round info, submissions, comments, leaderboard for that round."""
-    r = db.query(Round).filter(Round.id == round_id).first()
-    if not r:
+    return await runner.run(_round_state_response, round_id, request, leaderboard_limit)
+
+
+def _round_state_response(db: Session, round_id: UUID, request: Request, leaderboard_limit: int) -> Response:
+    row = db.query(Round.version, Round.status).filter(Round.id == round_id).first()
+    if row is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Round not found")
+    version, round_status = row
+    key = ("round", round_id, version, leaderboard_limit)
+    cache_control = CACHE_IMMUTABLE if round_status == "closed" else CACHE_LIVE
 
+    def build() -> dict[str, Any]:
+        r = db.query(Round).filter(Round.id == round_id).first()
+        return _build_round_state(db, r, leaderboard_limit)
+
+    return _versioned_json(request, key, cache_control, build)
+
+
+def _build_round_state(db: Session, r: Round, leaderboard_limit: int) -> dict[str, Any]:
     proposer_name: Optional[str] = None
     if r.proposer_agent_id:
         proposer = db.query(Agent).filter(Agent.id == r.proposer_agent_id).first()
@@ -255,20 +493,13 @@ def get_round_state(
         "opened_at": r.opened_at.isoformat(),
         "closed_at": r.closed_at.isoformat() if r.closed_at else None,
         "comments": comments_payload,
-        "contribution_count": _contribution_count(db, r.id),
+        "contribution_count": r.contribution_count,
     }
 
     rows = (
-        db.query(
-            Submission,
-            Agent.display_name,
-            func.sum(case((Vote.value == "agree", 1), else_=0)).label("agrees"),
-            func.sum(case((Vote.value == "disagree", 1), else_=0)).label("disagrees"),
-        )
+        db.query(Submission, Agent.display_name)
         .join(Agent, Submission.agent_id == Agent.id)
-        .outerjoin(Vote, Vote.submission_id == Submission.id)
         .filter(Submission.round_id == r.id)
-        .group_by(Submission.id, Agent.display_name)
         .order_by(Submission.created_at.asc())
         .all()
     )
@@ -278,42 +509,127 @@ def get_round_state(
             "agent_id": str(sub.agent_id),
             "agent_name": display_name,
             "text": sub.text,
-            "agrees": int(agrees or 0),
-            "disagrees": int(disagrees or 0),
+            "agrees": sub.agree_count,
+            "disagrees": sub.disagree_count,
             "created_at": sub.created_at.isoformat(),
         }
-        for sub, display_name, agrees, disagrees in rows
+        for sub, display_name in rows
     ]
 
-    lb_rows = (
-        db.query(
-            Agent.id,
-            Agent.display_name,
-            func.coalesce(func.sum(case((Vote.value == "agree", 1), else_=0)), 0).label("score"),
-        )
-        .join(Submission, Submission.agent_id == Agent.id)
-        .outerjoin(Vote, Vote.submission_id == Submission.id)
-        .filter(Submission.round_id == r.id)
-        .group_by(Agent.id, Agent.display_name)
-        .order_by(func.coalesce(func.sum(case((Vote.value == "agree", 1), else_=0)), 0).desc(), Agent.display_name.asc())
-        .all()
-    )
-    leaderboard = [{"agent_id": str(aid), "agent_name": name, "score": int(score)} for aid, name, score in lb_rows]
+    leaderboard_payload = leaderboard.top(db, round_id=r.id, limit=leaderboard_limit)
 
     return {
         "round": round_payload,
         "submissions": submissions_payload,
-        "leaderboard": leaderboard,
+        "leaderboard": leaderboard_payload,
     }
 
 
-def _get_open_round_or_404(db: Session, round_id: UUID) -> Round:
-    r = db.query(Round).filter(Round.id == round_id).first()
-    if not r:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Round not found")
-    if r.status != "open":
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Round is not open")
-    return r
+@router.get("/leaderboard")
+def get_leaderboard(
+    round_id: Optional[UUID] = Query(None, description="Per-round leaderboard; omit for global"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+) -> dict[str, Any]:
+    """Leaderboard page (score desc, display name asc), global or for one round."""
+    items = leaderboard.top(db, round_id=round_id, limit=limit, offset=offset)
+    return {"items": items, "limit": limit, "offset": offset, "round_id": str(round_id) if round_id else None}
+
+
+@router.get("/leaderboard/agents/{agent_id}")
+def get_leaderboard_rank(
+    agent_id: UUID,
+    round_id: Optional[UUID] = Query(None, description="Rank within one round; omit for global"),
+    db: Session = Depends(get_read_db),
+) -> dict[str, Any]:
+    """Rank and score of one agent."""
+    entry = leaderboard.rank_of(db, agent_id, round_id=round_id)
+    if entry is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agent has no leaderboard entry")
+    return entry
+
+
+def _stream_backlog(db: Session, cursor: str, round_id: Optional[str]) -> list[StreamItem]:
+    """Replay the event log after cursor as stream items, filtered like the live subscription."""
+    items: list[StreamItem] = []
+    while True:
+        rows = events_after(db, cursor, limit=STREAM_BACKLOG_PAGE)
+        for row in rows:
+            cursor = encode_cursor(row.created_at, row.id)
+            if row.type not in ARENA_STREAM_TYPES:
+                continue
+            item = make_stream_item(
+                {
+                    "id": row.id,
+                    "type": row.type,
+                    "payload": row.payload,
+                    "actor_agent_id": row.actor_agent_id,
+                    "created_at": row.created_at,
+                },
+                cursor,
+            )
+            if round_id is None or item.round_id == round_id:
+                items.append(item)
+        if len(rows) < STREAM_BACKLOG_PAGE:
+            return items
+
+
+@router.get("/stream")
+async def stream_arena(
+    round_id: Optional[UUID] = Query(None, description="Only push events for this round"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    since: Optional[str] = Query(None, description="Events cursor to resume after (same as Last-Event-ID)"),
+    runner: DbRunner = Depends(get_read_db_runner),
+) -> StreamingResponse:
+    """
+    Server-Sent Events feed of arena changes as they are committed. Each event's SSE id is its
+    /v1/events cursor, so a reconnecting client (Last-Event-ID) gets everything it missed.
+    """
+    resume_from = last_event_id or since
+    if resume_from:
+        try:
+            decode_cursor(resume_from)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Last-Event-ID")
+    scope = str(round_id) if round_id else None
+    # Subscribe before reading the backlog so nothing committed in between is lost.
+    sub = event_hub.subscribe(types=ARENA_STREAM_TYPES, round_id=scope)
+    try:
+        backlog = await runner.run(_stream_backlog, resume_from, scope) if resume_from else []
+    except BaseException:
+        event_hub.unsubscribe(sub)
+        raise
+    finally:
+        # Don't hold a pooled connection for the life of the stream.
+        await runner.release()
+    keepalive = get_settings().stream_keepalive_seconds
+
+    async def frames():
+        seen = {item.id for item in backlog}
+        try:
+            yield "retry: 3000\n\n".encode("utf-8")
+            for item in backlog:
+                yield item.frame
+            while True:
+                try:
+                    item = await asyncio.wait_for(sub.queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if item is None:  # fell behind; client reconnects with Last-Event-ID
+                    return
+                if item.id in seen:
+                    continue
+                yield item.frame
+        finally:
+            event_hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/rounds/{round_id}/submit")
@@ -324,7 +640,7 @@ def submit_to_round(
     agent=Depends(get_current_agent),
 ) -> dict[str, Any]:
     """Submit a fact/pitch to a specific round. Use this when multiple rounds are open."""
-    r = _get_open_round_or_404(db, round_id)
+    _ensure_round_open(db, round_id)
     text = body.get("text", "").strip()
     if not text:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Text is required")
@@ -347,49 +663,10 @@ def submit_to_round(
         )
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
 
-    existing = (
-        db.query(Submission)
-        .filter(Submission.round_id == r.id, Submission.agent_id == agent.id)
-        .first()
-    )
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Submission already exists for this agent in this round",
-        )
-
-    now = datetime.now(timezone.utc)
-    submission = Submission(
-        round_id=r.id,
-        agent_id=agent.id,
-        text=text,
-        created_at=now,
-    )
-    db.add(submission)
-    db.commit()
-    db.refresh(submission)
-
-    log_event(
-        db,
-        event_type="submission_created",
-        payload={
-            "round_id": str(r.id),
-            "submission_id": str(submission.id),
-            "agent_id": str(agent.id),
-        },
-        actor_agent_id=agent.id,
+    return _create_submission(
+        db, agent, round_id, text, duplicate_detail="Submission already exists for this agent in this round"
     )
 
-    _maybe_auto_close_round(db, r.id)
-
-    return {
-        "id": str(submission.id),
-        "round_id": str(submission.round_id),
-        "agent_id": str(agent.id),
-        "text": submission.text,
-        "created_at": submission.created_at.isoformat(),
-    }
-
 
 @router.post("/rounds/{round_id}/comments")
 def add_comment_to_round(
@@ -399,7 +676,7 @@ def add_comment_to_round(
     agent=Depends(get_current_agent),
 ) -> dict[str, Any]:
     """Add a comment to a specific round. Use this when multiple rounds are open."""
-    r = _get_open_round_or_404(db, round_id)
+    _ensure_round_open(db, round_id)
     text = (body.get("text") or "").strip()
     if not text:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="text is required")
@@ -422,37 +699,7 @@ def add_comment_to_round(
         )
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
 
-    now = datetime.now(timezone.utc)
-    comment = RoundComment(
-        round_id=r.id,
-        agent_id=agent.id,
-        text=text,
-        created_at=now,
-    )
-    db.add(comment)
-    db.commit()
-    db.refresh(comment)
-
-    log_event(
-        db,
-        event_type="comment_created",
-        payload={
-            "round_id": str(r.id),
-            "comment_id": str(comment.id),
-            "agent_id": str(agent.id),
-        },
-        actor_agent_id=agent.id,
-    )
-
-    _maybe_auto_close_round(db, r.id)
-
-    return {
-        "id": str(comment.id),
-        "round_id": str(comment.round_id),
-        "agent_id": str(agent.id),
-        "text": comment.text,
-        "created_at": comment.created_at.isoformat(),
-    }
+    return _create_comment(db, agent, round_id, text)
 
 
 @router.get("/topics/daily")
@@ -461,6 +708,7 @@ def get_daily_topics(db: Session = Depends(get_db)) -> dict[str, Any]:
     raw_topics = _get_daily_topics()
     now = datetime.now(timezone.utc)
     result_topics: List[dict[str, Any]] = []
+    last_number: Optional[int] = None  # set once any round is created; all are committed together
     for t in raw_topics:
         topic_str = t["topic"]
         existing = db.query(Round).filter(Round.status == "open", Round.topic == topic_str).first()
@@ -472,34 +720,41 @@ def get_daily_topics(db: Session = Depends(get_db)) -> dict[str, Any]:
                 "round_id": str(existing.id),
             })
         else:
-            last_number = db.query(func.max(Round.round_number)).scalar() or 0
-            new_round = Round(
-                status="open",
-                round_number=last_number + 1,
-                opened_at=now,
-                closed_at=None,
-                topic=topic_str,
-                proposer_agent_id=None,
+            if last_number is None:
+                last_number = db.query(func.max(Round.round_number)).scalar() or 0
+            last_number += 1
+            new_round_id = uuid.uuid4()
+            db.add(
+                Round(
+                    id=new_round_id,
+                    status="open",
+                    round_number=last_number,
+                    opened_at=now,
+                    closed_at=None,
+                    topic=topic_str,
+                    proposer_agent_id=None,
+                )
             )
-            db.add(new_round)
-            db.commit()
-            db.refresh(new_round)
+            bump_arena_version(db)
             log_event(
                 db,
                 event_type="round_opened",
                 payload={
-                    "round_id": str(new_round.id),
-                    "round_number": new_round.round_number,
-                    "topic": new_round.topic,
+                    "round_id": str(new_round_id),
+                    "round_number": last_number,
+                    "topic": topic_str,
                     "source": "daily",
                 },
+                commit=False,
             )
             result_topics.append({
                 "topic": topic_str,
                 "sector": t["sector"],
                 "tone": t["tone"],
-                "round_id": str(new_round.id),
+                "round_id": str(new_round_id),
             })
+    if last_number is not None:
+        db.commit()
     return {"topics": result_topics, "date": date.today().isoformat()}
 
 
@@ -530,36 +785,39 @@ def open_daily_topic(
             "topic": existing.topic,
         }
 
-    last_number = db.query(func.max(Round.round_number)).scalar() or 0
+    round_number = (db.query(func.max(Round.round_number)).scalar() or 0) + 1
     now = datetime.now(timezone.utc)
-    new_round = Round(
-        status="open",
-        round_number=last_number + 1,
-        opened_at=now,
-        closed_at=None,
-        topic=topic,
-        proposer_agent_id=None,
+    new_round_id = uuid.uuid4()
+    db.add(
+        Round(
+            id=new_round_id,
+            status="open",
+            round_number=round_number,
+            opened_at=now,
+            closed_at=None,
+            topic=topic,
+            proposer_agent_id=None,
+        )
     )
-    db.add(new_round)
-    db.commit()
-    db.refresh(new_round)
-
+    bump_arena_version(db)
     log_event(
         db,
         event_type="round_opened",
         payload={
-            "round_id": str(new_round.id),
-            "round_number": new_round.round_number,
-            "topic": new_round.topic,
+            "round_id": str(new_round_id),
+            "round_number": round_number,
+            "topic": topic,
             "source": "daily",
         },
+        commit=False,
     )
+    db.commit()
 
     return {
-        "round_id": str(new_round.id),
-        "round_number": new_round.round_number,
+        "round_id": str(new_round_id),
+        "round_number": round_number,
         "status": "open",
-        "topic": new_round.topic,
+        "topic": topic,
     }
 
 
@@ -573,27 +831,28 @@ def close_round(
     if not current:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="No open round")
 
-    now = datetime.now(timezone.utc)
+    agent_id = agent.id
+    round_id, round_number = current.id, current.round_number
     current.status = "closed"
-    current.closed_at = now
+    current.closed_at = datetime.now(timezone.utc)
     db.add(current)
-    db.commit()
-    db.refresh(current)
-
+    _bump_round_version(db, round_id)
     log_event(
         db,
         event_type="round_closed",
         payload={
-            "round_id": str(current.id),
-            "round_number": current.round_number,
+            "round_id": str(round_id),
+            "round_number": round_number,
         },
-        actor_agent_id=agent.id,
+        actor_agent_id=agent_id,
+        commit=False,
     )
+    db.commit()
 
     return {
-        "round_id": str(current.id),
-        "round_number": current.round_number,
-        "status": current.status,
+        "round_id": str(round_id),
+        "round_number": round_number,
+        "status": "closed",
     }
 
 
@@ -629,38 +888,42 @@ def propose_topic(
         )
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
 
-    last_number = db.query(func.max(Round.round_number)).scalar() or 0
+    agent_id = agent.id
+    round_number = (db.query(func.max(Round.round_number)).scalar() or 0) + 1
     now = datetime.now(timezone.utc)
-
-    new_round = Round(
-        status="open",
-        round_number=last_number + 1,
-        opened_at=now,
-        closed_at=None,
-        topic=topic,
-        proposer_agent_id=agent.id,
+    new_round_id = uuid.uuid4()
+
+    db.add(
+        Round(
+            id=new_round_id,
+            status="open",
+            round_number=round_number,
+            opened_at=now,
+            closed_at=None,
+            topic=topic,
+            proposer_agent_id=agent_id,
+        )
     )
-    db.add(new_round)
-    db.commit()
-    db.refresh(new_round)
-
+    bump_arena_version(db)
     log_event(
         db,
         event_type="topic_proposed",
         payload={
-            "round_id": str(new_round.id),
-            "round_number": new_round.round_number,
-            "topic": new_round.topic,
-            "proposer_agent_id": str(agent.id),
+            "round_id": str(new_round_id),
+            "round_number": round_number,
+            "topic": topic,
+            "proposer_agent_id": str(agent_id),
         },
-        actor_agent_id=agent.id,
+        actor_agent_id=agent_id,
+        commit=False,
     )
+    db.commit()
 
     return {
-        "round_id": str(new_round.id),
-        "round_number": new_round.round_number,
+        "round_id": str(new_round_id),
+        "round_number": round_number,
         "status": "open",
-        "topic": new_round.topic,
+        "topic": topic,
     }
 
 
@@ -691,52 +954,13 @@ def submit(
         )
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
 
-    current = db.query(Round).filter(Round.status == "open").order_by(Round.round_number.desc()).first()
-    if not current:
+    current_id = db.query(Round.id).filter(Round.status == "open").order_by(Round.round_number.desc()).limit(1).scalar()
+    if not current_id:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="No open round")
 
-    existing = (
-        db.query(Submission)
-        .filter(Submission.round_id == current.id, Submission.agent_id == agent.id)
-        .first()
+    return _create_submission(
+        db, agent, current_id, text, duplicate_detail="Submission already exists for this agent in current round"
     )
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Submission already exists for this agent in current round",
-        )
-
-    now = datetime.now(timezone.utc)
-    submission = Submission(
-        round_id=current.id,
-        agent_id=agent.id,
-        text=text,
-        created_at=now,
-    )
-    db.add(submission)
-    db.commit()
-    db.refresh(submission)
-
-    log_event(
-        db,
-        event_type="submission_created",
-        payload={
-            "round_id": str(current.id),
-            "submission_id": str(submission.id),
-            "agent_id": str(agent.id),
-        },
-        actor_agent_id=agent.id,
-    )
-
-    _maybe_auto_close_round(db, current.id)
-
-    return {
-        "id": str(submission.id),
-        "round_id": str(submission.round_id),
-        "agent_id": str(submission.agent_id),
-        "text": submission.text,
-        "created_at": submission.created_at.isoformat(),
-    }
 
 
 @router.post("/comments")
@@ -767,47 +991,17 @@ def add_comment(
         )
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
 
-    current = db.query(Round).filter(Round.status == "open").order_by(Round.round_number.desc()).first()
-    if not current:
+    current_id = db.query(Round.id).filter(Round.status == "open").order_by(Round.round_number.desc()).limit(1).scalar()
+    if not current_id:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="No open round")
 
-    now = datetime.now(timezone.utc)
-    comment = RoundComment(
-        round_id=current.id,
-        agent_id=agent.id,
-        text=text,
-        created_at=now,
-    )
-    db.add(comment)
-    db.commit()
-    db.refresh(comment)
-
-    log_event(
-        db,
-        event_type="comment_created",
-        payload={
-            "round_id": str(current.id),
-            "comment_id": str(comment.id),
-            "agent_id": str(agent.id),
-        },
-        actor_agent_id=agent.id,
-    )
-
-    _maybe_auto_close_round(db, current.id)
-
-    return {
-        "id": str(comment.id),
-        "round_id": str(comment.round_id),
-        "agent_id": str(agent.id),
-        "text": comment.text,
-        "created_at": comment.created_at.isoformat(),
-    }
+    return _create_comment(db, agent, current_id, text)
 
 
 @router.post("/vote")
-def vote(
+async def vote(
     body: dict[str, str],
-    db: Session = Depends(get_db),
+    runner: DbRunner = Depends(get_db_runner),
 ) -> dict[str, Any]:
     submission_id_raw = body.get("submission_id")
     voter_key = (body.get("voter_key") or "").strip()
@@ -820,43 +1014,191 @@ def vote(
     except Exception:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid submission_id")
 
-    submission = db.query(Submission).filter(Submission.id == submission_id).first()
-    if not submission:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Submission not found")
-
-    round_ = db.query(Round).filter(Round.id == submission.round_id).first()
-    if not round_ or round_.status != "open":
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Round is not open")
-
     value = (body.get("value") or "agree").strip().lower()
     if value not in ("agree", "disagree"):
         value = "agree"
 
-    existing_vote = (
-        db.query(Vote)
-        .filter(Vote.submission_id == submission.id, Vote.voter_key == voter_key)
-        .first()
-    )
-    if existing_vote:
+    vote_request = votes.VoteRequest(submission_id=submission_id, voter_key=voter_key, value=value)
+    if votes.vote_buffer.enabled:
+        try:
+            return {"status": votes.vote_buffer.offer(vote_request)}
+        except queue.Full:
+            pass  # buffer saturated: record synchronously
+
+    outcome = await runner.run(_record_vote, vote_request)
+    if outcome == votes.NOT_FOUND:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Submission not found")
+    if outcome == votes.CLOSED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Round is not open")
+    if outcome == votes.DUPLICATE:
         return {"status": "duplicate"}
+    return {"status": "ok"}
 
-    now = datetime.now(timezone.utc)
-    vote_obj = Vote(
-        submission_id=submission.id,
-        voter_key=voter_key,
-        value=value,
-        created_at=now,
-    )
-    db.add(vote_obj)
-    db.commit()
 
-    log_event(
-        db,
-        event_type="vote_cast",
-        payload={
-            "submission_id": str(submission.id),
-        },
+def _record_vote(db: Session, vote_request: votes.VoteRequest) -> str:
+    (outcome,) = votes.apply_votes(db, [vote_request])
+    if outcome == votes.OK:
+        db.commit()
+    return outcome
+
+
+@router.post("/votes:batch", response_model=VoteBatchResponse)
+async def vote_batch(
+    body: VoteBatchRequest,
+    runner: DbRunner = Depends(get_db_runner),
+) -> VoteBatchResponse:
+    """
+    Cast up to 100 votes under one voter_key: one IN lookup, one insert, one commit.
+    Always recorded synchronously (even with the vote buffer on) so each item gets its status.
+    """
+    voter_key = body.voter_key.strip()
+    if not voter_key:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="voter_key is required")
+
+    outcomes = await runner.run(
+        _record_votes,
+        [votes.VoteRequest(submission_id=item.submission_id, voter_key=voter_key, value=item.value) for item in body.votes],
+    )
+    return VoteBatchResponse(
+        results=[
+            VoteBatchResult(submission_id=item.submission_id, status=outcome)
+            for item, outcome in zip(body.votes, outcomes)
+        ]
     )
 
-    return {"status": "ok"}
+
+def _record_votes(db: Session, requests: list[votes.VoteRequest]) -> list[str]:
+    outcomes = votes.apply_votes(db, requests)
+    if votes.OK in outcomes:
+        db.commit()
+    return outcomes
+
+
+def _apply_heartbeat_intent(
+    db: Session,
+    *,
+    kind: str,
+    intent: HeartbeatTextIntent,
+    agent_id: UUID,
+    display_name: str,
+    submitted: set[UUID],
+) -> dict[str, Any]:
+    """Stage one submit/comment intent in the heartbeat transaction and report its status."""
+    result: dict[str, Any] = {"round_id": str(intent.round_id)}
+    text = intent.text.strip()
+    if not text:
+        return {**result, "status": "invalid", "detail": "text is required"}
+    round_status = _round_status(db, intent.round_id)
+    if round_status is None:
+        return {**result, "status": "not_found"}
+    if round_status != "open":
+        return {**result, "status": "closed"}
+    try:
+        ensure_not_hateful(text, kind=kind)
+    except ModerationError as e:
+        log_event(
+            db,
+            event_type="content_rejected",
+            payload={
+                "kind": kind,
+                "reason": e.code,
+                "message": e.message,
+                "text_preview": text[:120],
+                "agent_id": str(agent_id),
+                "round_id": str(intent.round_id),
+            },
+            actor_agent_id=agent_id,
+            commit=False,
+        )
+        return {**result, "status": "rejected", "detail": e.message}
+    if kind == "submission" and intent.round_id in submitted:
+        return {**result, "status": "duplicate"}
+
+    staged: Optional[dict[str, Any]] = None
+    try:
+        # A savepoint per intent: a concurrent submission to the same round only undoes this one.
+        with savepoint(db):
+            recorded = _record_contribution(db, intent.round_id)
+            if recorded is not None:
+                _, round_status, round_number = recorded
+                closed_round_number = round_number if round_status == "closed" else None
+                if kind == "submission":
+                    staged = _stage_submission(
+                        db,
+                        agent_id=agent_id,
+                        display_name=display_name,
+                        round_id=intent.round_id,
+                        text=text,
+                        closed_round_number=closed_round_number,
+                    )
+                else:
+                    staged = _stage_comment(
+                        db, agent_id=agent_id, round_id=intent.round_id, text=text, closed_round_number=closed_round_number
+                    )
+                db.flush()
+    except IntegrityError:
+        return {**result, "status": "duplicate"}
+    if staged is None:
+        if db.query(Round.id).filter(Round.id == intent.round_id).first() is None:
+            return {**result, "status": "not_found"}
+        return {**result, "status": "closed"}
+    if kind == "submission":
+        submitted.add(intent.round_id)
+    return {**result, "status": "ok", "id": staged["id"]}
+
+
+@router.post("/heartbeat")
+def heartbeat(
+    body: Optional[HeartbeatRequest] = None,
+    db: Session = Depends(get_db),
+    agent=Depends(get_current_agent),
+) -> dict[str, Any]:
+    """
+    One agent tick in one request and one transaction: apply optional submit/comment/vote
+    intents, then return the open rounds with the caller's participation.
+    """
+    body = body or HeartbeatRequest()
+    voter_key = body.votes.voter_key.strip() if body.votes is not None else ""
+    if body.votes is not None and not voter_key:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="voter_key is required")
+    agent_id, display_name = agent.id, agent.display_name
+    results: dict[str, list[dict[str, Any]]] = {"submit": [], "comment": [], "votes": []}
+
+    submitted: set[UUID] = set()
+    if body.submit:
+        submitted = {
+            rid
+            for (rid,) in db.query(Submission.round_id).filter(
+                Submission.agent_id == agent_id,
+                Submission.round_id.in_({intent.round_id for intent in body.submit}),
+            )
+        }
+    for key, kind, intents in (("submit", "submission", body.submit), ("comment", "comment", body.comment)):
+        for intent in intents:
+            results[key].append(
+                _apply_heartbeat_intent(
+                    db, kind=kind, intent=intent, agent_id=agent_id, display_name=display_name, submitted=submitted
+                )
+            )
+
+    if body.votes is not None:
+        outcomes = votes.apply_votes(
+            db,
+            [votes.VoteRequest(submission_id=item.submission_id, voter_key=voter_key, value=item.value) for item in body.votes.items],
+        )
+        results["votes"] = [
+            {"submission_id": str(item.submission_id), "status": outcome}
+            for item, outcome in zip(body.votes.items, outcomes)
+        ]
+
+    db.flush()
+    open_rounds = open_rounds_for_agent(db, agent_id)
+    db.commit()
+
+    return {
+        "agent_id": str(agent_id),
+        "contributions_limit": CONTRIBUTIONS_LIMIT,
+        "open_rounds": open_rounds,
+        "results": results,
+    }
 
@@ -1,38 +1,21 @@
-import base64
-import uuid
-from datetime import datetime, timezone
-from typing import Optional
+import asyncio
+from typing import Any, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.api.v1.agents import get_current_agent, get_db
+from app.api.v1.agents import get_current_agent, get_db, get_read_db_runner
+from app.core.http_cache import CACHE_EVENTS, etag_matches, make_etag, not_modified
+from app.db.runner import DbRunner
 from app.models.event import Event
 from app.schemas.event import EventEmitRequest, EventItem, EventsPage
-from app.services.events import log_event
+from app.services.events import encode_cursor, events_after, log_event
+from app.services.stream import event_hub
 
 
 router = APIRouter()
 
-
-def _encode_cursor(created_at: datetime, event_id: uuid.UUID) -> str:
-    raw = f"{created_at.isoformat()}|{event_id}"
-    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("utf-8")
-
-
-def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
-    try:
-        raw = base64.urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8")
-        created_str, id_str = raw.split("|", 1)
-        created_at = datetime.fromisoformat(created_str)
-        event_id = uuid.UUID(id_str)
-        return created_at, event_id
-    except Exception as exc:  # pragma: no cover - defensive
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid cursor",
-        ) from exc
+MAX_WAIT_SECONDS = 60  # Upper bound for ?wait= on GET /v1/events
 
 
 @router.post("/emit", response_model=EventItem)
@@ -45,36 +28,78 @@ def emit_event(
     return EventItem.model_validate(event)
 
 
-@router.get("", response_model=EventsPage)
-def list_events(
-    cursor: Optional[str] = Query(default=None),
-    limit: int = Query(default=50, ge=1, le=200),
-    db: Session = Depends(get_db),
-) -> EventsPage:
-    query = db.query(Event)
-
-    if cursor:
-        created_at_cursor, event_id_cursor = _decode_cursor(cursor)
-        query = query.filter(
-            or_(
-                Event.created_at > created_at_cursor,
-                and_(
-                    Event.created_at == created_at_cursor,
-                    Event.id > event_id_cursor,
-                ),
-            )
-        )
-
-    query = query.order_by(Event.created_at.asc(), Event.id.asc())
+def _events_page(
+    db: Session,
+    request: Request,
+    cursor: Optional[str],
+    limit: int,
+) -> Union[Response, tuple[EventsPage, str]]:
+    # The log is append-only, so (cursor, limit, newest event) identifies the page contents.
+    newest = db.query(Event.created_at, Event.id).order_by(Event.created_at.desc(), Event.id.desc()).first()
+    etag = make_etag("events", cursor, limit, *(newest or ()))
+    if etag_matches(request, etag):
+        return not_modified(etag, CACHE_EVENTS)
 
-    rows = query.limit(limit + 1).all()
+    try:
+        rows = events_after(db, cursor, limit=limit + 1)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from exc
 
     items = [EventItem.model_validate(row) for row in rows[:limit]]
     next_cursor: Optional[str] = None
+    resume_cursor = cursor
 
     if len(rows) > limit:
         last = rows[limit - 1]
-        next_cursor = _encode_cursor(last.created_at, last.id)
+        next_cursor = encode_cursor(last.created_at, last.id)
+    if rows:
+        last = rows[min(len(rows), limit) - 1]
+        resume_cursor = encode_cursor(last.created_at, last.id)
+
+    return EventsPage(items=items, next_cursor=next_cursor, resume_cursor=resume_cursor), etag
 
-    return EventsPage(items=items, next_cursor=next_cursor)
 
+def _is_empty(page: Union[Response, tuple[EventsPage, str]]) -> bool:
+    return isinstance(page, Response) or not page[0].items
+
+
+@router.get("", response_model=EventsPage)
+async def list_events(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
+    wait: float = Query(
+        default=0,
+        ge=0,
+        le=MAX_WAIT_SECONDS,
+        description="Long-poll: if nothing follows the cursor, wait up to this many seconds for a new event",
+    ),
+    runner: DbRunner = Depends(get_read_db_runner),
+) -> Any:
+    # Subscribe before the first read so an event committed in between still wakes us.
+    sub = event_hub.subscribe() if wait else None
+    try:
+        page = await runner.run(_events_page, request, cursor, limit)
+        if sub is not None and _is_empty(page):
+            # Park on the event loop only: no pooled connection and no threadpool worker held.
+            await runner.release()
+            try:
+                await asyncio.wait_for(sub.queue.get(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            # Re-read even on timeout: events committed by other workers don't reach this hub.
+            page = await runner.run(_events_page, request, cursor, limit)
+    finally:
+        if sub is not None:
+            event_hub.unsubscribe(sub)
+
+    if isinstance(page, Response):
+        return page
+    body, etag = page
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_EVENTS
+    return body
@@ -7,7 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
-from app.core.security import hash_api_key
+from app.core.security import api_key_fingerprint, credential_cache, hash_api_key
 from app.db.session import SessionLocal
 from app.models.agent import Agent
 from app.models.onboarding import AgentOnboarding
@@ -61,6 +61,7 @@ def onboarding_init(
     agent = Agent(
         display_name=display_name,
         api_key_hash=hash_api_key(placeholder_secret),
+        api_key_fingerprint=api_key_fingerprint(placeholder_secret),
         created_at=now,
         is_verified=False,
     )
@@ -155,12 +156,14 @@ def onboarding_claim(
     api_key = secrets.token_urlsafe(32)
     now = datetime.now(timezone.utc)
     agent.api_key_hash = hash_api_key(api_key)
+    agent.api_key_fingerprint = api_key_fingerprint(api_key)
     agent.is_verified = True
     agent.verified_at = now
     row.status = "claimed"
     db.add(agent)
     db.add(row)
     db.commit()
+    credential_cache.invalidate_agent(agent.id)
 
     return {
         "agent_id": str(agent.id),
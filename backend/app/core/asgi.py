@@ -0,0 +1,82 @@
+"""Small helpers for the pure-ASGI middlewares (idempotency, rate limiting, read routing)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Callable, Optional
+
+
+def credential_header(scope: dict) -> Optional[bytes]:
+    """Raw X-API-Key / Authorization value, unverified."""
+    headers = dict(scope["headers"])
+    return headers.get(b"x-api-key") or headers.get(b"authorization") or None
+
+
+def client_ip(scope: dict, *, trust_forwarded: bool = False) -> str:
+    """Client address: the first X-Forwarded-For hop when trusted, else the socket peer."""
+    ip = ""
+    if trust_forwarded:
+        forwarded = dict(scope["headers"]).get(b"x-forwarded-for")
+        if forwarded:
+            ip = forwarded.decode("latin-1").split(",")[0].strip()
+    if not ip and scope.get("client"):
+        ip = scope["client"][0]
+    return ip
+
+
+def client_identities(scope: dict, *, trust_forwarded: bool = False) -> tuple[bytes, ...]:
+    """
+    16-byte identities of the caller without touching the database: a digest of the client IP,
+    plus one of the X-API-Key / Authorization header when present. The header is not verified,
+    so this must not decide anything a caller could gain from by inventing values (see
+    rate_limit.client_key).
+    """
+    ip = b"i" + hashlib.sha256(client_ip(scope, trust_forwarded=trust_forwarded).encode("utf-8")).digest()[:15]
+    credential = credential_header(scope)
+    if credential:
+        return ip, b"c" + hashlib.sha256(credential).digest()[:15]
+    return (ip,)
+
+
+async def read_body(receive: Callable) -> Optional[bytes]:
+    """Buffer the whole request body; None if the client disconnected first."""
+    chunks = []
+    more = True
+    while more:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        more = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+def replaying_receive(body: bytes, receive: Callable) -> Callable:
+    """A receive() that yields an already-buffered body once, then defers to the real channel."""
+    sent = False
+
+    async def _receive() -> dict:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return _receive
+
+
+async def send_json(send: Callable, status_code: int, payload: Any, headers: Optional[list[tuple[bytes, bytes]]] = None) -> None:
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                *(headers or []),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
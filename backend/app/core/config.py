@@ -5,14 +5,79 @@ from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+# Placeholder SECRET_KEY; session tokens are never signed with it (see security._signing_key).
+DEFAULT_SECRET_KEY = "changeme-secret"
+
+
 class Settings(BaseSettings):
     env: str = Field(default="dev", validation_alias="ENV")
     database_url: str = Field(default="sqlite:///./dev.db", validation_alias="DATABASE_URL")
+    # SQLite file profile: pragmas on every connection, and opt-in WAL journal and single pooled
+    # writer connection with a separate reader pool for the read-only routes.
+    sqlite_wal: bool = Field(default=False, validation_alias="SQLITE_WAL")
+    sqlite_synchronous: str = Field(default="NORMAL", pattern="^(OFF|NORMAL|FULL|EXTRA)$", validation_alias="SQLITE_SYNCHRONOUS")
+    sqlite_mmap_size: int = Field(default=256 * 1024 * 1024, validation_alias="SQLITE_MMAP_SIZE")
+    sqlite_cache_size_kib: int = Field(default=65536, validation_alias="SQLITE_CACHE_SIZE_KIB")
+    sqlite_busy_timeout_ms: int = Field(default=5000, validation_alias="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_single_writer: bool = Field(default=False, validation_alias="SQLITE_SINGLE_WRITER")
+    # Optional read replica for the read-only routes; clients that wrote within the last
+    # READ_YOUR_WRITES_SECONDS keep reading from the primary.
+    database_read_url: Optional[str] = Field(default=None, validation_alias="DATABASE_READ_URL")
+    read_your_writes_seconds: float = Field(default=5.0, validation_alias="READ_YOUR_WRITES_SECONDS")
+    read_your_writes_max_tracked: int = Field(default=100000, validation_alias="READ_YOUR_WRITES_MAX_TRACKED")
+    # Connection pool for DATABASE_URL (not used for in-memory SQLite).
+    db_pool_size: int = Field(default=5, validation_alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, validation_alias="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(default=30.0, validation_alias="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_recycle_seconds: int = Field(default=1800, validation_alias="DB_POOL_RECYCLE_SECONDS")
+    db_pool_pre_ping: bool = Field(default=True, validation_alias="DB_POOL_PRE_PING")
+    # Postgres statement_timeout for every pooled connection; 0 leaves the server default.
+    db_statement_timeout_ms: int = Field(default=0, validation_alias="DB_STATEMENT_TIMEOUT_MS")
+    # Async engine for the hot read/vote endpoints (asyncpg / aiosqlite); DATABASE_ASYNC_URL
+    # overrides the URL derived from DATABASE_URL.
+    database_async: bool = Field(default=False, validation_alias="DATABASE_ASYNC")
+    database_async_url: Optional[str] = Field(default=None, validation_alias="DATABASE_ASYNC_URL")
     cors_origins_raw: Optional[str] = Field(
         default=None,
         validation_alias="CORS_ORIGINS",
     )
     admin_key: str = Field(default="changeme-admin", validation_alias="ADMIN_KEY")
+    secret_key: str = Field(default=DEFAULT_SECRET_KEY, validation_alias="SECRET_KEY")
+    session_token_ttl_seconds: int = Field(default=900, validation_alias="SESSION_TOKEN_TTL_SECONDS")
+    hash_pool_workers: int = Field(default=0, validation_alias="HASH_POOL_WORKERS")
+    hash_pool_queue_size: int = Field(default=32, validation_alias="HASH_POOL_QUEUE_SIZE")
+    hash_pool_retry_after_seconds: int = Field(default=1, validation_alias="HASH_POOL_RETRY_AFTER_SECONDS")
+    credential_cache_size: int = Field(default=10000, validation_alias="CREDENTIAL_CACHE_SIZE")
+    credential_cache_ttl_seconds: float = Field(default=300.0, validation_alias="CREDENTIAL_CACHE_TTL_SECONDS")
+    state_cache_entries: int = Field(default=256, validation_alias="STATE_CACHE_ENTRIES")
+    state_cache_max_bytes: int = Field(default=32 * 1024 * 1024, validation_alias="STATE_CACHE_MAX_BYTES")
+    stream_queue_size: int = Field(default=256, validation_alias="STREAM_QUEUE_SIZE")
+    stream_keepalive_seconds: float = Field(default=15.0, validation_alias="STREAM_KEEPALIVE_SECONDS")
+    # sync: events insert in the request transaction; async: background batches, fire-and-forget;
+    # flush: background batches, request waits until its events are committed.
+    event_writer_mode: str = Field(default="sync", pattern="^(sync|async|flush)$", validation_alias="EVENT_WRITER_MODE")
+    event_writer_queue_size: int = Field(default=10000, validation_alias="EVENT_WRITER_QUEUE_SIZE")
+    event_writer_batch_size: int = Field(default=500, validation_alias="EVENT_WRITER_BATCH_SIZE")
+    event_writer_flush_interval_seconds: float = Field(default=0.05, validation_alias="EVENT_WRITER_FLUSH_INTERVAL_SECONDS")
+    event_writer_flush_timeout_seconds: float = Field(default=5.0, validation_alias="EVENT_WRITER_FLUSH_TIMEOUT_SECONDS")
+    vote_buffer_enabled: bool = Field(default=False, validation_alias="VOTE_BUFFER_ENABLED")
+    vote_buffer_queue_size: int = Field(default=50000, validation_alias="VOTE_BUFFER_QUEUE_SIZE")
+    vote_buffer_batch_size: int = Field(default=1000, validation_alias="VOTE_BUFFER_BATCH_SIZE")
+    vote_buffer_flush_interval_seconds: float = Field(default=0.1, validation_alias="VOTE_BUFFER_FLUSH_INTERVAL_SECONDS")
+    vote_buffer_dedup_size: int = Field(default=200000, validation_alias="VOTE_BUFFER_DEDUP_SIZE")
+    idempotency_cache_size: int = Field(default=10000, validation_alias="IDEMPOTENCY_CACHE_SIZE")
+    idempotency_ttl_seconds: float = Field(default=86400.0, validation_alias="IDEMPOTENCY_TTL_SECONDS")
+    idempotency_db_enabled: bool = Field(default=False, validation_alias="IDEMPOTENCY_DB_ENABLED")
+    rate_limit_enabled: bool = Field(default=False, validation_alias="RATE_LIMIT_ENABLED")
+    # Requests per minute per client and route class; 0 disables that class.
+    rate_limit_read_per_minute: float = Field(default=120.0, validation_alias="RATE_LIMIT_READ_PER_MINUTE")
+    rate_limit_write_per_minute: float = Field(default=30.0, validation_alias="RATE_LIMIT_WRITE_PER_MINUTE")
+    rate_limit_vote_per_minute: float = Field(default=120.0, validation_alias="RATE_LIMIT_VOTE_PER_MINUTE")
+    rate_limit_auth_per_minute: float = Field(default=10.0, validation_alias="RATE_LIMIT_AUTH_PER_MINUTE")
+    rate_limit_burst_seconds: float = Field(default=10.0, validation_alias="RATE_LIMIT_BURST_SECONDS")
+    rate_limit_max_keys: int = Field(default=100000, validation_alias="RATE_LIMIT_MAX_KEYS")
+    rate_limit_max_in_flight: int = Field(default=0, validation_alias="RATE_LIMIT_MAX_IN_FLIGHT")
+    rate_limit_trust_forwarded: bool = Field(default=False, validation_alias="RATE_LIMIT_TRUST_FORWARDED")
     frontend_public_base: str = Field(
         default="",
         validation_alias="FRONTEND_PUBLIC_BASE",
@@ -0,0 +1,38 @@
+"""
+HTTP conditional-request helpers: strong ETags derived from data versions and
+per-endpoint Cache-Control policies.
+"""
+
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+
+# Open rounds and live feeds change on every write: short freshness, serve stale while revalidating.
+CACHE_LIVE = "public, max-age=5, stale-while-revalidate=30"
+# Closed rounds no longer accept writes, so their state never changes again.
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+# Event pages: the tail grows constantly; keep freshness very short.
+CACHE_EVENTS = "public, max-age=2, stale-while-revalidate=10"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from the version components that fully determine a response body."""
+    raw = "|".join(str(p) for p in parts).encode("utf-8")
+    return '"' + hashlib.sha256(raw).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if If-None-Match lists this ETag (weak comparison, as RFC 9110 requires for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
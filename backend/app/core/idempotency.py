@@ -0,0 +1,341 @@
+"""
+Idempotency-Key support for arena POSTs.
+
+A client that retries a write (e.g. after a 5xx or a dropped connection) sends the same
+Idempotency-Key header; the first completed response is stored and replayed verbatim to the
+retries, so the write path (moderation, queries, inserts, events) runs once. Keys are scoped to
+the method, path and caller (the agent the credential resolves to, so swapping an API key for a
+session token or refreshing the token keeps the scope), and remembered for IDEMPOTENCY_TTL_SECONDS in an
+in-process LRU, optionally backed by the idempotency_keys table so every worker sees them.
+5xx responses are not stored: retrying those is the point.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, NamedTuple, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.asgi import read_body, replaying_receive
+from app.core.config import get_settings
+from app.db.upsert import insert_ignore
+from app.models.idempotency import IdempotencyRecord
+
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+# Expired rows are deleted once every this many stored responses.
+PURGE_EVERY = 1000
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+class IdempotencyStore:
+    """Bounded TTL store of completed responses, plus the set of keys currently executing."""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        *,
+        db_enabled: bool = False,
+        session_factory: Optional[Callable[[], Session]] = None,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.db_enabled = db_enabled
+        self._session_factory = session_factory
+        self._entries: "OrderedDict[str, tuple[StoredResponse, float]]" = OrderedDict()
+        self._in_flight: set[str] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.conflicts = 0
+        self.mismatches = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 or self.db_enabled
+
+    def _session(self) -> Session:
+        if self._session_factory is None:
+            from app.db.session import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def caller_scope(self, headers: dict[bytes, bytes]) -> Optional[bytes]:
+        """
+        Replay scope of the caller: the agent id its X-API-Key / Bearer token authenticates as
+        (same checks as the routes), a shared anonymous scope without credentials, or None when
+        the credential is invalid (the request then runs unscoped and the route answers 401).
+        Blocking.
+        """
+        authorization = headers.get(b"authorization")
+        x_api_key = headers.get(b"x-api-key")
+        if not authorization and not x_api_key:
+            return b"anonymous"
+        from fastapi import HTTPException
+
+        from app.api.v1.agents import get_current_agent
+
+        db = self._session()
+        try:
+            agent = get_current_agent(
+                authorization=authorization.decode("latin-1") if authorization else None,
+                x_api_key=x_api_key.decode("latin-1") if x_api_key else None,
+                db=db,
+            )
+            return b"agent:" + agent.id.bytes
+        except HTTPException:
+            return None
+        finally:
+            db.close()
+
+    def acquire(self, key: str) -> bool:
+        """Mark a key as executing; False if another request with the same key is in progress."""
+        with self._lock:
+            if key in self._in_flight:
+                self.conflicts += 1
+                return False
+            self._in_flight.add(key)
+            return True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._in_flight.discard(key)
+
+    def _get_memory(self, key: str) -> Optional[StoredResponse]:
+        if self.max_size <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return stored
+
+    def _put_memory(self, key: str, stored: StoredResponse, ttl_seconds: float) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (stored, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        """Stored response for a key (memory first, then the table when enabled). Blocking."""
+        stored = self._get_memory(key)
+        if stored is not None:
+            with self._lock:
+                self.hits += 1
+            return stored
+        if self.db_enabled:
+            now = datetime.now(timezone.utc)
+            db = self._session()
+            try:
+                row = (
+                    db.query(IdempotencyRecord)
+                    .filter(IdempotencyRecord.key == key, IdempotencyRecord.expires_at > now)
+                    .one_or_none()
+                )
+            finally:
+                db.close()
+            if row is not None:
+                stored = StoredResponse(
+                    row.request_hash,
+                    row.status_code,
+                    [(name.encode("latin-1"), value.encode("latin-1")) for name, value in row.headers],
+                    row.body,
+                )
+                expires_at = row.expires_at.replace(tzinfo=row.expires_at.tzinfo or timezone.utc)
+                self._put_memory(key, stored, max(0.0, (expires_at - now).total_seconds()))
+                with self._lock:
+                    self.db_hits += 1
+                return stored
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, stored: StoredResponse) -> None:
+        """Remember a completed response. Blocking when the table is enabled."""
+        self._put_memory(key, stored, self.ttl_seconds)
+        with self._lock:
+            self.stored += 1
+            purge = self.stored % PURGE_EVERY == 0
+        if not self.db_enabled:
+            return
+        now = datetime.now(timezone.utc)
+        db = self._session()
+        try:
+            expired = IdempotencyRecord.expires_at <= now
+            if purge:
+                db.query(IdempotencyRecord).filter(expired).delete(synchronize_session=False)
+            else:
+                db.query(IdempotencyRecord).filter(IdempotencyRecord.key == key, expired).delete(
+                    synchronize_session=False
+                )
+            # A concurrent worker may have stored the same key first; its response wins.
+            insert_ignore(
+                db,
+                IdempotencyRecord,
+                {
+                    "key": key,
+                    "request_hash": stored.request_hash,
+                    "status_code": stored.status_code,
+                    "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in stored.headers],
+                    "body": stored.body,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                },
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def note_mismatch(self) -> None:
+        with self._lock:
+            self.mismatches += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "db_enabled": self.db_enabled,
+                "in_flight": len(self._in_flight),
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "stored": self.stored,
+                "conflicts": self.conflicts,
+                "mismatches": self.mismatches,
+                "evictions": self.evictions,
+            }
+
+
+def _json_response(status_code: int, body: bytes) -> StoredResponse:
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("ascii"))]
+    return StoredResponse("", status_code, headers, body)
+
+
+KEY_TOO_LONG = _json_response(400, b'{"detail":"Idempotency-Key must be 1-255 characters"}')
+KEY_IN_PROGRESS = _json_response(409, b'{"detail":"A request with this Idempotency-Key is still in progress"}')
+KEY_REUSED = _json_response(422, b'{"detail":"Idempotency-Key was already used with a different request body"}')
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware applying Idempotency-Key to POST requests under path_prefix."""
+
+    def __init__(self, app: Any, path_prefix: str = "/v1/arena/") -> None:
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        store = idempotency_store
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].startswith(self.path_prefix)
+            or not store.enabled
+        ):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        raw_key = headers.get(HEADER)
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(raw_key.strip()) <= MAX_KEY_LENGTH:
+            await _send_stored(send, KEY_TOO_LONG)
+            return
+
+        # Scope by agent so two agents cannot collide on (or read) each other's keys.
+        caller = await run_in_threadpool(store.caller_scope, headers)
+        if caller is None:
+            await self.app(scope, receive, send)
+            return
+        key = hashlib.sha256(
+            b"\0".join((b"POST", scope["path"].encode("utf-8"), caller, raw_key.strip()))
+        ).hexdigest()
+
+        body = await read_body(receive)
+        if body is None:
+            return
+        request_hash = hashlib.sha256(body).hexdigest()
+
+        if not store.acquire(key):
+            await _send_stored(send, KEY_IN_PROGRESS)
+            return
+        try:
+            stored = await run_in_threadpool(store.get, key) if store.db_enabled else store.get(key)
+            if stored is not None:
+                if stored.request_hash != request_hash:
+                    store.note_mismatch()
+                    await _send_stored(send, KEY_REUSED)
+                else:
+                    await _send_stored(send, stored, replayed=True)
+                return
+
+            start: dict = {}
+            response_chunks: list[bytes] = []
+
+            async def capture_send(message: dict) -> None:
+                if message["type"] == "http.response.start":
+                    start.update(message)
+                elif message["type"] == "http.response.body":
+                    response_chunks.append(message.get("body", b""))
+                await send(message)
+
+            await self.app(scope, replaying_receive(body, receive), capture_send)
+            status_code = start.get("status", 500)
+            if status_code < 500:
+                stored = StoredResponse(request_hash, status_code, list(start.get("headers", [])), b"".join(response_chunks))
+                if store.db_enabled:
+                    await run_in_threadpool(store.put, key, stored)
+                else:
+                    store.put(key, stored)
+        finally:
+            store.release(key)
+
+
+async def _send_stored(send: Callable, stored: StoredResponse, *, replayed: bool = False) -> None:
+    headers = list(stored.headers)
+    if replayed:
+        headers.append((b"idempotent-replayed", b"true"))
+    await send({"type": "http.response.start", "status": stored.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": stored.body})
+
+
+_settings = get_settings()
+idempotency_store = IdempotencyStore(
+    max_size=_settings.idempotency_cache_size,
+    ttl_seconds=_settings.idempotency_ttl_seconds,
+    db_enabled=_settings.idempotency_db_enabled,
+)
@@ -0,0 +1,211 @@
+"""
+Per-client token-bucket rate limiting and in-flight load shedding (opt-in: RATE_LIMIT_ENABLED).
+
+Runs as the outermost ASGI layer after CORS, so an over-limit request is answered with a 429
+and Retry-After before routing, DB sessions or argon2 verification. Clients are identified
+without touching the database, so nothing they can make up picks the bucket: reads, votes and
+auth routes are keyed by client IP, writes (which require a valid credential) by IP plus the
+credential header. Each route class (read, write, vote, auth) has its own buckets, stored as
+{16-byte key: [tokens, updated_at]} and swept once a minute of the idle entries that have
+refilled completely.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import time
+from typing import Any, Callable, Optional
+
+from app.core.asgi import client_ip, credential_header, send_json
+from app.core.config import get_settings
+
+
+VOTE_PATHS = ("/v1/arena/vote", "/v1/arena/votes:batch")
+# Long-lived connections; counting them against the in-flight cap would shed everything else.
+UNSHED_PATHS = ("/v1/arena/stream",)
+SWEEP_INTERVAL_SECONDS = 60.0
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Route class whose bucket a request draws from, or None when it is not limited."""
+    if not path.startswith("/v1/") or path.startswith("/v1/admin/"):
+        return None
+    if method == "POST":
+        if path in VOTE_PATHS:
+            return "vote"
+        if path.startswith("/v1/agents/"):
+            # register, token and onboarding all hash or verify with argon2.
+            return "auth"
+        return "write"
+    if method == "GET":
+        return "read"
+    return None
+
+
+class TokenBucket:
+    """Buckets for one route class: rate tokens per second, up to capacity."""
+
+    def __init__(self, per_minute: float, capacity: int) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = float(max(1, capacity))
+        self._buckets: dict[bytes, list[float]] = {}
+
+    def take(self, key: bytes, now: float) -> float:
+        """Spend one token; returns 0.0 if allowed, else the seconds until one is available."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [self.capacity - 1.0, now]
+            return 0.0
+        tokens = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1.0:
+            bucket[0] = tokens - 1.0
+            return 0.0
+        bucket[0] = tokens
+        return (1.0 - tokens) / self.rate
+
+    def sweep(self, now: float) -> int:
+        """Drop buckets that would be full again: they behave exactly like a new key."""
+        refill = self.capacity / self.rate
+        idle = [key for key, (_, updated_at) in self._buckets.items() if now - updated_at >= refill]
+        for key in idle:
+            del self._buckets[key]
+        return len(idle)
+
+    def trim(self, max_keys: int) -> int:
+        """Drop the oldest-created buckets beyond max_keys (dicts keep insertion order)."""
+        excess = len(self._buckets) - max_keys
+        if excess <= 0:
+            return 0
+        for key in list(self._buckets)[:excess]:
+            del self._buckets[key]
+        return excess
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimiter:
+    """
+    Token buckets per route class plus a cap on concurrent requests. Only used from the event
+    loop thread, so no locking.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        per_minute: dict[str, float],
+        burst_seconds: float,
+        max_keys: int,
+        max_in_flight: int,
+        trust_forwarded: bool,
+    ) -> None:
+        self.enabled = enabled
+        self.buckets = {
+            name: TokenBucket(rate, math.ceil(rate * burst_seconds / 60.0))
+            for name, rate in per_minute.items()
+            if rate > 0
+        }
+        self.max_keys = max_keys
+        self.max_in_flight = max_in_flight
+        self.trust_forwarded = trust_forwarded
+        self.in_flight = 0
+        self._next_sweep = 0.0
+        self.allowed = 0
+        self.limited: dict[str, int] = {name: 0 for name in self.buckets}
+        self.shed = 0
+        self.evicted = 0
+
+    def client_key(self, scope: dict, route: str) -> bytes:
+        """
+        Bucket key: the client IP, plus the credential header on write routes only. Public and
+        auth routes ignore headers and voter_key, which are unverified here and would otherwise
+        give every invented value a fresh bucket; an invented credential on a write only earns
+        a 401.
+        """
+        material = client_ip(scope, trust_forwarded=self.trust_forwarded).encode("utf-8")
+        if route == "write":
+            material += b"\0" + (credential_header(scope) or b"")
+        return hashlib.sha256(material).digest()[:16]
+
+    def check(self, route: str, key: bytes) -> float:
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._next_sweep = now + SWEEP_INTERVAL_SECONDS
+            for bucket in self.buckets.values():
+                self.evicted += bucket.sweep(now) + bucket.trim(self.max_keys)
+        wait = self.buckets[route].take(key, now)
+        if wait:
+            self.limited[route] += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "allowed": self.allowed,
+            "limited": dict(self.limited),
+            "shed": self.shed,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "keys": {name: len(bucket) for name, bucket in self.buckets.items()},
+            "evicted": self.evicted,
+        }
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        limiter = rate_limiter
+        if scope["type"] != "http" or not limiter.enabled:
+            await self.app(scope, receive, send)
+            return
+        route = classify(scope["method"], scope["path"])
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        if route in limiter.buckets:
+            wait = limiter.check(route, limiter.client_key(scope, route))
+            if wait:
+                await send_json(
+                    send,
+                    429,
+                    {"detail": "Rate limit exceeded"},
+                    [(b"retry-after", str(max(1, math.ceil(wait))).encode("ascii"))],
+                )
+                return
+
+        if not limiter.max_in_flight or scope["path"] in UNSHED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        if limiter.in_flight >= limiter.max_in_flight:
+            limiter.shed += 1
+            await send_json(send, 503, {"detail": "Server busy, retry shortly"}, [(b"retry-after", b"1")])
+            return
+        limiter.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.in_flight -= 1
+
+
+_settings = get_settings()
+rate_limiter = RateLimiter(
+    enabled=_settings.rate_limit_enabled,
+    per_minute={
+        "read": _settings.rate_limit_read_per_minute,
+        "write": _settings.rate_limit_write_per_minute,
+        "vote": _settings.rate_limit_vote_per_minute,
+        "auth": _settings.rate_limit_auth_per_minute,
+    },
+    burst_seconds=_settings.rate_limit_burst_seconds,
+    max_keys=_settings.rate_limit_max_keys,
+    max_in_flight=_settings.rate_limit_max_in_flight,
+    trust_forwarded=_settings.rate_limit_trust_forwarded,
+)
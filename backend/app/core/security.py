@@ -1,13 +1,322 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
 from passlib.context import CryptContext
 
+from app.core.config import DEFAULT_SECRET_KEY, get_settings
+
+
+logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
 
-def hash_api_key(api_key: str) -> str:
+class HashPoolSaturated(Exception):
+    """Raised when the password-hash pool has no free slot; mapped to 503 + Retry-After."""
+
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("Password hashing capacity exhausted")
+        self.retry_after_seconds = retry_after_seconds
+
+
+def _hash(api_key: str) -> str:
     return pwd_context.hash(api_key)
 
 
-def verify_api_key(plain_api_key: str, hashed_api_key: str) -> bool:
+def _verify(plain_api_key: str, hashed_api_key: str) -> bool:
     return pwd_context.verify(plain_api_key, hashed_api_key)
 
+
+def _timed_call(fn: Callable[..., Any], *args: Any) -> tuple[Any, float, float]:
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time()
+
+
+class PasswordHashPool:
+    """
+    Runs argon2 work in a dedicated process pool so it neither holds the GIL of the API worker
+    nor scales with the Starlette threadpool. At most `workers + queue_size` calls may be in
+    flight; beyond that callers get HashPoolSaturated immediately instead of queueing unbounded.
+    With workers == 0 hashing runs inline (previous behaviour) and is only counted.
+    """
+
+    def __init__(self, workers: int, queue_size: int, retry_after_seconds: int) -> None:
+        self.workers = workers
+        self.capacity = workers + max(queue_size, 0)
+        self.retry_after_seconds = retry_after_seconds
+        self._slots = threading.BoundedSemaphore(self.capacity) if workers > 0 else None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.queue_wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _track(self, delta: int) -> None:
+        with self._lock:
+            self.in_flight += delta
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashPoolSaturated(self.retry_after_seconds)
+        submitted_at = time.time()
+        self._track(1)
+        with self._lock:
+            self.submitted += 1
+        try:
+            if self._slots is None:
+                result, started, finished = _timed_call(fn, *args)
+            else:
+                try:
+                    result, started, finished = self._get_executor().submit(_timed_call, fn, *args).result()
+                except BrokenProcessPool:
+                    with self._lock:
+                        self._executor = None
+                    raise
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            self._track(-1)
+            if self._slots is not None:
+                self._slots.release()
+        with self._lock:
+            self.completed += 1
+            self.queue_wait_seconds_total += max(0.0, started - submitted_at)
+            self.run_seconds_total += max(0.0, finished - started)
+        return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "mode": "process_pool" if self.workers > 0 else "inline",
+                "workers": self.workers,
+                "capacity": self.capacity if self.workers > 0 else None,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "failed": self.failed,
+                "avg_queue_wait_ms": 1000 * self.queue_wait_seconds_total / done,
+                "avg_run_ms": 1000 * self.run_seconds_total / done,
+            }
+
+
+def hash_api_key(api_key: str) -> str:
+    return hash_pool.run(_hash, api_key)
+
+
+def verify_api_key(plain_api_key: str, hashed_api_key: str) -> bool:
+    return hash_pool.run(_verify, plain_api_key, hashed_api_key)
+
+
+def api_key_fingerprint(api_key: str) -> str:
+    """
+    Non-secret, indexable identifier for an API key (hex SHA-256).
+
+    API keys are 32 random bytes, so an unsalted digest cannot be brute-forced; it is only
+    used to find the candidate agent row. The argon2 hash remains the actual verifier.
+    """
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _key_hash_binding(api_key_hash: str) -> str:
+    return hashlib.sha256(api_key_hash.encode("utf-8")).hexdigest()[:16]
+
+
+_process_secret: Optional[bytes] = None
+_process_secret_lock = threading.Lock()
+
+
+def _signing_key() -> bytes:
+    """
+    SECRET_KEY, or a random per-process key (with a warning) when it is unset or still the
+    placeholder, so tokens are never signed with a publicly known key. Such tokens stop
+    working on restart and are not accepted by other workers.
+    """
+    secret_key = get_settings().secret_key
+    if secret_key and secret_key != DEFAULT_SECRET_KEY:
+        return secret_key.encode("utf-8")
+    global _process_secret
+    with _process_secret_lock:
+        if _process_secret is None:
+            logger.warning("SECRET_KEY is not set; signing session tokens with a random per-process key")
+            _process_secret = secrets.token_bytes(32)
+        return _process_secret
+
+
+def _sign(message: bytes) -> bytes:
+    return hmac.new(_signing_key(), message, hashlib.sha256).digest()
+
+
+def create_session_token(agent_id: uuid.UUID, api_key_hash: str) -> tuple[str, int]:
+    """
+    Return (token, expires_at unix seconds) for a short-lived bearer token.
+
+    The payload binds to the agent's current api_key_hash, so rotating the API key
+    invalidates outstanding tokens. Format: base64url(payload).base64url(hmac-sha256).
+    """
+    expires_at = int(time.time()) + get_settings().session_token_ttl_seconds
+    payload = json.dumps(
+        {"sub": str(agent_id), "exp": expires_at, "kh": _key_hash_binding(api_key_hash)},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    body = _b64encode(payload)
+    return f"{body}.{_b64encode(_sign(body.encode('ascii')))}", expires_at
+
+
+def verify_session_token(token: str) -> Optional[tuple[uuid.UUID, str]]:
+    """Return (agent_id, key binding) if the signature is valid and unexpired, else None."""
+    try:
+        body, signature = token.split(".", 1)
+        if not hmac.compare_digest(_b64decode(signature), _sign(body.encode("ascii"))):
+            return None
+        claims = json.loads(_b64decode(body))
+        if int(claims["exp"]) <= time.time():
+            return None
+        return uuid.UUID(claims["sub"]), str(claims["kh"])
+    except (ValueError, KeyError, TypeError, UnicodeError):
+        return None
+
+
+def session_token_matches(binding: str, api_key_hash: str) -> bool:
+    return hmac.compare_digest(binding, _key_hash_binding(api_key_hash))
+
+
+class CredentialCache:
+    """
+    In-process LRU of API keys that recently passed argon2 verification.
+
+    Keys are stored as an HMAC digest under a per-process random secret, never in plaintext.
+    Each entry remembers the agent's api_key_hash at verification time; callers compare it with
+    the current row so a rotated key (e.g. onboarding claim in another worker) is never honoured.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._secret = secrets.token_bytes(32)
+        self._entries: "OrderedDict[str, tuple[uuid.UUID, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _digest(self, api_key: str) -> str:
+        return hmac.new(self._secret, api_key.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def get(self, api_key: str) -> Optional[tuple[uuid.UUID, str]]:
+        """Return (agent_id, api_key_hash) for a recently verified key, or None."""
+        if self.max_size <= 0:
+            return None
+        digest = self._digest(api_key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            agent_id, key_hash, expires_at = entry
+            if expires_at <= now:
+                del self._entries[digest]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return agent_id, key_hash
+
+    def put(self, api_key: str, agent_id: uuid.UUID, api_key_hash: str) -> None:
+        if self.max_size <= 0:
+            return
+        digest = self._digest(api_key)
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[digest] = (agent_id, api_key_hash, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_agent(self, agent_id: uuid.UUID) -> None:
+        """Drop every cached key for an agent (call when its api_key_hash changes)."""
+        with self._lock:
+            stale = [d for d, (aid, _, _) in self._entries.items() if aid == agent_id]
+            for digest in stale:
+                del self._entries[digest]
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+_settings = get_settings()
+hash_pool = PasswordHashPool(
+    workers=_settings.hash_pool_workers,
+    queue_size=_settings.hash_pool_queue_size,
+    retry_after_seconds=_settings.hash_pool_retry_after_seconds,
+)
+credential_cache = CredentialCache(
+    max_size=_settings.credential_cache_size,
+    ttl_seconds=_settings.credential_cache_ttl_seconds,
+)
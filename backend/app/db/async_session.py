@@ -0,0 +1,59 @@
+"""
+Optional asyncio engine (DATABASE_ASYNC=true): asyncpg for Postgres, aiosqlite for SQLite.
+
+The engine is created on first use so the async drivers are only needed when the option is on.
+ORM code stays synchronous and runs through AsyncSession.run_sync (see app/db/runner.py), so a
+request waiting on the database holds a coroutine instead of a threadpool thread.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import get_settings
+
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+_sessionmakers: dict[bool, Any] = {}
+
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with its driver swapped for the asyncio one (e.g. psycopg2 -> asyncpg)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r}; set DATABASE_ASYNC_URL")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def async_enabled() -> bool:
+    return get_settings().database_async
+
+
+def get_async_sessionmaker(read: bool = False) -> Any:
+    """Async sessionmaker for the primary, or for DATABASE_READ_URL when read is True."""
+    if read not in _sessionmakers:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        from app.db.session import engine_options
+
+        settings = get_settings()
+        if read:
+            url = async_database_url(settings.database_read_url)
+        else:
+            url = settings.database_async_url or async_database_url(settings.database_url)
+        options = engine_options(url, settings)
+        # The async pool is SQLAlchemy's adapted QueuePool; asyncpg takes server settings directly.
+        options.pop("poolclass", None)
+        options.pop("future", None)
+        if make_url(url).get_backend_name() == "postgresql" and "connect_args" in options:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)}}
+        engine = create_async_engine(url, **options)
+        _sessionmakers[read] = async_sessionmaker(engine, autoflush=False, expire_on_commit=True)
+    return _sessionmakers[read]
@@ -0,0 +1,139 @@
+"""
+Instrumented connection pool: QueuePool plus counters for the admin metrics.
+
+Checkout wait (time spent in QueuePool._do_get, including opening a new connection when the
+pool may still grow) goes into a fixed-bucket histogram, so latency spikes that are really pool
+waits show up as such. Also tracked: timeouts, how long connections are held, and the age of
+every open connection (relevant to DB_POOL_RECYCLE and server-side idle limits).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import ConnectionPoolEntry, QueuePool
+
+
+# Upper bounds (ms) of the checkout-wait histogram buckets; the last bucket is unbounded.
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolMonitor:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.hold_total = 0.0
+        self.hold_count = 0
+        self.hold_max = 0.0
+        self._opened_at: dict[int, float] = {}
+
+    def record_wait(self, seconds: float) -> None:
+        ms = seconds * 1000
+        bucket = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if ms <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            self.checkouts += 1
+            self.wait_histogram[bucket] += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def attach(self, pool: QueuePool) -> None:
+        @event.listens_for(pool, "connect")
+        def _on_connect(dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+            with self._lock:
+                self.connects += 1
+                self._opened_at[id(record)] = time.monotonic()
+
+        @event.listens_for(pool, "close")
+        def _on_close(dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+            with self._lock:
+                self._opened_at.pop(id(record), None)
+
+        @event.listens_for(pool, "invalidate")
+        def _on_invalidate(dbapi_connection: Any, record: ConnectionPoolEntry, exception: Any) -> None:
+            with self._lock:
+                self.invalidations += 1
+
+        @event.listens_for(pool, "checkout")
+        def _on_checkout(dbapi_connection: Any, record: ConnectionPoolEntry, proxy: Any) -> None:
+            record.info["checked_out_at"] = time.monotonic()
+
+        @event.listens_for(pool, "checkin")
+        def _on_checkin(dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+            started = record.info.pop("checked_out_at", None)
+            if started is None:
+                return
+            held = time.monotonic() - started
+            with self._lock:
+                self.hold_count += 1
+                self.hold_total += held
+                self.hold_max = max(self.hold_max, held)
+
+    def stats(self, pool: QueuePool) -> dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - opened for opened in self._opened_at.values()]
+            labels = [f"le_{bound}ms" for bound in WAIT_BUCKETS_MS] + ["gt_%dms" % WAIT_BUCKETS_MS[-1]]
+            return {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "wait_histogram": dict(zip(labels, self.wait_histogram)),
+                "avg_wait_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 3),
+                "avg_hold_ms": round(self.hold_total / self.hold_count * 1000, 3) if self.hold_count else 0.0,
+                "max_hold_ms": round(self.hold_max * 1000, 3),
+                "open_connections": len(ages),
+                "oldest_connection_age_seconds": round(max(ages), 3) if ages else 0.0,
+                "avg_connection_age_seconds": round(sum(ages) / len(ages), 3) if ages else 0.0,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.monitor = PoolMonitor()
+        self.monitor.attach(self)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        # The replacement pool (after dispose/invalidation) keeps the same counters.
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.monitor.record_timeout()
+            raise
+        self.monitor.record_wait(time.perf_counter() - started)
+        return record
+
+
+def pool_stats(engine: Engine) -> dict[str, Any]:
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return {"class": "InstrumentedQueuePool", **pool.monitor.stats(pool)}
+    return {"class": type(pool).__name__, "status": pool.status()}
@@ -0,0 +1,131 @@
+"""
+Optional read replica (DATABASE_READ_URL) for the read-only routes, with read-your-writes.
+
+Reads go to the replica unless the caller wrote recently: ReadYourWritesMiddleware remembers
+every client that got a successful response to a write, under both its IP and its credential
+digest (app.core.asgi.client_identities), and for READ_YOUR_WRITES_SECONDS afterwards a read
+matching either goes to the primary. So an agent that writes with its API key and then reads the
+public state without one, or with a session token, still sees its own write. The window should
+exceed the replica's usual lag. Tracking is per worker process.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.asgi import client_identities
+from app.core.config import get_settings
+
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        read_url: Optional[str],
+        *,
+        window_seconds: float,
+        max_tracked: int,
+        trust_forwarded: bool,
+    ) -> None:
+        self.read_url = read_url
+        self.window_seconds = window_seconds
+        self.max_tracked = max_tracked
+        self.trust_forwarded = trust_forwarded
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._recent: "OrderedDict[bytes, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.read_url)
+
+    def session(self) -> Session:
+        if self._session_factory is None:
+            from app.db.session import create_db_engine
+
+            engine = create_db_engine(self.read_url, reader=True)
+            self._session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+        return self._session_factory()
+
+    def mark_write(self, scope: dict) -> None:
+        until = time.monotonic() + self.window_seconds
+        with self._lock:
+            for key in client_identities(scope, trust_forwarded=self.trust_forwarded):
+                self._recent[key] = until
+                self._recent.move_to_end(key)
+            while len(self._recent) > self.max_tracked:
+                self._recent.popitem(last=False)
+
+    def use_replica(self, scope: dict) -> bool:
+        """True when this read may be served by the replica; counts the decision."""
+        if not self.enabled:
+            return False
+        keys = client_identities(scope, trust_forwarded=self.trust_forwarded)
+        now = time.monotonic()
+        with self._lock:
+            pinned = False
+            for key in keys:
+                until = self._recent.get(key)
+                if until is not None and until <= now:
+                    del self._recent[key]
+                elif until is not None:
+                    pinned = True
+            if not pinned:
+                self.replica_reads += 1
+                return True
+            self.primary_reads += 1
+            return False
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "window_seconds": self.window_seconds,
+                "tracked_writers": len(self._recent),
+                "replica_reads": self.replica_reads,
+                "primary_reads": self.primary_reads,
+            }
+
+
+class ReadYourWritesMiddleware:
+    """Marks clients whose write requests under /v1/ succeeded (status < 400)."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        router = replica_router
+        if (
+            scope["type"] != "http"
+            or not router.enabled
+            or scope["method"] not in WRITE_METHODS
+            or not scope["path"].startswith("/v1/")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def marking_send(message: dict) -> None:
+            # Mark before the response leaves, so a read sent right after it is already pinned.
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                router.mark_write(scope)
+            await send(message)
+
+        await self.app(scope, receive, marking_send)
+
+
+_settings = get_settings()
+replica_router = ReplicaRouter(
+    _settings.database_read_url,
+    window_seconds=_settings.read_your_writes_seconds,
+    max_tracked=_settings.read_your_writes_max_tracked,
+    trust_forwarded=_settings.rate_limit_trust_forwarded,
+)
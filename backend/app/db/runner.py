@@ -0,0 +1,58 @@
+"""
+Request-scoped database access for async route handlers.
+
+DbRunner.run(fn, *args) calls fn(session, *args) with a synchronous Session: in the threadpool
+on the default engine, or through AsyncSession.run_sync when DATABASE_ASYNC is enabled. Route
+code and services are written once against Session either way.
+"""
+
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.db.async_session import async_enabled, get_async_sessionmaker
+
+
+T = TypeVar("T")
+
+# Session.info flag set on replica sessions handed out by get_read_db.
+REPLICA_KEY = "replica"
+
+
+class DbRunner:
+    def __init__(self, session: Any, *, is_async: bool) -> None:
+        self.session = session
+        self.is_async = is_async
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.is_async:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+    async def release(self) -> None:
+        """Return the connection to the pool (e.g. before a long wait); the session stays usable."""
+        if self.is_async:
+            await self.session.close()
+        else:
+            self.session.close()
+
+
+def runner_dependency(get_db: Callable[..., Any]) -> Callable[..., AsyncIterator[DbRunner]]:
+    """
+    Build a DbRunner dependency on top of a router's get_db, so overriding get_db (as the tests
+    do) also redirects the sync-engine runner.
+    """
+
+    async def get_db_runner(db: Session = Depends(get_db)) -> AsyncIterator[DbRunner]:
+        if not async_enabled():
+            yield DbRunner(db, is_async=False)
+            return
+        # get_read_db tags the session it picked, so the async side makes the same choice.
+        async with get_async_sessionmaker(read=db.info.get(REPLICA_KEY, False))() as session:
+            yield DbRunner(session, is_async=True)
+
+    return get_db_runner
@@ -1,12 +1,98 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
+from typing import Any, Optional
 
-from app.core.config import get_settings
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import Settings, get_settings
+from app.db.pool import InstrumentedQueuePool
 
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url, future=True)
+
+def is_sqlite_file(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def engine_options(url: str, settings: Settings, *, reader: bool = False) -> dict[str, Any]:
+    """
+    create_engine() keyword arguments for the DB_POOL_* / DB_STATEMENT_TIMEOUT_MS settings.
+
+    With the SQLite profile (SQLITE_SINGLE_WRITER) the primary engine of a file database gets a
+    single connection, so concurrent writers queue in the pool instead of failing with
+    "database is locked"; reader engines keep the configured pool size.
+    """
+    parsed = make_url(url)
+    options: dict[str, Any] = {"future": True, "pool_pre_ping": settings.db_pool_pre_ping}
+    if parsed.get_backend_name() == "sqlite" and not is_sqlite_file(parsed):
+        # In-memory SQLite lives inside a single connection; keep SQLAlchemy's default pool.
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
+    if is_sqlite_file(parsed):
+        options["connect_args"] = {"timeout": settings.sqlite_busy_timeout_ms / 1000}
+        if settings.sqlite_single_writer and not reader:
+            options.update(pool_size=1, max_overflow=0)
+    if parsed.get_backend_name() == "postgresql" and settings.db_statement_timeout_ms > 0:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return options
+
+
+def sqlite_pragmas(settings: Settings, *, reader: bool = False) -> list[str]:
+    """PRAGMAs run on every new connection of a SQLite file engine."""
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}",
+        f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size)}",
+        # Negative cache_size is in KiB rather than pages.
+        f"PRAGMA cache_size = -{int(settings.sqlite_cache_size_kib)}",
+        f"PRAGMA synchronous = {settings.sqlite_synchronous}",
+    ]
+    if reader:
+        pragmas.append("PRAGMA query_only = ON")
+    elif settings.sqlite_wal:
+        # Persistent in the file: readers no longer block on (or block) the writer.
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")
+    return pragmas
+
+
+def create_db_engine(url: str, *, reader: bool = False) -> Engine:
+    settings = get_settings()
+    engine = create_engine(url, **engine_options(url, settings, reader=reader))
+    if is_sqlite_file(make_url(url)):
+        pragmas = sqlite_pragmas(settings, reader=reader)
+
+        @event.listens_for(engine, "connect")
+        def _apply_pragmas(dbapi_connection: Any, record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+    return engine
+
+
+def background_engine_for(engine: Engine) -> Engine:
+    """
+    Engine for one background writer (event writer, vote buffer). On the single-writer SQLite
+    profile it is a dedicated one-connection engine on the same file: a request (or the vote
+    buffer) waiting for an EVENT_WRITER_MODE=flush batch still holds its own connection, so the
+    writer cannot share it; busy_timeout orders the writers. Otherwise the engine itself.
+    """
+    if not (get_settings().sqlite_single_writer and is_sqlite_file(engine.url)):
+        return engine
+    return create_db_engine(engine.url.render_as_string(hide_password=False))
+
+
+engine = create_db_engine(settings.database_url)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -15,3 +101,28 @@ SessionLocal = sessionmaker(
     future=True,
 )
 
+
+_readers: dict[str, sessionmaker] = {}
+_readers_lock = threading.Lock()
+
+
+def reader_session_for(db: Session) -> Optional[Session]:
+    """
+    A read-only session on the same SQLite file as db, served by a multi-connection reader
+    engine, when the single-writer profile is on; otherwise None (read through db itself).
+    """
+    settings = get_settings()
+    if not settings.sqlite_single_writer:
+        return None
+    url = db.get_bind().url
+    if not is_sqlite_file(url):
+        return None
+    key = url.render_as_string(hide_password=False)
+    with _readers_lock:
+        factory = _readers.get(key)
+        if factory is None:
+            factory = sessionmaker(
+                autocommit=False, autoflush=False, bind=create_db_engine(key, reader=True), future=True
+            )
+            _readers[key] = factory
+    return factory()
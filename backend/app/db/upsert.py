@@ -0,0 +1,48 @@
+from typing import Any, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+
+def _dialect_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def insert_ignore_returning(db: Session, model: Any, rows: list[dict[str, Any]], returning: Sequence[Any]) -> list[Any]:
+    """
+    Multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING: one statement for the whole batch,
+    returning only the rows that were actually inserted.
+    """
+    if not rows:
+        return []
+    dialect_insert = _dialect_insert(db)
+    if dialect_insert is None:  # pragma: no cover - other backends are not deployed
+        inserted = []
+        for values in rows:
+            try:
+                with db.begin_nested():
+                    inserted.append(db.execute(insert(model).values(**values).returning(*returning)).one())
+            except IntegrityError:
+                continue
+        return inserted
+    stmt = dialect_insert(model).values(rows).on_conflict_do_nothing().returning(*returning)
+    return list(db.execute(stmt).all())
+
+
+def insert_ignore(db: Session, model: Any, values: dict[str, Any]) -> None:
+    """INSERT ... ON CONFLICT DO NOTHING on the model's primary key/unique constraints."""
+    dialect_insert = _dialect_insert(db)
+    if dialect_insert is None:  # pragma: no cover - other backends are not deployed
+        pk = {col.key: values[col.key] for col in model.__table__.primary_key.columns}
+        if db.get(model, tuple(pk.values()) if len(pk) > 1 else next(iter(pk.values()))) is None:
+            db.execute(insert(model).values(**values))
+        return
+    db.execute(dialect_insert(model).values(**values).on_conflict_do_nothing())
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, String
+from sqlalchemy import Boolean, DateTime, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -11,6 +11,7 @@ from app.db.base import Base
 
 class Agent(Base):
     __tablename__ = "agents"
+    __table_args__ = (Index("ix_agents_api_key_fingerprint", "api_key_fingerprint", unique=True),)
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -19,6 +20,8 @@ class Agent(Base):
     )
     display_name: Mapped[str] = mapped_column(String(length=255), nullable=False)
     api_key_hash: Mapped[str] = mapped_column(String(length=255), nullable=False)
+    # SHA-256 of the API key for indexed lookup; NULL for keys issued before 0007 (upgraded on first use).
+    api_key_fingerprint: Mapped[Optional[str]] = mapped_column(String(length=64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, Index
+from sqlalchemy import DDL, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, Index, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -11,7 +11,11 @@ from app.db.base import Base
 
 class Round(Base):
     __tablename__ = "rounds"
-    __table_args__ = (Index("ix_rounds_status", "status"),)
+    # Open-round lookups filter on status, then topic (dedupe) or the latest round_number.
+    __table_args__ = (
+        Index("ix_rounds_status_topic", "status", "topic"),
+        Index("ix_rounds_status_round_number", "status", "round_number"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -28,6 +32,10 @@ class Round(Base):
         ForeignKey("agents.id"),
         nullable=True,
     )
+    # Bumped by every write that changes what a reader of this round sees (cache/ETag key).
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    # Submissions + comments; incremented by the UPDATE that also decides auto-close.
+    contribution_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     submissions: Mapped[list["Submission"]] = relationship("Submission", back_populates="round")
     comments: Mapped[list["RoundComment"]] = relationship("RoundComment", back_populates="round")
@@ -38,7 +46,7 @@ class Submission(Base):
     __tablename__ = "submissions"
     __table_args__ = (
         UniqueConstraint("round_id", "agent_id", name="uq_submissions_round_agent"),
-        Index("ix_submissions_round_id", "round_id"),
+        Index("ix_submissions_round_created", "round_id", "created_at"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -58,6 +66,9 @@ class Submission(Base):
     )
     text: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Vote tallies maintained by /vote in the same transaction as the vote insert.
+    agree_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    disagree_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     round: Mapped["Round"] = relationship("Round", back_populates="submissions")
     agent: Mapped["Agent"] = relationship("Agent")
@@ -68,7 +79,7 @@ class Vote(Base):
     __tablename__ = "votes"
     __table_args__ = (
         UniqueConstraint("submission_id", "voter_key", name="uq_votes_submission_voter"),
-        Index("ix_votes_submission_id", "submission_id"),
+        Index("ix_votes_submission_value", "submission_id", "value"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -90,7 +101,7 @@ class Vote(Base):
 
 class RoundComment(Base):
     __tablename__ = "round_comments"
-    __table_args__ = (Index("ix_round_comments_round_id", "round_id"),)
+    __table_args__ = (Index("ix_round_comments_round_created", "round_id", "created_at"),)
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -113,3 +124,64 @@ class RoundComment(Base):
     round: Mapped["Round"] = relationship("Round", back_populates="comments")
     agent: Mapped["Agent"] = relationship("Agent")
 
+
+
+class AgentScore(Base):
+    """Global leaderboard row: agree votes across all of an agent's submissions. Maintained on write."""
+
+    __tablename__ = "leaderboard_scores"
+
+    agent_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("agents.id"),
+        primary_key=True,
+    )
+    display_name: Mapped[str] = mapped_column(String(length=255), nullable=False)
+    score: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+
+class RoundAgentScore(Base):
+    """Per-round leaderboard row: agree votes on the agent's submission in that round."""
+
+    __tablename__ = "round_leaderboard_scores"
+
+    round_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("rounds.id"),
+        primary_key=True,
+    )
+    agent_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("agents.id"),
+        primary_key=True,
+    )
+    display_name: Mapped[str] = mapped_column(String(length=255), nullable=False)
+    score: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+
+class ArenaVersion(Base):
+    """
+    Single-row counter bumped after every write that changes /v1/arena/state or /v1/arena/rounds,
+    so cache validation is one primary-key read (see app/services/versions.py).
+    """
+
+    __tablename__ = "arena_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+
+# The row must exist before the first bump; migration 0014 seeds it on migrated databases.
+event.listen(ArenaVersion.__table__, "after_create", DDL("INSERT INTO arena_version (id, version) VALUES (1, 0)"))
+
+
+# Leaderboards are read as (score desc, display_name, agent_id) range scans; agent_id is the
+# final tie-break of top() and rank_of(), so pages need no sort step.
+Index("ix_leaderboard_scores_rank", AgentScore.score.desc(), AgentScore.display_name, AgentScore.agent_id)
+Index(
+    "ix_round_leaderboard_scores_rank",
+    RoundAgentScore.round_id,
+    RoundAgentScore.score.desc(),
+    RoundAgentScore.display_name,
+    RoundAgentScore.agent_id,
+)
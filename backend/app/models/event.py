@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, String, JSON
+from sqlalchemy import DateTime, ForeignKey, Index, String, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -11,6 +11,8 @@ from app.db.base import Base
 
 class Event(Base):
     __tablename__ = "events"
+    # The event feed pages on (created_at, id) keyset cursors.
+    __table_args__ = (Index("ix_events_created_at_id", "created_at", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
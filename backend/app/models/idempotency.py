@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class IdempotencyRecord(Base):
+    """Stored response for an Idempotency-Key, shared across workers when IDEMPOTENCY_DB_ENABLED is set."""
+
+    __tablename__ = "idempotency_keys"
+
+    # SHA-256 of (method, path, caller credential, Idempotency-Key).
+    key: Mapped[str] = mapped_column(String(length=64), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(length=64), nullable=False)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=False)
+    headers: Mapped[list] = mapped_column(JSON, nullable=False)
+    body: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
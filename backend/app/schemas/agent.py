@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -18,3 +19,24 @@ class AgentResponse(BaseModel):
         from_attributes = True
 
 
+class SessionTokenResponse(BaseModel):
+    access_token: str
+    token_type: str
+    agent_id: UUID
+    expires_at: int
+    expires_in: int
+
+
+class PendingRound(BaseModel):
+    id: UUID
+    round_number: int
+    topic: str
+    contribution_count: int
+
+
+class PendingResponse(BaseModel):
+    agent_id: UUID
+    open_rounds: int
+    submitted: int
+    pending: int
+    rounds: List[PendingRound]
@@ -0,0 +1,45 @@
+from typing import List, Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+MAX_BATCH_VOTES = 100
+
+
+class VoteBatchItem(BaseModel):
+    submission_id: UUID
+    value: Literal["agree", "disagree"] = "agree"
+
+
+class VoteBatchRequest(BaseModel):
+    voter_key: str = Field(min_length=1, max_length=255)
+    votes: List[VoteBatchItem] = Field(min_length=1, max_length=MAX_BATCH_VOTES)
+
+
+class VoteBatchResult(BaseModel):
+    submission_id: UUID
+    status: Literal["ok", "duplicate", "closed", "not_found"]
+
+
+class VoteBatchResponse(BaseModel):
+    results: List[VoteBatchResult]
+
+
+MAX_HEARTBEAT_INTENTS = 10
+
+
+class HeartbeatTextIntent(BaseModel):
+    round_id: UUID
+    text: str
+
+
+class HeartbeatVotes(BaseModel):
+    voter_key: str = Field(min_length=1, max_length=255)
+    items: List[VoteBatchItem] = Field(min_length=1, max_length=MAX_BATCH_VOTES)
+
+
+class HeartbeatRequest(BaseModel):
+    submit: List[HeartbeatTextIntent] = Field(default_factory=list, max_length=MAX_HEARTBEAT_INTENTS)
+    comment: List[HeartbeatTextIntent] = Field(default_factory=list, max_length=MAX_HEARTBEAT_INTENTS)
+    votes: Optional[HeartbeatVotes] = None
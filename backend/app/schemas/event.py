@@ -24,4 +24,6 @@ class EventItem(BaseModel):
 class EventsPage(BaseModel):
     items: List[EventItem] = Field(default_factory=list)
     next_cursor: Optional[str] = None
+    # Cursor of the last item returned (or the request cursor if none); pass it back with ?wait= to long-poll.
+    resume_cursor: Optional[str] = None
 
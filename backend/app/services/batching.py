@@ -0,0 +1,159 @@
+"""
+Background worker that drains a bounded in-memory queue in size- and time-triggered batches.
+
+Producers call submit() from request threads and get a Future that resolves once the batch
+containing their item has been handled, so callers can choose between fire-and-forget and
+waiting for durability. A full queue raises queue.Full; the caller decides how to degrade.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STOP = object()
+
+
+class BatchingWorker(Generic[T]):
+    def __init__(
+        self,
+        name: str,
+        handle_batch: Callable[[list[T]], None],
+        *,
+        max_queue: int,
+        batch_size: int,
+        flush_interval: float,
+    ) -> None:
+        self.name = name
+        self.handle_batch = handle_batch
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = False
+        self.submitted = 0
+        self.handled = 0
+        self.batches = 0
+        self.failed = 0
+        self.rejected = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None and not self._stopping:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit(self, item: T) -> "Future[None]":
+        """Queue one item; raises queue.Full when the buffer is at capacity or shutting down."""
+        self._ensure_started()
+        future: "Future[None]" = Future()
+        # Checked under the lock shutdown() sets _stopping with, so nothing is queued behind _STOP.
+        with self._lock:
+            if self._stopping:
+                raise queue.Full
+            try:
+                self._queue.put_nowait((item, future, time.perf_counter()))
+            except queue.Full:
+                self.rejected += 1
+                raise
+            self.submitted += 1
+        return future
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+            self._handle(batch)
+            if stop:
+                self._drain()
+                return
+
+    def _drain(self) -> None:
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is not _STOP:
+                    batch.append(entry)
+            if not batch:
+                return
+            self._handle(batch)
+
+    def _handle(self, batch: list[tuple[T, "Future[None]", float]]) -> None:
+        error: Optional[BaseException] = None
+        try:
+            self.handle_batch([item for item, _, _ in batch])
+        except Exception as exc:  # keep the worker alive; callers waiting on futures see the error
+            logger.exception("%s: batch of %d failed", self.name, len(batch))
+            error = exc
+        done = time.perf_counter()
+        with self._lock:
+            self.batches += 1
+            if error is None:
+                self.handled += len(batch)
+            else:
+                self.failed += len(batch)
+            for _, _, queued_at in batch:
+                latency = done - queued_at
+                self._latency_total += latency
+                self._latency_max = max(self._latency_max, latency)
+        for _, future, _ in batch:
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting items, flush everything already queued, then stop the thread."""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            completed = self.handled + self.failed
+            return {
+                "queue_depth": self._queue.qsize(),
+                "submitted": self.submitted,
+                "handled": self.handled,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "batches": self.batches,
+                "avg_latency_ms": round(self._latency_total / completed * 1000, 3) if completed else 0.0,
+                "max_latency_ms": round(self._latency_max * 1000, 3),
+            }
@@ -1,10 +1,142 @@
+import base64
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 import uuid
 
+from sqlalchemy import and_, event as sa_event, insert, or_
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
 from app.models.event import Event
+from app.services.batching import BatchingWorker
+from app.services.stream import event_hub, make_stream_item
+
+
+# Session.info keys holding snapshots of events logged in the current transaction: inserted by
+# the transaction itself (sync mode) or handed to the background writer once it commits.
+_PENDING_KEY = "pending_stream_events"
+_DEFERRED_KEY = "deferred_events"
+
+
+def _publish(snapshots: list[dict[str, Any]]) -> None:
+    event_hub.publish(
+        [make_stream_item(e, encode_cursor(e["created_at"], e["id"])) for e in snapshots]
+    )
+
+
+class EventWriter:
+    """
+    Optional background writer for the event log. In "async" mode events are queued and
+    bulk-inserted in batches; in "flush" mode the caller also waits for its batch to commit.
+    A full queue degrades to an inline insert rather than dropping events. "sync" disables it.
+
+    created_at is stamped when a batch is inserted, not when the event was logged, and inserts
+    are serialized, so the (created_at, id) cursor order is the commit order within the process:
+    a /v1/events or stream cursor never moves past a row that commits later.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        *,
+        bind: Optional[Engine] = None,
+        queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        flush_timeout: float,
+    ) -> None:
+        self.mode = mode
+        self._bind = bind
+        self.flush_timeout = flush_timeout
+        self.inline_writes = 0
+        self._insert_lock = threading.Lock()
+        self._last_stamp: Optional[datetime] = None
+        self.worker: BatchingWorker[dict[str, Any]] = BatchingWorker(
+            "event-writer",
+            self._insert,
+            max_queue=queue_size,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "sync"
+
+    def _engine(self) -> Engine:
+        if self._bind is None:
+            from app.db.session import background_engine_for, engine
+
+            self._bind = background_engine_for(engine)
+        return self._bind
+
+    def _insert(self, snapshots: list[dict[str, Any]]) -> None:
+        with self._insert_lock:
+            # Never behind the previous batch, even if the wall clock steps back.
+            now = datetime.now(timezone.utc)
+            if self._last_stamp is not None and now < self._last_stamp:
+                now = self._last_stamp
+            self._last_stamp = now
+            for snapshot in snapshots:
+                snapshot["created_at"] = now
+            with self._engine().begin() as conn:
+                conn.execute(insert(Event), snapshots)
+        _publish(snapshots)
+
+    def write(self, snapshots: list[dict[str, Any]]) -> None:
+        futures = []
+        for i, snapshot in enumerate(snapshots):
+            try:
+                futures.append(self.worker.submit(snapshot))
+            except queue.Full:
+                self.inline_writes += len(snapshots) - i
+                self._insert(snapshots[i:])
+                break
+        if self.mode == "flush":
+            for future in futures:
+                future.result(timeout=self.flush_timeout)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        self.worker.shutdown(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        return {"mode": self.mode, "inline_writes": self.inline_writes, **self.worker.stats()}
+
+
+def encode_cursor(created_at: datetime, event_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{event_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("utf-8")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Inverse of encode_cursor; raises ValueError on malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8")
+        created_str, id_str = raw.split("|", 1)
+        return datetime.fromisoformat(created_str), uuid.UUID(id_str)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def events_after(db: Session, cursor: Optional[str], *, limit: int) -> list[Event]:
+    """Events strictly after cursor (oldest first); from the start of the log if cursor is None."""
+    query = db.query(Event)
+    if cursor:
+        created_at, event_id = decode_cursor(cursor)
+        # The redundant >= bound lets the planner seek into (created_at, id) instead of
+        # walking the index from the start of the log.
+        query = query.filter(
+            Event.created_at >= created_at,
+            or_(
+                Event.created_at > created_at,
+                and_(Event.created_at == created_at, Event.id > event_id),
+            ),
+        )
+    return query.order_by(Event.created_at.asc(), Event.id.asc()).limit(limit).all()
 
 
 def log_event(
@@ -13,16 +145,88 @@ def log_event(
     event_type: str,
     payload: dict[str, Any],
     actor_agent_id: Optional[uuid.UUID] = None,
+    commit: bool = True,
 ) -> Event:
+    """
+    Append an event. With commit=False the row is only added to the session, to be flushed and
+    committed together with the caller's domain rows (one transaction, no refresh); it is
+    published to stream subscribers only if that commit succeeds.
+
+    When the background event writer is enabled the event is handed to it instead (after the
+    caller's commit for commit=False), and the returned Event is transient; the writer sets the
+    stored created_at.
+    """
     now = datetime.now(timezone.utc)
     event = Event(
+        id=uuid.uuid4(),
         type=event_type,
         payload=payload,
         actor_agent_id=actor_agent_id,
         created_at=now,
     )
+    # Snapshot now: attributes are expired by the time after_commit runs.
+    snapshot = {
+        "id": event.id,
+        "type": event_type,
+        "payload": payload,
+        "actor_agent_id": actor_agent_id,
+        "created_at": now,
+    }
+    if event_writer.enabled:
+        if commit:
+            event_writer.write([snapshot])
+        else:
+            db.info.setdefault(_DEFERRED_KEY, []).append(snapshot)
+        return event
     db.add(event)
-    db.commit()
-    db.refresh(event)
+    db.info.setdefault(_PENDING_KEY, []).append(snapshot)
+    if commit:
+        db.commit()
+        db.refresh(event)
     return event
 
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_committed_events(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _publish(pending)
+    deferred = session.info.pop(_DEFERRED_KEY, None)
+    if deferred:
+        event_writer.write(deferred)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_events(session: Session) -> None:
+    if session.in_nested_transaction():
+        # A SAVEPOINT rollback: the outer transaction, and the events it logged, may still commit.
+        return
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_DEFERRED_KEY, None)
+
+
+@contextmanager
+def savepoint(db: Session) -> Iterator[None]:
+    """
+    db.begin_nested() that also forgets the events logged inside it if it rolls back, so they
+    are neither published nor handed to the event writer when the outer transaction commits.
+    """
+    marks = {key: len(db.info.get(key, ())) for key in (_PENDING_KEY, _DEFERRED_KEY)}
+    try:
+        with db.begin_nested():
+            yield
+    except Exception:
+        for key, mark in marks.items():
+            if key in db.info:
+                del db.info[key][mark:]
+        raise
+
+
+_settings = get_settings()
+event_writer = EventWriter(
+    _settings.event_writer_mode,
+    queue_size=_settings.event_writer_queue_size,
+    batch_size=_settings.event_writer_batch_size,
+    flush_interval=_settings.event_writer_flush_interval_seconds,
+    flush_timeout=_settings.event_writer_flush_timeout_seconds,
+)
@@ -0,0 +1,99 @@
+"""
+Incrementally maintained leaderboards (global and per round).
+
+Writers call record_submission / record_agree_votes inside their own transaction; readers use
+top() and rank_of(), which are range reads on the (score desc, display_name, agent_id) indexes.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any, Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.db.upsert import insert_ignore
+from app.models.arena import AgentScore, RoundAgentScore
+
+
+def record_submission(db: Session, *, agent_id: uuid.UUID, display_name: str, round_id: uuid.UUID) -> None:
+    """Ensure the agent has global and per-round leaderboard rows (score 0 for a new submission)."""
+    insert_ignore(db, AgentScore, {"agent_id": agent_id, "display_name": display_name, "score": 0})
+    insert_ignore(
+        db,
+        RoundAgentScore,
+        {"round_id": round_id, "agent_id": agent_id, "display_name": display_name, "score": 0},
+    )
+
+
+def record_agree_votes(db: Session, *, agent_id: uuid.UUID, round_id: uuid.UUID, count: int = 1) -> None:
+    """Add agree votes on the agent's submission in round_id to both leaderboards."""
+    if count == 0:
+        return
+    db.query(AgentScore).filter(AgentScore.agent_id == agent_id).update(
+        {AgentScore.score: AgentScore.score + count}, synchronize_session=False
+    )
+    db.query(RoundAgentScore).filter(
+        RoundAgentScore.round_id == round_id, RoundAgentScore.agent_id == agent_id
+    ).update({RoundAgentScore.score: RoundAgentScore.score + count}, synchronize_session=False)
+
+
+def _table(round_id: Optional[uuid.UUID]):
+    if round_id is None:
+        return AgentScore, []
+    return RoundAgentScore, [RoundAgentScore.round_id == round_id]
+
+
+def top(
+    db: Session,
+    *,
+    round_id: Optional[uuid.UUID] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[dict[str, Any]]:
+    """Leaderboard page ordered by score desc, display_name asc, agent_id asc."""
+    model, filters = _table(round_id)
+    rows = (
+        db.query(model.agent_id, model.display_name, model.score)
+        .filter(*filters)
+        .order_by(model.score.desc(), model.display_name.asc(), model.agent_id.asc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return [
+        {"rank": offset + i + 1, "agent_id": str(aid), "agent_name": name, "score": int(score)}
+        for i, (aid, name, score) in enumerate(rows)
+    ]
+
+
+def rank_of(db: Session, agent_id: uuid.UUID, *, round_id: Optional[uuid.UUID] = None) -> Optional[dict[str, Any]]:
+    """Rank of one agent (1-based, same ordering as top()), or None if it has no leaderboard row."""
+    model, filters = _table(round_id)
+    row = db.query(model).filter(model.agent_id == agent_id, *filters).first()
+    if row is None:
+        return None
+    ahead = (
+        db.query(func.count())
+        .select_from(model)
+        .filter(
+            *filters,
+            or_(
+                model.score > row.score,
+                and_(model.score == row.score, model.display_name < row.display_name),
+                and_(
+                    model.score == row.score,
+                    model.display_name == row.display_name,
+                    model.agent_id < row.agent_id,
+                ),
+            ),
+        )
+        .scalar()
+    )
+    return {
+        "rank": int(ahead or 0) + 1,
+        "agent_id": str(row.agent_id),
+        "agent_name": row.display_name,
+        "score": row.score,
+    }
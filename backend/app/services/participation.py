@@ -0,0 +1,42 @@
+"""
+Per-agent view of the open rounds: which ones the agent has already submitted to.
+
+The outer join on submissions (round_id, agent_id) is answered by the uq_submissions_round_agent
+index, so the cost depends on the number of open rounds, not on how many submissions exist.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any
+
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from app.models.arena import Round, Submission
+
+
+MAX_OPEN_ROUNDS = 200
+
+
+def open_rounds_for_agent(db: Session, agent_id: uuid.UUID, *, limit: int = MAX_OPEN_ROUNDS) -> list[dict[str, Any]]:
+    """Open rounds, newest first, each with the agent's submission id (None if not yet submitted)."""
+    rows = (
+        db.query(Round.id, Round.round_number, Round.topic, Round.contribution_count, Submission.id)
+        .outerjoin(Submission, and_(Submission.round_id == Round.id, Submission.agent_id == agent_id))
+        .filter(Round.status == "open")
+        .order_by(Round.round_number.desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "id": str(round_id),
+            "round_number": round_number,
+            "topic": topic,
+            "contribution_count": contribution_count,
+            "submitted": submission_id is not None,
+            "submission_id": str(submission_id) if submission_id else None,
+        }
+        for round_id, round_number, topic, contribution_count, submission_id in rows
+    ]
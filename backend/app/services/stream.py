@@ -0,0 +1,151 @@
+"""
+In-process fan-out of committed events to long-lived HTTP connections (SSE, long-poll).
+
+Writers publish from any thread once their transaction has committed; each subscriber owns an
+asyncio queue on its event loop. A subscriber that falls too far behind is closed rather than
+buffered without bound; clients reconnect with Last-Event-ID and catch up from the event log.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from app.core.config import get_settings
+
+
+# Event types pushed on /v1/arena/stream.
+ARENA_STREAM_TYPES = frozenset(
+    {
+        "round_opened",
+        "topic_proposed",
+        "round_closed",
+        "submission_created",
+        "comment_created",
+        "vote_cast",
+    }
+)
+
+
+@dataclass(frozen=True)
+class StreamItem:
+    id: uuid.UUID
+    type: str
+    cursor: str
+    round_id: Optional[str]
+    frame: bytes
+
+
+def sse_frame(cursor: str, event_type: str, data: dict[str, Any]) -> bytes:
+    body = json.dumps(data, separators=(",", ":"))
+    return f"id: {cursor}\nevent: {event_type}\ndata: {body}\n\n".encode("utf-8")
+
+
+def make_stream_item(event: dict[str, Any], cursor: str) -> StreamItem:
+    """Build a StreamItem (with its SSE frame encoded once) from an event snapshot dict."""
+    payload = event.get("payload") or {}
+    round_id = payload.get("round_id")
+    data = {
+        "id": str(event["id"]),
+        "type": event["type"],
+        "payload": payload,
+        "actor_agent_id": str(event["actor_agent_id"]) if event.get("actor_agent_id") else None,
+        "created_at": event["created_at"].isoformat(),
+    }
+    return StreamItem(
+        id=event["id"],
+        type=event["type"],
+        cursor=cursor,
+        round_id=str(round_id) if round_id else None,
+        frame=sse_frame(cursor, event["type"], data),
+    )
+
+
+@dataclass(eq=False)
+class Subscription:
+    loop: asyncio.AbstractEventLoop
+    queue: "asyncio.Queue[Optional[StreamItem]]"
+    types: Optional[frozenset[str]] = None
+    round_id: Optional[str] = None
+    overflowed: bool = field(default=False)
+
+    def wants(self, item: StreamItem) -> bool:
+        if self.types is not None and item.type not in self.types:
+            return False
+        return self.round_id is None or item.round_id == self.round_id
+
+    def _offer(self, item: StreamItem) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Too slow: drop the connection (None is the close marker); the client resumes from the log.
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class EventHub:
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def subscribe(
+        self,
+        *,
+        types: Optional[frozenset[str]] = None,
+        round_id: Optional[str] = None,
+    ) -> Subscription:
+        """Register the calling coroutine's loop for future events. Must run inside an event loop."""
+        sub = Subscription(
+            loop=asyncio.get_running_loop(),
+            queue=asyncio.Queue(maxsize=self.queue_size),
+            types=types,
+            round_id=round_id,
+        )
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+            if sub.overflowed:
+                self.dropped_subscribers += 1
+
+    def publish(self, items: list[StreamItem]) -> None:
+        """Deliver committed events to every interested subscriber. Safe to call from any thread."""
+        if not items:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += len(items)
+        for sub in subscribers:
+            wanted = [item for item in items if sub.wants(item)]
+            if not wanted:
+                continue
+            try:
+                for item in wanted:
+                    sub.loop.call_soon_threadsafe(sub._offer, item)
+            except RuntimeError:  # loop already closed; connection is gone
+                self.unsubscribe(sub)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "dropped_subscribers": self.dropped_subscribers,
+            }
+
+
+event_hub = EventHub(queue_size=get_settings().stream_queue_size)
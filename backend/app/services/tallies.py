@@ -0,0 +1,199 @@
+"""
+Consistency check and rebuild for maintained aggregates: submission tallies
+(submissions.agree_count / disagree_count), the leaderboard score tables and
+rounds.contribution_count.
+
+Usage:
+    python -m app.services.tallies check     # report drift, exit 1 if any
+    python -m app.services.tallies rebuild   # recompute tallies from votes, then leaderboards and contribution counts
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Any
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.models.agent import Agent
+from app.models.arena import AgentScore, Round, RoundAgentScore, RoundComment, Submission, Vote
+from app.services.versions import bump_arena_version
+
+
+BATCH_SIZE = 1000
+
+
+def _iter_submission_batches(db: Session, batch_size: int):
+    last_id = None
+    while True:
+        query = db.query(Submission).order_by(Submission.id.asc())
+        if last_id is not None:
+            query = query.filter(Submission.id > last_id)
+        batch = query.limit(batch_size).all()
+        if not batch:
+            return
+        last_id = batch[-1].id
+        yield batch
+
+
+def _vote_tallies(db: Session, submission_ids: list) -> dict[Any, tuple[int, int]]:
+    rows = (
+        db.query(
+            Vote.submission_id,
+            func.sum(case((Vote.value == "agree", 1), else_=0)),
+            func.sum(case((Vote.value == "disagree", 1), else_=0)),
+        )
+        .filter(Vote.submission_id.in_(submission_ids))
+        .group_by(Vote.submission_id)
+        .all()
+    )
+    return {sid: (int(agrees or 0), int(disagrees or 0)) for sid, agrees, disagrees in rows}
+
+
+def find_tally_drift(db: Session, batch_size: int = BATCH_SIZE) -> list[dict[str, Any]]:
+    """Return submissions whose stored tallies differ from the votes table."""
+    drift: list[dict[str, Any]] = []
+    for batch in _iter_submission_batches(db, batch_size):
+        actual = _vote_tallies(db, [s.id for s in batch])
+        for submission in batch:
+            agrees, disagrees = actual.get(submission.id, (0, 0))
+            if (submission.agree_count, submission.disagree_count) != (agrees, disagrees):
+                drift.append(
+                    {
+                        "submission_id": str(submission.id),
+                        "stored": [submission.agree_count, submission.disagree_count],
+                        "actual": [agrees, disagrees],
+                    }
+                )
+    return drift
+
+
+def rebuild_tallies(db: Session, batch_size: int = BATCH_SIZE) -> int:
+    """Recompute tallies from votes, committing once per batch. Returns the number of rows fixed."""
+    fixed = 0
+    for batch in _iter_submission_batches(db, batch_size):
+        actual = _vote_tallies(db, [s.id for s in batch])
+        for submission in batch:
+            agrees, disagrees = actual.get(submission.id, (0, 0))
+            if (submission.agree_count, submission.disagree_count) != (agrees, disagrees):
+                submission.agree_count = agrees
+                submission.disagree_count = disagrees
+                db.add(submission)
+                fixed += 1
+        bump_arena_version(db)
+        db.commit()
+    return fixed
+
+
+def _expected_leaderboards(db: Session) -> tuple[dict, dict]:
+    global_rows = (
+        db.query(Agent.id, Agent.display_name, func.coalesce(func.sum(Submission.agree_count), 0))
+        .join(Submission, Submission.agent_id == Agent.id)
+        .group_by(Agent.id, Agent.display_name)
+        .all()
+    )
+    round_rows = (
+        db.query(Submission.round_id, Submission.agent_id, Agent.display_name, Submission.agree_count)
+        .join(Agent, Agent.id == Submission.agent_id)
+        .all()
+    )
+    expected_global = {aid: (name, int(score)) for aid, name, score in global_rows}
+    expected_round = {(rid, aid): (name, int(score)) for rid, aid, name, score in round_rows}
+    return expected_global, expected_round
+
+
+def find_leaderboard_drift(db: Session) -> list[dict[str, Any]]:
+    """Return leaderboard rows that are missing, extra, or differ from the submission tallies."""
+    expected_global, expected_round = _expected_leaderboards(db)
+    stored_global = {r.agent_id: (r.display_name, r.score) for r in db.query(AgentScore).all()}
+    stored_round = {(r.round_id, r.agent_id): (r.display_name, r.score) for r in db.query(RoundAgentScore).all()}
+    drift: list[dict[str, Any]] = []
+    for scope, expected, stored in (("global", expected_global, stored_global), ("round", expected_round, stored_round)):
+        for key in expected.keys() | stored.keys():
+            if expected.get(key) != stored.get(key):
+                drift.append({"scope": scope, "key": str(key), "stored": stored.get(key), "actual": expected.get(key)})
+    return drift
+
+
+def rebuild_leaderboards(db: Session) -> None:
+    """Replace both leaderboard tables from submission tallies in one transaction."""
+    expected_global, expected_round = _expected_leaderboards(db)
+    db.query(RoundAgentScore).delete(synchronize_session=False)
+    db.query(AgentScore).delete(synchronize_session=False)
+    db.add_all(
+        AgentScore(agent_id=aid, display_name=name, score=score) for aid, (name, score) in expected_global.items()
+    )
+    db.add_all(
+        RoundAgentScore(round_id=rid, agent_id=aid, display_name=name, score=score)
+        for (rid, aid), (name, score) in expected_round.items()
+    )
+    bump_arena_version(db)
+    db.commit()
+
+
+def _actual_contribution_count():
+    submissions = select(func.count(Submission.id)).where(Submission.round_id == Round.id).scalar_subquery()
+    comments = select(func.count(RoundComment.id)).where(RoundComment.round_id == Round.id).scalar_subquery()
+    return submissions + comments
+
+
+def find_contribution_drift(db: Session) -> list[dict[str, Any]]:
+    """Return rounds whose contribution_count differs from their submissions + comments."""
+    actual = _actual_contribution_count()
+    rows = db.query(Round.id, Round.contribution_count, actual).filter(Round.contribution_count != actual).all()
+    return [{"round_id": str(rid), "stored": stored, "actual": int(real)} for rid, stored, real in rows]
+
+
+def rebuild_contribution_counts(db: Session) -> int:
+    """Recompute rounds.contribution_count in one UPDATE. Returns the number of rows fixed."""
+    actual = _actual_contribution_count()
+    fixed = (
+        db.query(Round)
+        .filter(Round.contribution_count != actual)
+        .update({Round.contribution_count: actual}, synchronize_session=False)
+    )
+    bump_arena_version(db)
+    db.commit()
+    return fixed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Check or rebuild maintained vote tallies.")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from app.db.session import SessionLocal
+    from app.models import agent, event, onboarding  # noqa: F401  (register related mappers)
+
+    db = SessionLocal()
+    try:
+        if args.command == "check":
+            drift = find_tally_drift(db, args.batch_size)
+            for item in drift:
+                print(f"{item['submission_id']}: stored={item['stored']} actual={item['actual']}")
+            print(f"{len(drift)} submission(s) with drifted tallies")
+            lb_drift = find_leaderboard_drift(db)
+            for item in lb_drift:
+                print(f"leaderboard {item['scope']} {item['key']}: stored={item['stored']} actual={item['actual']}")
+            print(f"{len(lb_drift)} leaderboard row(s) drifted")
+            contribution_drift = find_contribution_drift(db)
+            for item in contribution_drift:
+                print(f"round {item['round_id']}: contribution_count stored={item['stored']} actual={item['actual']}")
+            print(f"{len(contribution_drift)} round(s) with drifted contribution counts")
+            return 1 if drift or lb_drift or contribution_drift else 0
+        fixed = rebuild_tallies(db, args.batch_size)
+        print(f"Rebuilt tallies; {fixed} submission(s) corrected")
+        rebuild_leaderboards(db)
+        print("Rebuilt leaderboards")
+        fixed = rebuild_contribution_counts(db)
+        print(f"Rebuilt contribution counts; {fixed} round(s) corrected")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Global arena version: one row in arena_version, bumped after any committed write that changes
+round, submission, vote or leaderboard data shown by /v1/arena/state and /v1/arena/rounds.
+Readers key snapshots and ETags on it with a single primary-key lookup.
+
+The bump runs in its own short transaction once the writing transaction has committed and
+released its connection, so concurrent writers do not hold the row lock for the length of their
+request. A reader that sees the old version in between may cache newer data under it, never
+older data under the new one.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from sqlalchemy import event as sa_event, update
+from sqlalchemy.orm import Session
+
+from app.models.arena import ArenaVersion
+
+
+logger = logging.getLogger(__name__)
+
+ARENA_VERSION_ID = 1
+
+# Session.info keys: a write in the current transaction changed arena state / it committed.
+_CHANGED_KEY = "arena_changed"
+_COMMITTED_KEY = "arena_changed_committed"
+
+
+def bump_arena_version(db: Session) -> None:
+    """Call inside the writing transaction; the counter is bumped after it commits."""
+    db.info[_CHANGED_KEY] = True
+
+
+def arena_version(db: Session) -> int:
+    version = db.query(ArenaVersion.version).filter(ArenaVersion.id == ARENA_VERSION_ID).scalar()
+    return int(version or 0)
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _note_committed_change(session: Session) -> None:
+    if session.info.pop(_CHANGED_KEY, False):
+        session.info[_COMMITTED_KEY] = True
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_change(session: Session) -> None:
+    if not session.in_nested_transaction():
+        session.info.pop(_CHANGED_KEY, None)
+
+
+@sa_event.listens_for(Session, "after_transaction_end")
+def _bump_after_commit(session: Session, transaction: Any) -> None:
+    # Fires once the transaction's connection is back in the pool (needed on the one-connection
+    # SQLite profile).
+    if transaction.parent is not None or not session.info.pop(_COMMITTED_KEY, False):
+        return
+    try:
+        with session.get_bind().begin() as conn:
+            conn.execute(
+                update(ArenaVersion)
+                .where(ArenaVersion.id == ARENA_VERSION_ID)
+                .values(version=ArenaVersion.version + 1)
+            )
+    except Exception:  # the write itself committed; the next bump revalidates the snapshots
+        logger.exception("arena version bump failed")
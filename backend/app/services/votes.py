@@ -0,0 +1,229 @@
+"""
+Vote recording shared by /v1/arena/vote and the optional write-behind vote buffer.
+
+apply_votes() validates and records any number of votes inside the caller's transaction with a
+fixed number of statements: one lookup of the target submissions and their round status, one
+multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING, one executemany tally update, the
+leaderboard and round-version updates, and the vote_cast events.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, NamedTuple, Optional
+
+from sqlalchemy import bindparam
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import get_settings
+from app.db.upsert import insert_ignore_returning
+from app.models.arena import Round, Submission, Vote
+from app.services import leaderboard
+from app.services.batching import BatchingWorker
+from app.services.events import log_event
+from app.services.versions import bump_arena_version
+
+
+OK = "ok"
+DUPLICATE = "duplicate"
+CLOSED = "closed"
+NOT_FOUND = "not_found"
+ACCEPTED = "accepted"
+
+
+class VoteRequest(NamedTuple):
+    submission_id: uuid.UUID
+    voter_key: str
+    value: str  # "agree" | "disagree"
+
+
+def apply_votes(db: Session, votes: list[VoteRequest]) -> list[str]:
+    """
+    Record votes in the current transaction (the caller commits). Returns one status per input,
+    in order: ok, duplicate (already voted, or repeated in this batch), closed, not_found.
+    """
+    if not votes:
+        return []
+    targets = {
+        sid: (author_id, round_id, round_status)
+        for sid, author_id, round_id, round_status in (
+            db.query(Submission.id, Submission.agent_id, Submission.round_id, Round.status)
+            .join(Round, Round.id == Submission.round_id)
+            .filter(Submission.id.in_({v.submission_id for v in votes}))
+            .all()
+        )
+    }
+
+    now = datetime.now(timezone.utc)
+    statuses: list[Optional[str]] = []
+    rows: list[dict[str, Any]] = []
+    seen: set[tuple[uuid.UUID, str]] = set()
+    for v in votes:
+        target = targets.get(v.submission_id)
+        key = (v.submission_id, v.voter_key)
+        if target is None:
+            statuses.append(NOT_FOUND)
+        elif target[2] != "open":
+            statuses.append(CLOSED)
+        elif key in seen:
+            statuses.append(DUPLICATE)
+        else:
+            seen.add(key)
+            statuses.append(None)
+            rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "submission_id": v.submission_id,
+                    "voter_key": v.voter_key,
+                    "value": v.value,
+                    "created_at": now,
+                }
+            )
+
+    inserted = {
+        (sid, key) for sid, key in insert_ignore_returning(db, Vote, rows, (Vote.submission_id, Vote.voter_key))
+    }
+    statuses = [s if s is not None else (OK if (v.submission_id, v.voter_key) in inserted else DUPLICATE) for s, v in zip(statuses, votes)]
+    recorded = [row for row in rows if (row["submission_id"], row["voter_key"]) in inserted]
+    if not recorded:
+        return statuses
+
+    tallies: Counter = Counter((row["submission_id"], row["value"]) for row in recorded)
+    submissions = Submission.__table__
+    db.execute(
+        submissions.update()
+        .where(submissions.c.id == bindparam("b_id"))
+        .values(
+            agree_count=submissions.c.agree_count + bindparam("b_agree"),
+            disagree_count=submissions.c.disagree_count + bindparam("b_disagree"),
+        ),
+        [
+            {"b_id": sid, "b_agree": tallies[(sid, "agree")], "b_disagree": tallies[(sid, "disagree")]}
+            for sid in {row["submission_id"] for row in recorded}
+        ],
+    )
+
+    agree_by_author: Counter = Counter()
+    for row in recorded:
+        if row["value"] == "agree":
+            author_id, round_id, _ = targets[row["submission_id"]]
+            agree_by_author[(author_id, round_id)] += 1
+    for (author_id, round_id), count in agree_by_author.items():
+        leaderboard.record_agree_votes(db, agent_id=author_id, round_id=round_id, count=count)
+
+    round_ids = {targets[row["submission_id"]][1] for row in recorded}
+    db.query(Round).filter(Round.id.in_(round_ids)).update(
+        {Round.version: Round.version + 1}, synchronize_session=False
+    )
+    if round_ids:
+        bump_arena_version(db)
+
+    for row in recorded:
+        log_event(
+            db,
+            event_type="vote_cast",
+            payload={
+                "submission_id": str(row["submission_id"]),
+                "round_id": str(targets[row["submission_id"]][1]),
+                "value": row["value"],
+            },
+            commit=False,
+        )
+    return statuses
+
+
+class VoteBuffer:
+    """
+    Opt-in write-behind ingestion for /v1/arena/vote. Votes are deduplicated in memory on
+    (submission_id, voter_key), queued, and persisted by a background worker through
+    apply_votes() in one transaction per batch. Validation against the database (missing
+    submission, closed round, duplicate from another process) happens at persist time and is
+    only visible in the counters; votes dropped as not_found or closed leave the dedup set.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        session_factory: Optional[Callable[[], Session]] = None,
+        queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        dedup_size: int,
+    ) -> None:
+        self.enabled = enabled
+        self._session_factory = session_factory
+        self.dedup_size = dedup_size
+        self._seen: "OrderedDict[tuple[uuid.UUID, str], None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.outcomes: Counter = Counter()
+        self.worker: BatchingWorker[VoteRequest] = BatchingWorker(
+            "vote-buffer",
+            self._persist,
+            max_queue=queue_size,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+        )
+
+    def offer(self, vote: VoteRequest) -> str:
+        """Queue a vote; returns accepted or duplicate. Raises queue.Full when the buffer is full."""
+        key = (vote.submission_id, vote.voter_key)
+        with self._lock:
+            if key in self._seen:
+                self._seen.move_to_end(key)
+                self.outcomes["memory_duplicate"] += 1
+                return DUPLICATE
+            self.worker.submit(vote)
+            self._seen[key] = None
+            while len(self._seen) > self.dedup_size:
+                self._seen.popitem(last=False)
+        return ACCEPTED
+
+    def _persist(self, batch: list[VoteRequest]) -> None:
+        if self._session_factory is None:
+            from app.db.session import background_engine_for, engine
+
+            self._session_factory = sessionmaker(
+                autocommit=False, autoflush=False, bind=background_engine_for(engine), future=True
+            )
+        db = self._session_factory()
+        try:
+            statuses = apply_votes(db, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Let the voters retry instead of being told "duplicate" for a vote that was lost.
+            with self._lock:
+                for vote in batch:
+                    self._seen.pop((vote.submission_id, vote.voter_key), None)
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            self.outcomes.update(statuses)
+            # Dropped votes were never recorded; a corrected retry must not be told "duplicate".
+            for vote, status in zip(batch, statuses):
+                if status in (NOT_FOUND, CLOSED):
+                    self._seen.pop((vote.submission_id, vote.voter_key), None)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        self.worker.shutdown(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            outcomes = dict(self.outcomes)
+            tracked = len(self._seen)
+        return {"enabled": self.enabled, "dedup_keys": tracked, "outcomes": outcomes, **self.worker.stats()}
+
+
+_settings = get_settings()
+vote_buffer = VoteBuffer(
+    enabled=_settings.vote_buffer_enabled,
+    queue_size=_settings.vote_buffer_queue_size,
+    batch_size=_settings.vote_buffer_batch_size,
+    flush_interval=_settings.vote_buffer_flush_interval_seconds,
+    dedup_size=_settings.vote_buffer_dedup_size,
+)
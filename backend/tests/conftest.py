@@ -1,15 +1,19 @@
+import itertools
+import uuid
 from collections.abc import Generator
+from datetime import datetime, timezone
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.main import app
 from app.api.v1 import agents as agents_api
 from app.api.v1 import events as events_api
 from app.api.v1 import arena as arena_api
 from app.api.v1 import onboarding as onboarding_api
+from app.db import replica
 from app.db.base import Base
 from app.models import agent as agent_model  # noqa: F401
 from app.models import event as event_model  # noqa: F401
@@ -52,3 +56,43 @@ def setup_database() -> Generator:
 def client() -> TestClient:
     return TestClient(app)
 
+
+
+@pytest.fixture()
+def db_session() -> Generator:
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Arena versions the primary never reaches, one per replica, so sources never share a cache key.
+_replica_versions = itertools.count(10**9)
+
+
+@pytest.fixture()
+def sqlite_replica(tmp_path, monkeypatch) -> Generator:
+    """
+    A second SQLite file standing in for a lagging replica, installed as the replica router
+    (60 s read-your-writes window). It only has one open round of its own, "Replica only".
+    """
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    replica_engine = create_engine(url, future=True)
+    Base.metadata.create_all(bind=replica_engine)
+    with Session(replica_engine) as s:
+        s.add(
+            arena_model.Round(
+                id=uuid.uuid4(),
+                round_number=1,
+                status="open",
+                topic="Replica only",
+                opened_at=datetime.now(timezone.utc),
+            )
+        )
+        s.query(arena_model.ArenaVersion).update({arena_model.ArenaVersion.version: next(_replica_versions)})
+        s.commit()
+    router = replica.ReplicaRouter(url, window_seconds=60, max_tracked=100, trust_forwarded=False)
+    monkeypatch.setattr(replica, "replica_router", router)
+    yield router
+    replica_engine.dispose()
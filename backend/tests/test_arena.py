@@ -357,6 +357,28 @@ def test_hateful_firewall_blocks_submission_and_comment(client: TestClient) -> N
   assert "hateful" in resp.json()["detail"].lower()
 
 
+def test_round_is_checked_before_moderation(client: TestClient, db_session) -> None:
+  from app.models.event import Event
+
+  moderation.HATEFUL_TERMS.clear()
+  moderation.HATEFUL_TERMS.add("bad-slur-token")
+  api_key = _register_agent(client, "Misrouted")
+  missing = UUID(int=11)
+  for path in ("submit", "comments"):
+    resp = client.post(
+        f"/v1/arena/rounds/{missing}/{path}", json={"text": "bad-slur-token"}, headers={"X-API-Key": api_key}
+    )
+    assert resp.status_code == 404
+  resp = client.post(
+      "/v1/arena/heartbeat",
+      json={"submit": [{"round_id": str(missing), "text": "bad-slur-token"}]},
+      headers={"X-API-Key": api_key},
+  )
+  assert [r["status"] for r in resp.json()["results"]["submit"]] == ["not_found"]
+  rejected = db_session.query(Event).filter(Event.type == "content_rejected").all()
+  assert not [e for e in rejected if e.payload.get("round_id") == str(missing)]
+
+
 def test_submit_and_comment_to_specific_round(client: TestClient) -> None:
   api_key = _register_agent(client, "MultiRound")
   _open_round_via_agent(client, api_key, "Cats vs dogs")
@@ -396,3 +418,596 @@ def test_submit_and_comment_to_specific_round(client: TestClient) -> None:
   assert len(state_social["submissions"]) == 0
   assert len(state_social["round"]["comments"]) == 0
 
+
+
+def test_vote_updates_tallies_and_rebuild_fixes_drift(client: TestClient, db_session) -> None:
+  from app.models.arena import Submission
+  from app.services.tallies import find_tally_drift, rebuild_tallies
+
+  api_key = _register_agent(client, "Tallied")
+  _open_round_via_agent(client, api_key, "Tally round")
+  sub = client.post("/v1/arena/submit", json={"text": "Tally me"}, headers={"X-API-Key": api_key}).json()
+  client.post("/v1/arena/vote", json={"submission_id": sub["id"], "voter_key": "t1", "value": "agree"})
+  client.post("/v1/arena/vote", json={"submission_id": sub["id"], "voter_key": "t2", "value": "disagree"})
+  client.post("/v1/arena/vote", json={"submission_id": sub["id"], "voter_key": "t2", "value": "agree"})
+
+  submission = db_session.get(Submission, UUID(sub["id"]))
+  assert (submission.agree_count, submission.disagree_count) == (1, 1)
+  assert find_tally_drift(db_session) == []
+
+  submission.agree_count = 42
+  db_session.commit()
+  drift = find_tally_drift(db_session)
+  assert [d["submission_id"] for d in drift] == [sub["id"]]
+  assert rebuild_tallies(db_session, batch_size=2) == 1
+  db_session.refresh(submission)
+  assert submission.agree_count == 1
+  assert find_tally_drift(db_session) == []
+  _close_round_via_agent(client, api_key)
+
+
+def test_leaderboard_pages_and_rank_lookup(client: TestClient, db_session) -> None:
+  from app.services.tallies import find_leaderboard_drift
+
+  key_a = _register_agent(client, "Rank A")
+  key_b = _register_agent(client, "Rank B")
+  _open_round_via_agent(client, key_a, "Rank round")
+  round_id = client.get("/v1/arena/state").json()["round"]["id"]
+  sub_a = client.post(f"/v1/arena/rounds/{round_id}/submit", json={"text": "A"}, headers={"X-API-Key": key_a}).json()
+  sub_b = client.post(f"/v1/arena/rounds/{round_id}/submit", json={"text": "B"}, headers={"X-API-Key": key_b}).json()
+  for voter in ("r1", "r2"):
+    client.post("/v1/arena/vote", json={"submission_id": sub_b["id"], "voter_key": voter, "value": "agree"})
+  client.post("/v1/arena/vote", json={"submission_id": sub_a["id"], "voter_key": "r3", "value": "disagree"})
+
+  page = client.get(f"/v1/arena/leaderboard?round_id={round_id}&limit=1").json()
+  assert [(i["rank"], i["agent_name"], i["score"]) for i in page["items"]] == [(1, "Rank B", 2)]
+  page = client.get(f"/v1/arena/leaderboard?round_id={round_id}&limit=1&offset=1").json()
+  assert [(i["rank"], i["agent_name"], i["score"]) for i in page["items"]] == [(2, "Rank A", 0)]
+
+  rank = client.get(f"/v1/arena/leaderboard/agents/{sub_a['agent_id']}?round_id={round_id}").json()
+  assert (rank["rank"], rank["score"]) == (2, 0)
+
+  global_rank = client.get(f"/v1/arena/leaderboard/agents/{sub_b['agent_id']}").json()
+  global_page = client.get(f"/v1/arena/leaderboard?limit=500").json()["items"]
+  assert global_page[global_rank["rank"] - 1]["agent_id"] == sub_b["agent_id"]
+
+  unknown = client.get("/v1/arena/leaderboard/agents/00000000-0000-0000-0000-000000000000")
+  assert unknown.status_code == 404
+  assert find_leaderboard_drift(db_session) == []
+  _close_round_via_agent(client, key_a)
+
+
+def test_state_snapshots_are_cached_until_a_write_bumps_the_version(client: TestClient) -> None:
+  from app.services.snapshots import state_cache
+
+  api_key = _register_agent(client, "Snapshot")
+  _open_round_via_agent(client, api_key, "Snapshot round")
+  round_id = client.get("/v1/arena/state").json()["round"]["id"]
+  sub = client.post(f"/v1/arena/rounds/{round_id}/submit", json={"text": "Cache me"}, headers={"X-API-Key": api_key}).json()
+
+  first = client.get(f"/v1/arena/rounds/{round_id}/state")
+  hits = state_cache.hits
+  second = client.get(f"/v1/arena/rounds/{round_id}/state")
+  assert state_cache.hits == hits + 1
+  assert second.content == first.content
+
+  client.post("/v1/arena/vote", json={"submission_id": sub["id"], "voter_key": "snap-1", "value": "agree"})
+  after_vote = client.get(f"/v1/arena/rounds/{round_id}/state").json()
+  assert after_vote["submissions"][0]["agrees"] == 1
+  state = client.get("/v1/arena/state").json()
+  assert state["submissions"][0]["agrees"] == 1
+
+  _close_round_via_agent(client, api_key)
+  assert client.get(f"/v1/arena/rounds/{round_id}/state").json()["round"]["status"] == "closed"
+
+
+def test_state_revalidation_is_one_arena_version_read(client: TestClient, db_session) -> None:
+  from sqlalchemy import event
+
+  from app.db.session import reader_session_for
+  from app.services.versions import arena_version
+
+  reader = reader_session_for(db_session)
+  engine = (reader or db_session).get_bind()
+  if reader is not None:
+    reader.close()
+  api_key = _register_agent(client, "Versioned")
+  before = arena_version(db_session)
+  _open_round_via_agent(client, api_key, "Versioned round")
+  db_session.expire_all()
+  assert arena_version(db_session) == before + 1
+
+  etag = client.get("/v1/arena/state").headers["ETag"]
+  statements: list[str] = []
+  listener = lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt)
+  event.listen(engine, "before_cursor_execute", listener)
+  try:
+    assert client.get("/v1/arena/state", headers={"If-None-Match": etag}).status_code == 304
+  finally:
+    event.remove(engine, "before_cursor_execute", listener)
+  assert len(statements) == 1 and "FROM arena_version" in statements[0]
+
+
+def test_arena_version_is_bumped_only_after_commit(db_session) -> None:
+  from sqlalchemy.orm import Session
+
+  from app.services.versions import arena_version, bump_arena_version
+
+  before = arena_version(db_session)
+  db_session.rollback()
+  with Session(db_session.get_bind()) as writer:
+    bump_arena_version(writer)
+    writer.rollback()
+    bump_arena_version(writer)
+    assert arena_version(writer) == before  # not yet: the row is not locked by the open transaction
+    writer.commit()
+  assert arena_version(db_session) == before + 1
+
+
+def test_snapshot_cache_respects_entry_and_byte_caps() -> None:
+  from app.services.snapshots import SnapshotCache
+
+  cache = SnapshotCache(max_entries=2, max_bytes=10)
+  cache.put("a", b"1234")
+  cache.put("b", b"1234")
+  cache.put("c", b"1234")  # over both caps: "a" goes
+  assert cache.get("a") is None
+  assert cache.get("c") == b"1234"
+  cache.put("big", b"x" * 11)  # larger than the whole cache, never stored
+  assert cache.get("big") is None
+  stats = cache.stats()
+  assert stats["entries"] == 2 and stats["bytes"] == 8 and stats["evictions"] == 1
+
+
+def test_round_state_etag_304_and_cache_control(client: TestClient) -> None:
+  api_key = _register_agent(client, "Etagger")
+  _open_round_via_agent(client, api_key, "ETag round")
+  round_id = client.get("/v1/arena/state").json()["round"]["id"]
+
+  first = client.get(f"/v1/arena/rounds/{round_id}/state")
+  etag = first.headers["ETag"]
+  assert "max-age=5" in first.headers["Cache-Control"]
+  assert "stale-while-revalidate" in first.headers["Cache-Control"]
+
+  again = client.get(f"/v1/arena/rounds/{round_id}/state", headers={"If-None-Match": etag})
+  assert again.status_code == 304
+  assert again.content == b""
+
+  client.post(f"/v1/arena/rounds/{round_id}/comments", json={"text": "changes it"}, headers={"X-API-Key": api_key})
+  changed = client.get(f"/v1/arena/rounds/{round_id}/state", headers={"If-None-Match": etag})
+  assert changed.status_code == 200
+  assert changed.headers["ETag"] != etag
+
+  state = client.get("/v1/arena/state")
+  assert client.get("/v1/arena/state", headers={"If-None-Match": state.headers["ETag"]}).status_code == 304
+  rounds = client.get("/v1/arena/rounds")
+  assert client.get("/v1/arena/rounds", headers={"If-None-Match": rounds.headers["ETag"]}).status_code == 304
+
+  _close_round_via_agent(client, api_key)
+  closed = client.get(f"/v1/arena/rounds/{round_id}/state")
+  assert "immutable" in closed.headers["Cache-Control"]
+
+
+def test_list_rounds_is_one_query_per_page_with_keyset_pagination(client: TestClient, db_session) -> None:
+  from sqlalchemy import event
+
+  from app.db.session import reader_session_for
+
+  # Read-only routes use the SQLite reader pool when the single-writer profile is on.
+  reader = reader_session_for(db_session)
+  engine = (reader or db_session).get_bind()
+  if reader is not None:
+    reader.close()
+  api_key = _register_agent(client, "Pager")
+  for i in range(3):
+    _open_round_via_agent(client, api_key, f"Pager topic {i}")
+  newest_id = client.get("/v1/arena/state").json()["round"]["id"]
+  client.post(f"/v1/arena/rounds/{newest_id}/submit", json={"text": "A fact."}, headers={"X-API-Key": api_key})
+  client.post(f"/v1/arena/rounds/{newest_id}/comments", json={"text": "A comment."}, headers={"X-API-Key": api_key})
+
+  statements: list[str] = []
+  listener = lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt)
+  event.listen(engine, "before_cursor_execute", listener)
+  try:
+    first = client.get("/v1/arena/rounds?q=Pager topic&limit=2").json()
+  finally:
+    event.remove(engine, "before_cursor_execute", listener)
+  # Version lookup plus the page query, regardless of how many rounds exist.
+  assert len(statements) == 2
+
+  assert [r["topic"] for r in first["items"]] == ["Pager topic 2", "Pager topic 1"]
+  assert first["items"][0]["contribution_count"] == 2
+  assert first["items"][0]["proposer_agent_name"] == "Pager"
+  second = client.get(f"/v1/arena/rounds?q=Pager topic&limit=2&before={first['next_before']}").json()
+  assert [r["topic"] for r in second["items"]] == ["Pager topic 0"]
+  assert second["next_before"] is None
+
+  closed = client.get("/v1/arena/rounds?status=closed&limit=200").json()["items"]
+  assert closed and all(r["status"] == "closed" for r in closed)
+  assert client.get("/v1/arena/rounds?status=pending").status_code == 422
+
+
+def test_contribution_counter_closes_round_exactly_once(client: TestClient, db_session) -> None:
+  from app.models.arena import Round
+  from app.models.event import Event
+  from app.services.tallies import find_contribution_drift, rebuild_contribution_counts
+
+  api_key = _register_agent(client, "Counter")
+  _open_round_via_agent(client, api_key, "Counter topic")
+  round_id = client.get("/v1/arena/state").json()["round"]["id"]
+  # Simulate 19 earlier contributions so the next write reaches the limit.
+  db_session.query(Round).filter(Round.id == UUID(round_id)).update({Round.contribution_count: 19})
+  db_session.commit()
+
+  first = client.post(f"/v1/arena/rounds/{round_id}/comments", json={"text": "Twentieth."}, headers={"X-API-Key": api_key})
+  assert first.status_code == 200
+  late = client.post(f"/v1/arena/rounds/{round_id}/comments", json={"text": "Too late."}, headers={"X-API-Key": api_key})
+  assert late.status_code == 409
+
+  state = client.get(f"/v1/arena/rounds/{round_id}/state").json()
+  assert state["round"]["status"] == "closed"
+  assert state["round"]["contribution_count"] == 20
+  closes = [e for e in db_session.query(Event).filter(Event.type == "round_closed").all() if e.payload["round_id"] == round_id]
+  assert [e.payload["reason"] for e in closes] == ["auto_contributions_limit"]
+
+  drift = [d for d in find_contribution_drift(db_session) if d["round_id"] == round_id]
+  assert drift == [{"round_id": round_id, "stored": 20, "actual": 1}]
+  assert rebuild_contribution_counts(db_session) >= 1
+  assert find_contribution_drift(db_session) == []
+
+
+def test_submit_and_vote_commit_once_and_detect_duplicates_on_insert(client: TestClient, db_session) -> None:
+  from sqlalchemy import event
+
+  from app.models.arena import Submission
+
+  engine = db_session.get_bind()
+  api_key = _register_agent(client, "OneCommit")
+  _open_round_via_agent(client, api_key, "One commit topic")
+  round_id = client.get("/v1/arena/state").json()["round"]["id"]
+
+  commits: list[int] = []
+  statements: list[str] = []
+  on_commit = lambda conn: commits.append(1)
+  on_execute = lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt)
+  event.listen(engine, "commit", on_commit)
+  event.listen(engine, "before_cursor_execute", on_execute)
+  try:
+    resp = client.post(f"/v1/arena/rounds/{round_id}/submit", json={"text": "Single commit."}, headers={"X-API-Key": api_key})
+  finally:
+    event.remove(engine, "commit", on_commit)
+    event.remove(engine, "before_cursor_execute", on_execute)
+  assert resp.status_code == 200
+  assert len(commits) == 2  # the request's transaction, then the arena_version bump
+  assert not any(s.lstrip().upper().startswith("SELECT") and "FROM submissions" in s for s in statements)
+  assert any("INSERT INTO events" in s for s in statements)
+
+  dup = client.post(f"/v1/arena/rounds/{round_id}/submit", json={"text": "Again."}, headers={"X-API-Key": api_key})
+  assert dup.status_code == 409
+  state = client.get(f"/v1/arena/rounds/{round_id}/state").json()
+  assert state["round"]["contribution_count"] == 1
+
+  submission_id = resp.json()["id"]
+  vote = {"submission_id": submission_id, "voter_key": "once", "value": "agree"}
+  assert client.post("/v1/arena/vote", json=vote).json() == {"status": "ok"}
+  assert client.post("/v1/arena/vote", json=vote).json() == {"status": "duplicate"}
+  db_session.expire_all()
+  assert db_session.get(Submission, UUID(submission_id)).agree_count == 1
+
+
+def test_write_behind_vote_buffer_persists_batches(client: TestClient, db_session, monkeypatch) -> None:
+  from sqlalchemy.orm import sessionmaker
+
+  from app.models.arena import Submission, Vote
+  from app.models.event import Event
+  from app.services import votes
+
+  api_key = _register_agent(client, "Buffered")
+  _open_round_via_agent(client, api_key, "Buffered votes topic")
+  round_id = client.get("/v1/arena/state").json()["round"]["id"]
+  submission_id = client.post(
+      f"/v1/arena/rounds/{round_id}/submit", json={"text": "Buffer me."}, headers={"X-API-Key": api_key}
+  ).json()["id"]
+
+  buffer = votes.VoteBuffer(
+      enabled=True,
+      session_factory=sessionmaker(bind=db_session.get_bind(), autoflush=False),
+      queue_size=100,
+      batch_size=50,
+      flush_interval=1.0,
+      dedup_size=100,
+  )
+  monkeypatch.setattr(votes, "vote_buffer", buffer)
+
+  sent = [("b1", "agree"), ("b2", "agree"), ("b3", "disagree"), ("b1", "disagree")]
+  replies = [
+      client.post("/v1/arena/vote", json={"submission_id": submission_id, "voter_key": k, "value": v}).json()
+      for k, v in sent
+  ]
+  assert [r["status"] for r in replies] == ["accepted", "accepted", "accepted", "duplicate"]
+  missing = client.post("/v1/arena/vote", json={"submission_id": str(UUID(int=7)), "voter_key": "b1"}).json()
+  assert missing["status"] == "accepted"  # validated when the batch is persisted
+
+  buffer.shutdown(timeout=5)
+  db_session.expire_all()
+  sub = db_session.get(Submission, UUID(submission_id))
+  assert (sub.agree_count, sub.disagree_count) == (2, 1)
+  assert db_session.query(Vote).filter(Vote.submission_id == UUID(submission_id)).count() == 3
+  cast = [e for e in db_session.query(Event).filter(Event.type == "vote_cast").all() if e.payload["submission_id"] == submission_id]
+  assert len(cast) == 3
+
+  stats = buffer.stats()
+  assert stats["outcomes"] == {"memory_duplicate": 1, "ok": 3, "not_found": 1}
+  assert stats["batches"] == 1 and stats["failed"] == 0
+  # The dropped vote is forgotten, so a retry with the right submission id is not a "duplicate".
+  assert stats["dedup_keys"] == 3 and (UUID(int=7), "b1") not in buffer._seen
+
+
+def test_vote_batch_reports_per_item_status(client: TestClient, db_session) -> None:
+  from sqlalchemy import event
+
+  from app.models.arena import Submission
+
+  api_key = _register_agent(client, "BatchAuthor")
+  _open_round_via_agent(client, api_key, "Batch open topic")
+  open_round = client.get("/v1/arena/state").json()["round"]["id"]
+  open_sub = client.post(f"/v1/arena/rounds/{open_round}/submit", json={"text": "Open fact."}, headers={"X-API-Key": api_key}).json()["id"]
+  other_key = _register_agent(client, "BatchOther")
+  _open_round_via_agent(client, other_key, "Batch closing topic")
+  closing_round = client.get("/v1/arena/state").json()["round"]["id"]
+  closed_sub = client.post(f"/v1/arena/rounds/{closing_round}/submit", json={"text": "Closed fact."}, headers={"X-API-Key": other_key}).json()["id"]
+  _close_round_via_agent(client, other_key)
+
+  client.post("/v1/arena/vote", json={"submission_id": open_sub, "voter_key": "batcher", "value": "agree"})
+  second_open = client.post(f"/v1/arena/rounds/{open_round}/submit", json={"text": "Another."}, headers={"X-API-Key": other_key}).json()["id"]
+
+  engine = db_session.get_bind()
+  commits: list[int] = []
+  on_commit = lambda conn: commits.append(1)
+  event.listen(engine, "commit", on_commit)
+  try:
+    resp = client.post(
+        "/v1/arena/votes:batch",
+        json={
+            "voter_key": "batcher",
+            "votes": [
+                {"submission_id": second_open, "value": "disagree"},
+                {"submission_id": open_sub},
+                {"submission_id": closed_sub},
+                {"submission_id": str(UUID(int=9))},
+            ],
+        },
+    )
+  finally:
+    event.remove(engine, "commit", on_commit)
+  assert resp.status_code == 200
+  assert [r["status"] for r in resp.json()["results"]] == ["ok", "duplicate", "closed", "not_found"]
+  assert len(commits) == 2  # the request's transaction, then the arena_version bump
+  db_session.expire_all()
+  assert db_session.get(Submission, UUID(second_open)).disagree_count == 1
+
+  assert client.post("/v1/arena/votes:batch", json={"voter_key": "x", "votes": []}).status_code == 422
+
+
+def test_heartbeat_applies_intents_and_returns_participation_in_one_commit(client: TestClient, db_session) -> None:
+  from sqlalchemy import event
+
+  from app.models.arena import Submission
+
+  api_key = _register_agent(client, "Beater")
+  other_key = _register_agent(client, "BeatOther")
+  _open_round_via_agent(client, other_key, "Heartbeat topic A")
+  round_a = client.get("/v1/arena/state").json()["round"]["id"]
+  other_sub = client.post(f"/v1/arena/rounds/{round_a}/submit", json={"text": "Other fact."}, headers={"X-API-Key": other_key}).json()["id"]
+  _open_round_via_agent(client, other_key, "Heartbeat topic B")
+  round_b = client.get("/v1/arena/state").json()["round"]["id"]
+
+  # Empty body: read-only tick.
+  idle = client.post("/v1/arena/heartbeat", headers={"X-API-Key": api_key})
+  assert idle.status_code == 200
+  rounds = {r["id"]: r for r in idle.json()["open_rounds"]}
+  assert not rounds[round_a]["submitted"] and not rounds[round_b]["submitted"]
+
+  engine = db_session.get_bind()
+  commits: list[int] = []
+  on_commit = lambda conn: commits.append(1)
+  event.listen(engine, "commit", on_commit)
+  try:
+    resp = client.post(
+        "/v1/arena/heartbeat",
+        json={
+            "submit": [
+                {"round_id": round_a, "text": "My fact."},
+                {"round_id": round_a, "text": "Again."},
+                {"round_id": str(UUID(int=5)), "text": "Nowhere."},
+            ],
+            "comment": [{"round_id": round_b, "text": "A comment."}],
+            "votes": {"voter_key": "beater", "items": [{"submission_id": other_sub}]},
+        },
+        headers={"X-API-Key": api_key},
+    )
+  finally:
+    event.remove(engine, "commit", on_commit)
+  assert resp.status_code == 200
+  assert len(commits) == 2  # the request's transaction, then the arena_version bump
+  body = resp.json()
+  assert [r["status"] for r in body["results"]["submit"]] == ["ok", "duplicate", "not_found"]
+  assert [r["status"] for r in body["results"]["comment"]] == ["ok"]
+  assert [r["status"] for r in body["results"]["votes"]] == ["ok"]
+
+  rounds = {r["id"]: r for r in body["open_rounds"]}
+  assert rounds[round_a]["submitted"] and rounds[round_a]["submission_id"] == body["results"]["submit"][0]["id"]
+  assert rounds[round_a]["contribution_count"] == 2
+  assert not rounds[round_b]["submitted"] and rounds[round_b]["contribution_count"] == 1
+  db_session.expire_all()
+  assert db_session.get(Submission, UUID(other_sub)).agree_count == 1
+
+  blank = client.post(
+      "/v1/arena/heartbeat",
+      json={"comment": [{"round_id": round_b, "text": "Not applied."}], "votes": {"voter_key": "   ", "items": [{"submission_id": other_sub}]}},
+      headers={"X-API-Key": api_key},
+  )
+  assert blank.status_code == 400 and blank.json()["detail"] == "voter_key is required"
+  assert client.post("/v1/arena/heartbeat").status_code == 401
+
+
+def test_heartbeat_conflict_only_undoes_that_intent(client: TestClient, db_session, monkeypatch) -> None:
+  from app.api.v1.arena import _apply_heartbeat_intent
+  from app.models.agent import Agent
+  from app.models.arena import Round, RoundComment
+  from app.schemas.arena import HeartbeatTextIntent
+  from app.services import events as events_service
+
+  api_key = _register_agent(client, "Racer")
+  _open_round_via_agent(client, api_key, "Race topic A")
+  round_a = UUID(client.get("/v1/arena/state").json()["round"]["id"])
+  _open_round_via_agent(client, api_key, "Race topic B")
+  round_b = UUID(client.get("/v1/arena/state").json()["round"]["id"])
+  # The concurrent request that wins the race commits first.
+  client.post(f"/v1/arena/rounds/{round_a}/submit", json={"text": "Won."}, headers={"X-API-Key": api_key})
+  published: list[str] = []
+  monkeypatch.setattr(events_service, "_publish", lambda snapshots: published.extend(e["type"] for e in snapshots))
+
+  agent = db_session.query(Agent).filter(Agent.display_name == "Racer").one()
+  apply = lambda kind, round_id, text: _apply_heartbeat_intent(
+      db_session,
+      kind=kind,
+      intent=HeartbeatTextIntent(round_id=round_id, text=text),
+      agent_id=agent.id,
+      display_name=agent.display_name,
+      submitted=set(),  # this tick's pre-check ran before the winner committed
+  )
+  comment = apply("comment", round_b, "Kept.")
+  lost = apply("submission", round_a, "Lost.")
+  db_session.commit()
+
+  assert comment["status"] == "ok" and lost["status"] == "duplicate"
+  assert db_session.get(RoundComment, UUID(comment["id"])) is not None
+  assert db_session.get(Round, round_a).contribution_count == 1
+  assert published == ["comment_created"]
+
+
+def test_agent_pending_lists_only_unsubmitted_open_rounds(client: TestClient) -> None:
+  api_key = _register_agent(client, "Pending")
+  other_key = _register_agent(client, "PendingOther")
+  _open_round_via_agent(client, other_key, "Pending topic A")
+  round_a = client.get("/v1/arena/state").json()["round"]["id"]
+  _open_round_via_agent(client, other_key, "Pending topic B")
+  round_b = client.get("/v1/arena/state").json()["round"]["id"]
+
+  before = client.get("/v1/agents/me/pending", headers={"X-API-Key": api_key}).json()
+  assert {round_a, round_b} <= {r["id"] for r in before["rounds"]}
+  assert before["pending"] == len(before["rounds"]) == before["open_rounds"] - before["submitted"]
+
+  client.post(f"/v1/arena/rounds/{round_a}/submit", json={"text": "Done here."}, headers={"X-API-Key": api_key})
+  after = client.get("/v1/agents/me/pending", headers={"X-API-Key": api_key}).json()
+  ids = {r["id"] for r in after["rounds"]}
+  assert round_a not in ids and round_b in ids
+  assert after["submitted"] == before["submitted"] + 1 and after["pending"] == before["pending"] - 1
+  assert set(after["rounds"][0]) == {"id", "round_number", "topic", "contribution_count"}
+
+  assert client.get("/v1/agents/me/pending").status_code == 401
+
+
+def test_idempotency_key_replays_stored_response(client: TestClient, db_session, monkeypatch) -> None:
+  from app.core import idempotency
+  from app.models.arena import Round, RoundComment
+
+  test_sessions = lambda: type(db_session)(bind=db_session.get_bind())
+  monkeypatch.setattr(
+      idempotency, "idempotency_store", idempotency.IdempotencyStore(max_size=100, ttl_seconds=60, session_factory=test_sessions)
+  )
+  api_key = _register_agent(client, "Retrier")
+  headers = {"X-API-Key": api_key, "Idempotency-Key": "propose-1"}
+  first = client.post("/v1/arena/topics/propose", json={"topic": "Idempotent topic"}, headers=headers)
+  retry = client.post("/v1/arena/topics/propose", json={"topic": "Idempotent topic"}, headers=headers)
+  assert first.status_code == retry.status_code == 200
+  assert retry.json() == first.json() and retry.headers["Idempotent-Replayed"] == "true"
+  # Same agent after swapping the API key for a session token: still a replay.
+  token = client.post("/v1/agents/token", headers={"X-API-Key": api_key}).json()["access_token"]
+  swapped = client.post(
+      "/v1/arena/topics/propose",
+      json={"topic": "Idempotent topic"},
+      headers={"Authorization": f"Bearer {token}", "Idempotency-Key": "propose-1"},
+  )
+  assert swapped.json() == first.json() and swapped.headers["Idempotent-Replayed"] == "true"
+  assert db_session.query(Round).filter(Round.topic == "Idempotent topic").count() == 1
+  # An invalid credential is never served a stored response; the route rejects it.
+  forged = client.post(
+      "/v1/arena/topics/propose",
+      json={"topic": "Idempotent topic"},
+      headers={"X-API-Key": "not-a-key", "Idempotency-Key": "propose-1"},
+  )
+  assert forged.status_code == 401 and "Idempotent-Replayed" not in forged.headers
+
+  reused = client.post("/v1/arena/topics/propose", json={"topic": "Other topic"}, headers=headers)
+  assert reused.status_code == 422
+  # Keys are scoped per agent: another agent's identical key is a new request.
+  other = client.post(
+      "/v1/arena/topics/propose",
+      json={"topic": "Idempotent topic"},
+      headers={"X-API-Key": _register_agent(client, "Retrier2"), "Idempotency-Key": "propose-1"},
+  )
+  assert other.status_code == 200 and other.json()["round_id"] != first.json()["round_id"]
+
+  # With the table enabled, a worker that never saw the key replays it from the database.
+  store = idempotency.IdempotencyStore(max_size=100, ttl_seconds=60, db_enabled=True, session_factory=test_sessions)
+  monkeypatch.setattr(idempotency, "idempotency_store", store)
+  round_id = first.json()["round_id"]
+  comment_headers = {"X-API-Key": api_key, "Idempotency-Key": "comment-1"}
+  posted = client.post(f"/v1/arena/rounds/{round_id}/comments", json={"text": "Once."}, headers=comment_headers)
+  store.clear()
+  replayed = client.post(f"/v1/arena/rounds/{round_id}/comments", json={"text": "Once."}, headers=comment_headers)
+  assert replayed.json() == posted.json() and replayed.headers["Idempotent-Replayed"] == "true"
+  assert db_session.query(RoundComment).filter(RoundComment.round_id == UUID(round_id)).count() == 1
+  stats = store.stats()
+  assert stats["db_hits"] == 1 and stats["stored"] == 1
+
+
+def test_rate_limiter_returns_429_per_client_and_route(client: TestClient, monkeypatch) -> None:
+  import time
+
+  from app.core import rate_limit
+
+  agent_a = {"X-API-Key": _register_agent(client, "Limited A")}
+  agent_b = {"X-API-Key": _register_agent(client, "Limited B")}
+  limiter = rate_limit.RateLimiter(
+      enabled=True,
+      per_minute={"read": 60, "write": 60, "vote": 60, "auth": 60},
+      burst_seconds=2,
+      max_keys=100,
+      max_in_flight=0,
+      trust_forwarded=True,
+  )
+  monkeypatch.setattr(rate_limit, "rate_limiter", limiter)
+
+  assert [client.get("/v1/arena/state").status_code for _ in range(2)] == [200, 200]
+  limited = client.get("/v1/arena/state")
+  assert limited.status_code == 429 and int(limited.headers["Retry-After"]) >= 1
+  # Made-up credentials do not buy a fresh bucket; another address has its own.
+  assert client.get("/v1/arena/state", headers={"X-API-Key": "made-up-1"}).status_code == 429
+  assert client.get("/v1/arena/state", headers={"Authorization": "Bearer made-up-2"}).status_code == 429
+  assert client.get("/v1/arena/state", headers={"X-Forwarded-For": "203.0.113.7"}).status_code == 200
+  assert client.get("/health").status_code == 200
+
+  # Votes are keyed by address, whatever voter_key the body claims.
+  codes = [
+    client.post("/v1/arena/vote", json={"submission_id": str(UUID(int=3)), "voter_key": f"spammer-{i}"}).status_code
+    for i in range(3)
+  ]
+  assert codes == [404, 404, 429]
+
+  # Auth routes are limited before argon2 runs, however the key varies.
+  codes = [client.post("/v1/agents/token", headers={"X-API-Key": f"wrong-{i}"}).status_code for i in range(3)]
+  assert codes == [401, 401, 429]
+
+  # Writes are per credential on an address, so agents behind one NAT keep separate budgets.
+  propose = lambda headers: client.post("/v1/arena/topics/propose", json={"topic": ""}, headers=headers).status_code
+  assert [propose(agent_a) for _ in range(3)][-1] == 429
+  assert propose(agent_b) != 429
+  stats = limiter.stats()
+  assert stats["limited"] == {"read": 3, "write": 1, "vote": 1, "auth": 1}
+
+  # Buckets that have refilled completely are swept: the anonymous client and "someone-else".
+  bucket = limiter.buckets["read"]
+  assert bucket.sweep(now=time.monotonic() + 60) == 2 and len(bucket) == 0
@@ -1,3 +1,6 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
 from fastapi.testclient import TestClient
 
 
@@ -31,3 +34,181 @@ def test_valid_api_key_authenticates_on_emit(client: TestClient) -> None:
     )
     assert resp.status_code == 200
 
+
+
+def test_register_stores_fingerprint_not_plaintext(client: TestClient, db_session) -> None:
+    from app.core.security import api_key_fingerprint
+    from app.models.agent import Agent
+
+    reg = client.post("/v1/agents/register", json={"display_name": "Fingerprinted"})
+    assert reg.status_code == 200
+    api_key = reg.json()["api_key"]
+
+    agent = db_session.get(Agent, UUID(reg.json()["agent_id"]))
+    assert agent.api_key_fingerprint == api_key_fingerprint(api_key)
+    assert api_key not in (agent.api_key_fingerprint, agent.api_key_hash)
+
+
+def test_legacy_key_without_fingerprint_is_upgraded_on_first_use(client: TestClient, db_session) -> None:
+    from app.core.security import api_key_fingerprint, hash_api_key
+    from app.models.agent import Agent
+
+    api_key = "legacy-key-issued-before-fingerprints"
+    legacy = Agent(
+        display_name="Legacy",
+        api_key_hash=hash_api_key(api_key),
+        created_at=datetime.now(timezone.utc),
+        is_verified=True,
+    )
+    db_session.add(legacy)
+    db_session.commit()
+    assert legacy.api_key_fingerprint is None
+
+    resp = client.post(
+        "/v1/events/emit",
+        json={"type": "debug", "payload": {"msg": "legacy"}},
+        headers={"X-API-Key": api_key},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["actor_agent_id"] == str(legacy.id)
+
+    db_session.refresh(legacy)
+    assert legacy.api_key_fingerprint == api_key_fingerprint(api_key)
+
+
+def test_repeat_requests_hit_credential_cache(client: TestClient) -> None:
+    from app.core.config import get_settings
+    from app.core.security import credential_cache
+
+    reg = client.post("/v1/agents/register", json={"display_name": "Cached"})
+    api_key = reg.json()["api_key"]
+    headers = {"X-API-Key": api_key}
+
+    client.post("/v1/events/emit", json={"type": "debug", "payload": {}}, headers=headers)
+    hits_before = credential_cache.hits
+    client.post("/v1/events/emit", json={"type": "debug", "payload": {}}, headers=headers)
+    assert credential_cache.hits == hits_before + 1
+
+    assert client.get("/v1/admin/metrics").status_code == 401
+    metrics = client.get("/v1/admin/metrics", headers={"X-Admin-Key": get_settings().admin_key})
+    assert metrics.status_code == 200
+    assert metrics.json()["credential_cache"]["hits"] >= 1
+
+
+def test_credential_cache_ttl_eviction_and_invalidation() -> None:
+    from uuid import uuid4
+
+    from app.core.security import CredentialCache
+
+    cache = CredentialCache(max_size=2, ttl_seconds=60)
+    a, b, c = uuid4(), uuid4(), uuid4()
+    cache.put("key-a", a, "hash-a")
+    cache.put("key-b", b, "hash-b")
+    assert cache.get("key-a") == (a, "hash-a")
+    cache.put("key-c", c, "hash-c")  # evicts key-b (least recently used)
+    assert cache.get("key-b") is None
+    assert cache.evictions == 1
+
+    cache.invalidate_agent(a)
+    assert cache.get("key-a") is None
+    assert cache.get("key-c") == (c, "hash-c")
+
+    expired = CredentialCache(max_size=2, ttl_seconds=0)
+    expired.put("key-a", a, "hash-a")
+    assert expired.get("key-a") is None
+    assert expired.expirations == 1
+
+
+def test_session_token_exchange_and_bearer_auth(client: TestClient) -> None:
+    reg = client.post("/v1/agents/register", json={"display_name": "Token Agent"})
+    api_key = reg.json()["api_key"]
+
+    resp = client.post("/v1/agents/token", headers={"X-API-Key": api_key})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["token_type"] == "bearer"
+    assert data["agent_id"] == reg.json()["agent_id"]
+    assert data["expires_in"] > 0
+    token = data["access_token"]
+
+    resp = client.post(
+        "/v1/events/emit",
+        json={"type": "debug", "payload": {"via": "token"}},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["actor_agent_id"] == reg.json()["agent_id"]
+
+    # A bearer token cannot be exchanged for a fresh one; the API key stays the root credential.
+    resp = client.post("/v1/agents/token", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 401
+
+
+def test_tampered_or_expired_session_token_is_rejected(client: TestClient, monkeypatch) -> None:
+    from app.core import security
+
+    reg = client.post("/v1/agents/register", json={"display_name": "Tamper Agent"})
+    agent_id = UUID(reg.json()["agent_id"])
+    token = client.post("/v1/agents/token", headers={"X-API-Key": reg.json()["api_key"]}).json()["access_token"]
+
+    body, signature = token.split(".", 1)
+    forged = f"{body}.{signature[::-1]}"
+    resp = client.post(
+        "/v1/events/emit",
+        json={"type": "debug", "payload": {}},
+        headers={"Authorization": f"Bearer {forged}"},
+    )
+    assert resp.status_code == 401
+
+    monkeypatch.setattr(security.time, "time", lambda: 4102444800.0)  # year 2100
+    assert security.verify_session_token(token) is None
+    monkeypatch.undo()
+    assert security.verify_session_token(token)[0] == agent_id
+
+
+def test_placeholder_secret_key_is_never_used_for_signing(client: TestClient, monkeypatch) -> None:
+    import hashlib
+    import hmac
+
+    from app.core import security
+    from app.core.config import DEFAULT_SECRET_KEY, get_settings
+
+    placeholder = get_settings().model_copy(update={"secret_key": DEFAULT_SECRET_KEY})
+    monkeypatch.setattr(security, "get_settings", lambda: placeholder)
+    reg = client.post("/v1/agents/register", json={"display_name": "Placeholder Agent"})
+    token = client.post("/v1/agents/token", headers={"X-API-Key": reg.json()["api_key"]}).json()["access_token"]
+    assert security.verify_session_token(token)[0] == UUID(reg.json()["agent_id"])
+
+    # Anyone can compute a signature with the published default; it must not verify.
+    body = token.split(".", 1)[0]
+    forged = hmac.new(DEFAULT_SECRET_KEY.encode("utf-8"), body.encode("ascii"), hashlib.sha256).digest()
+    assert security.verify_session_token(f"{body}.{security._b64encode(forged)}") is None
+
+
+def test_hash_pool_runs_argon2_in_worker_processes() -> None:
+    from app.core.security import PasswordHashPool, _hash, _verify
+
+    pool = PasswordHashPool(workers=1, queue_size=1, retry_after_seconds=1)
+    try:
+        hashed = pool.run(_hash, "pool-key")
+        assert pool.run(_verify, "pool-key", hashed) is True
+        assert pool.run(_verify, "other-key", hashed) is False
+        stats = pool.stats()
+        assert stats["mode"] == "process_pool"
+        assert stats["completed"] == 3
+        assert stats["in_flight"] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_saturated_hash_pool_returns_503_with_retry_after(client: TestClient, monkeypatch) -> None:
+    from app.core import security
+
+    saturated = security.PasswordHashPool(workers=1, queue_size=0, retry_after_seconds=7)
+    assert saturated._slots.acquire(blocking=False)  # occupy the only slot
+    monkeypatch.setattr(security, "hash_pool", saturated)
+
+    resp = client.post("/v1/agents/register", json={"display_name": "Too Busy"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "7"
+    assert saturated.stats()["rejected"] == 1
@@ -0,0 +1,229 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import get_settings
+from app.db import runner, session as db_session_module
+from app.db.async_session import async_database_url
+from app.db.base import Base
+from app.db.pool import InstrumentedQueuePool, pool_stats
+from app.db.session import background_engine_for, create_db_engine, engine_options
+from app.models.agent import Agent
+from app.models.arena import Round, Submission
+from app.models.event import Event
+from app.services import events as events_service
+from app.services.events import log_event
+from app.services.votes import VoteBuffer, VoteRequest
+
+
+def _single_writer_profile(monkeypatch) -> None:
+    profile = get_settings().model_copy(update={"sqlite_wal": True, "sqlite_single_writer": True})
+    monkeypatch.setattr(db_session_module, "get_settings", lambda: profile)
+
+
+def _topics(client: TestClient, headers: dict) -> set:
+    return {r["topic"] for r in client.get("/v1/arena/rounds?limit=200", headers=headers).json()["items"]}
+
+
+def test_async_database_url_swaps_driver() -> None:
+    assert async_database_url("sqlite:///./dev.db") == "sqlite+aiosqlite:///./dev.db"
+    assert (
+        async_database_url("postgresql+psycopg2://u:p@db:5432/pr_arena")
+        == "postgresql+asyncpg://u:p@db:5432/pr_arena"
+    )
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/pr_arena")
+
+
+def test_hot_endpoints_run_on_the_async_engine(client: TestClient, db_session, monkeypatch) -> None:
+    url = async_database_url(str(db_session.get_bind().url))
+    engine = create_async_engine(url)
+    monkeypatch.setattr(runner, "async_enabled", lambda: True)
+    monkeypatch.setattr(runner, "get_async_sessionmaker", lambda read=False: async_sessionmaker(engine, autoflush=False))
+
+    api_key = client.post("/v1/agents/register", json={"display_name": "AsyncAgent"}).json()["api_key"]
+    client.post("/v1/arena/topics/propose", json={"topic": "Async topic"}, headers={"X-API-Key": api_key})
+    state = client.get("/v1/arena/state").json()
+    round_id = state["round"]["id"]
+    sub = client.post(f"/v1/arena/rounds/{round_id}/submit", json={"text": "Async fact."}, headers={"X-API-Key": api_key})
+
+    vote = {"submission_id": sub.json()["id"], "voter_key": "async-voter"}
+    assert client.post("/v1/arena/vote", json=vote).json() == {"status": "ok"}
+    assert client.post("/v1/arena/vote", json=vote).json() == {"status": "duplicate"}
+    round_state = client.get(f"/v1/arena/rounds/{round_id}/state").json()
+    assert round_state["submissions"][0]["agrees"] == 1
+    assert client.get("/v1/events?limit=5").status_code == 200
+
+
+def test_pool_settings_and_instrumentation(tmp_path) -> None:
+    settings = get_settings().model_copy(update={"db_statement_timeout_ms": 2500, "db_pool_size": 2})
+    pg = engine_options("postgresql+psycopg2://u:p@db/pr_arena", settings)
+    assert pg["pool_size"] == 2 and pg["connect_args"] == {"options": "-c statement_timeout=2500"}
+    assert "poolclass" not in engine_options("sqlite://", settings)
+
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}", reader=True)
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        busy = pool_stats(engine)
+    idle = pool_stats(engine)
+    engine.dispose()
+
+    assert busy["checked_out"] == 2 and idle["checked_out"] == 0
+    assert idle["checkouts"] == 2 and sum(idle["wait_histogram"].values()) == 2
+    assert idle["connects"] == 2 and idle["open_connections"] == 2
+    assert idle["avg_hold_ms"] > 0 and idle["timeouts"] == 0
+
+
+def test_admin_metrics_include_db_pool(client: TestClient) -> None:
+    resp = client.get("/v1/admin/metrics", headers={"X-Admin-Key": get_settings().admin_key})
+    assert resp.status_code == 200
+    assert resp.json()["db_pool"]["class"] == "InstrumentedQueuePool"
+    assert client.get("/v1/admin/metrics").status_code == 401
+
+
+def test_reads_use_the_replica_except_right_after_own_write(client: TestClient, db_session, sqlite_replica) -> None:
+    sqlite_replica.window_seconds = 0.5
+    sqlite_replica.trust_forwarded = True
+    api_key = client.post("/v1/agents/register", json={"display_name": "Replicated"}).json()["api_key"]
+    writer = {"X-API-Key": api_key, "X-Forwarded-For": "10.0.0.1"}
+    assert _topics(client, writer) == {"Replica only"}
+
+    client.post("/v1/arena/topics/propose", json={"topic": "Fresh on primary"}, headers=writer)
+    assert "Fresh on primary" in _topics(client, writer)
+    # Other clients keep reading the replica.
+    assert _topics(client, {"X-API-Key": "someone-else", "X-Forwarded-For": "10.0.0.2"}) == {"Replica only"}
+
+    time.sleep(0.6)
+    assert _topics(client, writer) == {"Replica only"}
+    stats = sqlite_replica.stats()
+    assert stats["primary_reads"] == 1 and stats["replica_reads"] == 3
+
+
+def test_own_write_is_visible_to_public_and_token_reads(client: TestClient, db_session, sqlite_replica) -> None:
+    sqlite_replica.trust_forwarded = True
+    api_key = client.post("/v1/agents/register", json={"display_name": "PublicReader"}).json()["api_key"]
+    token = client.post("/v1/agents/token", headers={"X-API-Key": api_key}).json()["access_token"]
+    address = {"X-Forwarded-For": "10.0.0.3"}
+    client.post("/v1/arena/topics/propose", json={"topic": "Seen without a key"}, headers={"X-API-Key": api_key, **address})
+
+    # The public state is read without a credential, from the same client.
+    assert "Seen without a key" in _topics(client, address)
+    assert "Seen without a key" in _topics(client, {"Authorization": f"Bearer {token}", **address})
+
+
+def test_async_reads_use_the_replica(client: TestClient, db_session, sqlite_replica, monkeypatch) -> None:
+    engines = {
+        False: create_async_engine(async_database_url(str(db_session.get_bind().url))),
+        True: create_async_engine(async_database_url(sqlite_replica.read_url)),
+    }
+    picked: list[bool] = []
+
+    def sessionmaker_for(read: bool = False):
+        picked.append(read)
+        return async_sessionmaker(engines[read], autoflush=False)
+
+    monkeypatch.setattr(runner, "async_enabled", lambda: True)
+    monkeypatch.setattr(runner, "get_async_sessionmaker", sessionmaker_for)
+
+    assert _topics(client, {}) == {"Replica only"}
+    api_key = client.post("/v1/agents/register", json={"display_name": "AsyncReplicated"}).json()["api_key"]
+    writer = {"X-API-Key": api_key}
+    client.post("/v1/arena/topics/propose", json={"topic": "Async fresh on primary"}, headers=writer)
+    assert "Async fresh on primary" in _topics(client, writer)
+    assert picked == [True, False]
+
+
+def test_sqlite_profile_wal_pragmas_and_single_writer(tmp_path, monkeypatch) -> None:
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    # Off by default: the primary keeps the configured pool and has no background engines.
+    default = create_db_engine(url)
+    assert default.pool.size() == get_settings().db_pool_size and background_engine_for(default) is default
+    default.dispose()
+
+    _single_writer_profile(monkeypatch)
+    writer = create_db_engine(url)
+    reader = create_db_engine(url, reader=True)
+    with writer.begin() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        conn.execute(text("CREATE TABLE counter (id INTEGER PRIMARY KEY, n INTEGER NOT NULL)"))
+        conn.execute(text("INSERT INTO counter (id, n) VALUES (1, 0)"))
+    assert writer.pool.size() == 1 and reader.pool.size() > 1
+
+    errors: list[BaseException] = []
+
+    def bump() -> None:
+        try:
+            for _ in range(20):
+                with Session(writer) as s:
+                    s.execute(text("UPDATE counter SET n = n + 1 WHERE id = 1"))
+                    s.commit()
+        except BaseException as exc:  # "database is locked" would land here
+            errors.append(exc)
+
+    threads = [threading.Thread(target=bump) for _ in range(8)]
+    # A reader is not blocked by an open write transaction.
+    with writer.connect() as held:
+        held.execute(text("UPDATE counter SET n = n WHERE id = 1"))
+        with reader.connect() as conn:
+            assert conn.execute(text("SELECT n FROM counter")).scalar() == 0
+        held.commit()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT n FROM counter")).scalar() == 160
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+    writer.dispose()
+    reader.dispose()
+
+
+def test_flush_event_writer_on_the_single_writer_profile(tmp_path, monkeypatch) -> None:
+    _single_writer_profile(monkeypatch)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'flush.db'}")
+    Base.metadata.create_all(engine)
+    assert engine.pool.size() == 1
+    writer = events_service.EventWriter(
+        "flush", bind=background_engine_for(engine), queue_size=100, batch_size=10, flush_interval=0.01, flush_timeout=3
+    )
+    monkeypatch.setattr(events_service, "event_writer", writer)
+
+    # The request session keeps the primary's only connection while after_commit waits for the flush.
+    now = datetime.now(timezone.utc)
+    with Session(engine) as db:
+        agent = Agent(id=uuid.uuid4(), display_name="Flusher", api_key_hash="x", created_at=now)
+        round_ = Round(id=uuid.uuid4(), round_number=1, status="open", topic="Flush", opened_at=now)
+        submission_id = uuid.uuid4()
+        submission = Submission(id=submission_id, round_id=round_.id, agent_id=agent.id, text="Fact.", created_at=now)
+        db.add_all([agent, round_, submission])
+        log_event(db, event_type="debug", payload={"profile": "single-writer"}, commit=False)
+        db.commit()
+        assert db.query(Event).filter(Event.type == "debug").count() == 1
+
+    # So does the vote buffer's own transaction when its vote events are flushed.
+    buffer = VoteBuffer(
+        enabled=True,
+        session_factory=sessionmaker(bind=background_engine_for(engine), autoflush=False),
+        queue_size=10,
+        batch_size=10,
+        flush_interval=0.01,
+        dedup_size=100,
+    )
+    buffer._persist([VoteRequest(submission_id, "flush-voter", "agree")])
+    assert buffer.stats()["outcomes"] == {"ok": 1}
+    assert writer.stats()["failed"] == 0
+    writer.shutdown(timeout=5)
+    buffer.shutdown(timeout=5)
+    engine.dispose()
@@ -61,3 +61,252 @@ def test_pagination_two_pages(client: TestClient) -> None:
     # There should be at least one remaining event, but not more than 2
     assert 1 <= len(second_body["items"]) <= 2
 
+
+
+def test_events_etag_changes_only_when_log_grows(client: TestClient) -> None:
+    api_key = _register_agent(client)
+    first = client.get("/v1/events?limit=5")
+    etag = first.headers["ETag"]
+    assert "max-age" in first.headers["Cache-Control"]
+
+    assert client.get("/v1/events?limit=5", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(
+        "/v1/events/emit",
+        json={"type": "debug", "payload": {"msg": "new"}},
+        headers={"X-API-Key": api_key},
+    )
+    after = client.get("/v1/events?limit=5", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != etag
+
+
+def test_committed_events_are_pushed_to_stream_subscribers(client: TestClient) -> None:
+    import asyncio
+
+    from app.services.stream import ARENA_STREAM_TYPES, event_hub
+
+    api_key = _register_agent(client)
+    round_a, round_b = "11111111-1111-1111-1111-111111111111", "22222222-2222-2222-2222-222222222222"
+
+    async def scenario() -> list:
+        sub = event_hub.subscribe(types=ARENA_STREAM_TYPES, round_id=round_a)
+        try:
+            loop = asyncio.get_running_loop()
+            for event_type, round_id in (("debug", round_a), ("vote_cast", round_b), ("vote_cast", round_a)):
+                await loop.run_in_executor(
+                    None,
+                    lambda t=event_type, r=round_id: client.post(
+                        "/v1/events/emit",
+                        json={"type": t, "payload": {"round_id": r}},
+                        headers={"X-API-Key": api_key},
+                    ),
+                )
+            return [await asyncio.wait_for(sub.queue.get(), timeout=5)]
+        finally:
+            event_hub.unsubscribe(sub)
+
+    (item,) = asyncio.run(scenario())
+    assert item.type == "vote_cast" and item.round_id == round_a
+    assert item.frame.startswith(f"id: {item.cursor}\nevent: vote_cast\ndata: ".encode())
+
+    # The SSE id is an events cursor: resuming from it yields nothing older.
+    page = client.get(f"/v1/events?cursor={item.cursor}&limit=50").json()
+    assert all(e["id"] != str(item.id) for e in page["items"])
+
+
+def test_stream_backlog_replays_after_last_event_id(client: TestClient, db_session) -> None:
+    from app.api.v1.arena import _stream_backlog
+    from app.services.events import encode_cursor, events_after
+
+    api_key = _register_agent(client)
+    round_id = "33333333-3333-3333-3333-333333333333"
+    created = [
+        client.post(
+            "/v1/events/emit",
+            json={"type": t, "payload": {"round_id": round_id}},
+            headers={"X-API-Key": api_key},
+        ).json()
+        for t in ("submission_created", "debug", "comment_created")
+    ]
+    first = next(e for e in events_after(db_session, None, limit=10_000) if str(e.id) == created[0]["id"])
+
+    replay = _stream_backlog(db_session, encode_cursor(first.created_at, first.id), round_id)
+    assert [item.type for item in replay] == ["comment_created"]
+
+    assert client.get("/v1/arena/stream", headers={"Last-Event-ID": "garbage"}).status_code == 400
+
+
+def test_slow_stream_subscriber_is_closed_not_buffered() -> None:
+    import asyncio
+    import uuid
+    from datetime import datetime, timezone
+
+    from app.services.stream import EventHub, make_stream_item
+
+    hub = EventHub(queue_size=2)
+    items = [
+        make_stream_item(
+            {"id": uuid.uuid4(), "type": "vote_cast", "payload": {}, "created_at": datetime.now(timezone.utc)},
+            f"c{i}",
+        )
+        for i in range(5)
+    ]
+
+    async def scenario() -> list:
+        sub = hub.subscribe()
+        hub.publish(items)
+        await asyncio.sleep(0)
+        drained = []
+        while not sub.queue.empty():
+            drained.append(sub.queue.get_nowait())
+        hub.unsubscribe(sub)
+        return drained
+
+    assert asyncio.run(scenario()) == [None]
+    assert hub.stats() == {"subscribers": 0, "published": 5, "dropped_subscribers": 1}
+
+
+def test_long_poll_parks_until_next_event(client: TestClient) -> None:
+    import threading
+    import time
+
+    api_key = _register_agent(client)
+    tail = client.get("/v1/events?limit=200").json()
+    while tail["next_cursor"]:
+        tail = client.get(f"/v1/events?cursor={tail['next_cursor']}&limit=200").json()
+    cursor = tail["resume_cursor"]
+
+    started = time.monotonic()
+    empty = client.get(f"/v1/events?cursor={cursor}&wait=0.3")
+    assert empty.status_code == 200 and empty.json()["items"] == []
+    assert empty.json()["resume_cursor"] == cursor
+    assert time.monotonic() - started >= 0.3
+
+    def emit_later() -> None:
+        time.sleep(0.3)
+        client.post(
+            "/v1/events/emit",
+            json={"type": "debug", "payload": {"msg": "wake"}},
+            headers={"X-API-Key": api_key},
+        )
+
+    threading.Thread(target=emit_later).start()
+    started = time.monotonic()
+    woken = client.get(f"/v1/events?cursor={cursor}&wait=10")
+    assert time.monotonic() - started < 5
+    items = woken.json()["items"]
+    assert [item["payload"] for item in items] == [{"msg": "wake"}]
+    assert woken.json()["resume_cursor"] != cursor
+
+
+def test_background_event_writer_batches_and_drains(client: TestClient, db_session, monkeypatch) -> None:
+    import uuid
+
+    from app.models.event import Event
+    from app.services import events as events_service
+
+    api_key = _register_agent(client)
+    writer = events_service.EventWriter(
+        "flush",
+        bind=db_session.get_bind(),
+        queue_size=100,
+        batch_size=10,
+        flush_interval=0.01,
+        flush_timeout=5,
+    )
+    monkeypatch.setattr(events_service, "event_writer", writer)
+
+    # flush: the response is sent only after the writer committed the row.
+    resp = client.post(
+        "/v1/events/emit",
+        json={"type": "debug", "payload": {"mode": "flush"}},
+        headers={"X-API-Key": api_key},
+    )
+    assert resp.status_code == 200
+    assert db_session.get(Event, uuid.UUID(resp.json()["id"])) is not None
+
+    # Events logged inside a domain transaction are handed over when it commits.
+    proposed = client.post("/v1/arena/topics/propose", json={"topic": "Writer topic"}, headers={"X-API-Key": api_key})
+    round_id = proposed.json()["round_id"]
+    logged = [e for e in db_session.query(Event).filter(Event.type == "topic_proposed").all() if e.payload["round_id"] == round_id]
+    assert len(logged) == 1
+
+    # async: fire-and-forget; shutdown drains whatever is still queued.
+    writer.mode = "async"
+    ids = [
+        client.post(
+            "/v1/events/emit",
+            json={"type": "debug", "payload": {"mode": "async", "i": i}},
+            headers={"X-API-Key": api_key},
+        ).json()["id"]
+        for i in range(5)
+    ]
+    writer.shutdown(timeout=5)
+    stored = db_session.query(Event.id).filter(Event.id.in_([uuid.UUID(i) for i in ids])).count()
+    assert stored == 5
+
+    stats = writer.stats()
+    assert stats["handled"] == 7 and stats["failed"] == 0 and stats["queue_depth"] == 0
+    assert stats["batches"] <= 7
+
+
+def test_background_writer_cursor_follows_commit_order(db_session, monkeypatch) -> None:
+    from sqlalchemy.orm import Session
+
+    from app.models.event import Event
+    from app.services import events as events_service
+
+    engine = db_session.get_bind()
+    writer = events_service.EventWriter(
+        "flush", bind=engine, queue_size=100, batch_size=10, flush_interval=0.01, flush_timeout=5
+    )
+    monkeypatch.setattr(events_service, "event_writer", writer)
+
+    # A logs its event first but commits second; a reader pages past B in between.
+    with Session(engine) as first, Session(engine) as second:
+        events_service.log_event(first, event_type="debug", payload={"order": "logged first"}, commit=False)
+        events_service.log_event(second, event_type="debug", payload={"order": "committed first"}, commit=False)
+        second.commit()
+        newest = db_session.query(Event).order_by(Event.created_at.desc(), Event.id.desc()).first()
+        assert newest.payload == {"order": "committed first"}
+        cursor = events_service.encode_cursor(newest.created_at, newest.id)
+        first.commit()
+
+    after = events_service.events_after(db_session, cursor, limit=10)
+    assert [e.payload for e in after] == [{"order": "logged first"}]
+    writer.shutdown(timeout=5)
+
+
+def test_batching_worker_resolves_every_accepted_item_on_shutdown() -> None:
+    import queue
+    import threading
+
+    from app.services.batching import BatchingWorker
+
+    handled: list[int] = []
+    worker: BatchingWorker[int] = BatchingWorker(
+        "race", handled.extend, max_queue=100000, batch_size=50, flush_interval=0.001
+    )
+    futures = []
+    started = threading.Event()
+
+    def produce() -> None:
+        for i in range(20000):
+            try:
+                futures.append(worker.submit(i))
+            except queue.Full:  # shutting down
+                return
+            started.set()
+
+    producers = [threading.Thread(target=produce) for _ in range(4)]
+    for t in producers:
+        t.start()
+    started.wait(5)
+    worker.shutdown(timeout=5)
+    for t in producers:
+        t.join()
+
+    # Everything submit() accepted was handled before the worker stopped.
+    assert all(f.done() for f in futures)
+    assert len(handled) == len(futures) == worker.stats()["handled"]
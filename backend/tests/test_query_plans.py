@@ -0,0 +1,89 @@
+"""
+EXPLAIN QUERY PLAN audit of the hot arena and event queries.
+
+Each query is captured from the code that issues it and its SQLite plan must not contain a full
+table scan or a temporary b-tree (any sort or grouping step, including the partial
+"RIGHT PART OF ORDER BY" one). A filtered query must also seek (SEARCH) rather than walk a whole
+index; only unfiltered ORDER BY ... LIMIT reads may scan one in order. A plan that regresses here means an index in
+app/models (and its migration) no longer matches the query.
+"""
+
+import re
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from starlette.requests import Request
+
+from app.api.v1.arena import _build_round_state, _list_rounds_page
+from app.api.v1.events import _events_page
+from app.models.arena import Round
+from app.services import leaderboard
+from app.services.events import encode_cursor, events_after
+from app.services.participation import open_rounds_for_agent
+from app.services.tallies import _vote_tallies
+from app.services.versions import arena_version
+
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+INDEX_SCAN = re.compile(r"^SCAN (\w+) USING (COVERING )?INDEX")
+
+
+@contextmanager
+def captured_selects(engine):
+    statements: list[tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def plan_problems(engine, statements) -> list[str]:
+    problems = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            filtered = " WHERE " in " ".join(statement.split())
+            for detail in (row[-1] for row in rows):
+                if FULL_SCAN.match(detail) or "TEMP B-TREE" in detail or (filtered and INDEX_SCAN.match(detail)):
+                    problems.append(f"{detail}\n  in: {' '.join(statement.split())}")
+    return problems
+
+
+def test_hot_queries_use_indexes(client: TestClient, db_session) -> None:
+    api_key = client.post("/v1/agents/register", json={"display_name": "PlanAgent"}).json()["api_key"]
+    headers = {"X-API-Key": api_key}
+    client.post("/v1/arena/topics/propose", json={"topic": "Query plans"}, headers=headers)
+    current = (
+        db_session.query(Round).filter(Round.status == "open").order_by(Round.round_number.desc()).first()
+    )
+    client.post(f"/v1/arena/rounds/{current.id}/submit", json={"text": "Indexed."}, headers=headers)
+    client.post(f"/v1/arena/rounds/{current.id}/comments", json={"text": "Noted."}, headers=headers)
+    agent_id = current.proposer_agent_id
+
+    engine = db_session.get_bind()
+    with captured_selects(engine) as statements:
+        arena_version(db_session)
+        _events_page(db_session, Request({"type": "http", "headers": []}), None, 50)
+        events_after(db_session, None, limit=50)
+        events_after(db_session, encode_cursor(datetime.now(timezone.utc), uuid.uuid4()), limit=50)
+        _build_round_state(db_session, current, 10)
+        _list_rounds_page(db_session, search="", status_filter="open", before=None, limit=20)
+        leaderboard.top(db_session, limit=10)
+        leaderboard.top(db_session, round_id=current.id, limit=10)
+        open_rounds_for_agent(db_session, agent_id)
+        _vote_tallies(db_session, [uuid.uuid4()])
+        # Inline in the propose / open-daily and close / current-round handlers.
+        db_session.query(Round).filter(Round.status == "open", Round.topic == "Query plans").first()
+        db_session.query(Round).filter(Round.status == "open").order_by(Round.round_number.desc()).first()
+
+    assert statements
+    assert plan_problems(engine, statements) == []
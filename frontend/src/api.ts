@@ -43,11 +43,20 @@ export async function openDailyTopic(
   return handleResponse(resp)
 }
 
-export async function getRounds(search?: string): Promise<RoundsListResponse> {
-  const url = search?.trim()
-    ? `${baseUrl}/v1/arena/rounds?q=${encodeURIComponent(search.trim())}`
-    : `${baseUrl}/v1/arena/rounds`
-  const resp = await fetch(url)
+export type RoundsQuery = {
+  status?: 'open' | 'closed'
+  before?: number | null
+  limit?: number
+}
+
+export async function getRounds(search?: string, query: RoundsQuery = {}): Promise<RoundsListResponse> {
+  const params = new URLSearchParams()
+  if (search?.trim()) params.set('q', search.trim())
+  if (query.status) params.set('status', query.status)
+  if (query.before != null) params.set('before', String(query.before))
+  if (query.limit) params.set('limit', String(query.limit))
+  const qs = params.toString()
+  const resp = await fetch(qs ? `${baseUrl}/v1/arena/rounds?${qs}` : `${baseUrl}/v1/arena/rounds`)
   return handleResponse<RoundsListResponse>(resp)
 }
 
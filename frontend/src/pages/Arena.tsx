@@ -28,9 +28,15 @@ function RoundCard({ r }: { r: RoundListItem }) {
   )
 }
 
+const OPEN_ROUNDS_LIMIT = 200
+const CLOSED_PAGE_SIZE = 50
+
 export default function Arena() {
-  const [rounds, setRounds] = useState<RoundListItem[]>([])
+  const [openRounds, setOpenRounds] = useState<RoundListItem[]>([])
+  const [closedRounds, setClosedRounds] = useState<RoundListItem[]>([])
+  const [closedNextBefore, setClosedNextBefore] = useState<number | null>(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const [search, setSearch] = useState('')
   const [searchInput, setSearchInput] = useState('')
@@ -39,8 +45,13 @@ export default function Arena() {
     setLoading(true)
     setError(null)
     try {
-      const res = await api.getRounds(q)
-      setRounds(res.items)
+      const [open, closed] = await Promise.all([
+        api.getRounds(q, { status: 'open', limit: OPEN_ROUNDS_LIMIT }),
+        api.getRounds(q, { status: 'closed', limit: CLOSED_PAGE_SIZE }),
+      ])
+      setOpenRounds(open.items)
+      setClosedRounds(closed.items)
+      setClosedNextBefore(closed.next_before)
     } catch (err) {
       setError((err as Error).message)
     } finally {
@@ -48,6 +59,24 @@ export default function Arena() {
     }
   }, [])
 
+  const loadMoreClosed = useCallback(async () => {
+    if (closedNextBefore == null) return
+    setLoadingMore(true)
+    try {
+      const page = await api.getRounds(search || undefined, {
+        status: 'closed',
+        before: closedNextBefore,
+        limit: CLOSED_PAGE_SIZE,
+      })
+      setClosedRounds((prev) => [...prev, ...page.items])
+      setClosedNextBefore(page.next_before)
+    } catch (err) {
+      setError((err as Error).message)
+    } finally {
+      setLoadingMore(false)
+    }
+  }, [closedNextBefore, search])
+
   useEffect(() => {
     api.getDailyTopics().then(() => fetchRounds()).catch(() => fetchRounds())
   }, [fetchRounds])
@@ -64,12 +93,6 @@ export default function Arena() {
     fetchRounds(query || undefined)
   }, [fetchRounds])
 
-  const filtered = search
-    ? rounds.filter((r) => r.topic.toLowerCase().includes(search.toLowerCase()))
-    : rounds
-  const openRounds = filtered.filter((r) => r.status === 'open')
-  const closedRounds = filtered.filter((r) => r.status === 'closed')
-
   return (
     <div className="app-root arena-list-root">
       <header className="app-header">
@@ -138,6 +161,11 @@ export default function Arena() {
                   ))}
                 </ul>
               )}
+              {closedNextBefore != null && (
+                <button type="button" className="btn-primary" onClick={loadMoreClosed} disabled={loadingMore}>
+                  {loadingMore ? 'Loading…' : 'Load more'}
+                </button>
+              )}
             </section>
           </>
         )}
@@ -68,4 +68,5 @@ export type RoundListItem = {
 
 export type RoundsListResponse = {
   items: RoundListItem[]
+  next_before: number | null
 }